@@ -1,7 +1,59 @@
-from google import genai
-from config.settings import GEMINI_API_KEY, GEMINI_MODEL
+import asyncio
+import functools
+import re
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+from config.settings import GEMINI_API_KEY, GEMINI_MODEL, GEMINI_BASE_URL
+
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """
+    The google.genai stack takes ~1s to import, so it is only loaded
+    when the watchdog is enabled. Call load_client() from async code.
+    """
+    from google import genai
+    from google.genai import types
+
+    return genai.Client(
+        api_key=GEMINI_API_KEY,
+        # e.g. a local fake audit server (bench/fake_gemini.py)
+        http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+    )
+
+
+async def load_client():
+    """get_client(), importing google.genai in a worker thread the first time"""
+    if get_client.cache_info().currsize:
+        return get_client()
+    return await asyncio.to_thread(get_client)
+
+
+_ITEM_HEADER = re.compile(r"^\s*ITEM\s+(\d+)\s*:?\s*$", re.MULTILINE)
+
+
+def _parse_verdict(text: str) -> dict:
+    text = text.strip()
+
+    if text.startswith("STATUS: OK"):
+        return {"status": "ok"}
+
+    if text.startswith("STATUS: CORRECT"):
+        fixed = text.split("FIXED_ANSWER:", 1)[-1].strip()
+        return {
+            "status": "corrected",
+            "fixed_answer": fixed,
+        }
+
+    # Failsafe
+    return {"status": "unknown", "raw": text}
+
+
+def _error_result(e: Exception) -> dict:
+    return {
+        "status": "error",
+        "error": str(e),
+        "error_type": type(e).__name__
+    }
 
 
 async def gemini_audit(prompt: str) -> dict:
@@ -23,29 +75,63 @@ async def gemini_audit(prompt: str) -> dict:
     )
 
     try:
+        client = await load_client()
         response = await client.aio.models.generate_content(
             model=GEMINI_MODEL,
             contents=system_prompt + "\n\n" + prompt
         )
 
-        text = response.text.strip()
+        return _parse_verdict(response.text)
+
+    except Exception as e:
+        return _error_result(e)
+
+
+async def gemini_audit_batch(prompts: list) -> list:
+    """
+    Audit several prompt/answer pairs in a single Gemini call.
+
+    Returns one verdict per prompt, in order. An item whose verdict is
+    missing or unparseable comes back as None so the caller can retry it
+    on its own. A failed call returns an error verdict for every item.
+    """
 
-        if text.startswith("STATUS: OK"):
-            return {"status": "ok"}
+    system_prompt = (
+        "You are a factual auditor. You will receive several numbered items, "
+        "each with a user prompt and an answer.\n\n"
+        "For EVERY item, in order, respond with a block starting with its header:\n"
+        "ITEM <n>\n"
+        "- If the answer is correct:\n"
+        "  STATUS: OK\n"
+        "- If incorrect or hallucinated:\n"
+        "  STATUS: CORRECT\n"
+        "  FIXED_ANSWER: <corrected answer>\n\n"
+        "Be concise. No commentary."
+    )
 
-        if text.startswith("STATUS: CORRECT"):
-            fixed = text.split("FIXED_ANSWER:", 1)[-1].strip()
-            return {
-                "status": "corrected",
-                "fixed_answer": fixed,
-            }
+    items = "\n\n".join(
+        f"=== ITEM {i} ===\n{prompt.strip()}" for i, prompt in enumerate(prompts, 1)
+    )
 
-        # Failsafe
-        return {"status": "unknown", "raw": text}
-    
+    try:
+        client = await load_client()
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=system_prompt + "\n\n" + items
+        )
     except Exception as e:
-        return {
-            "status": "error",
-            "error": str(e),
-            "error_type": type(e).__name__
-        }
+        return [_error_result(e) for _ in prompts]
+
+    verdicts = [None] * len(prompts)
+    text = response.text or ""
+    headers = list(_ITEM_HEADER.finditer(text))
+    for pos, header in enumerate(headers):
+        index = int(header.group(1)) - 1
+        end = headers[pos + 1].start() if pos + 1 < len(headers) else len(text)
+        if not 0 <= index < len(prompts) or verdicts[index] is not None:
+            continue
+        verdict = _parse_verdict(text[header.end():end])
+        if verdict["status"] != "unknown":
+            verdicts[index] = verdict
+
+    return verdicts
@@ -1,48 +1,299 @@
-from groq import AsyncGroq
-from config.settings import GROQ_API_KEY, GROQ_MODEL
+from config.settings import (
+    GROQ_API_KEYS,
+    GROQ_MODEL,
+    GROQ_BASE_URL,
+    GROQ_ENDPOINTS,
+    GROQ_RPM,
+    GROQ_TPM,
+    GROQ_REQUESTS_WINDOW_S,
+    GROQ_MAX_RETRIES,
+    REGISTRY_EWMA_ALPHA,
+    REGISTRY_EJECT_AFTER_FAILURES,
+    REGISTRY_EJECT_S,
+)
+from adapters.ratelimit import estimate_request_tokens
+from adapters.registry import Endpoint, ProviderRegistry, build_endpoints
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
-client = AsyncGroq(api_key=GROQ_API_KEY)
 
+registry = ProviderRegistry(
+    build_endpoints(
+        GROQ_ENDPOINTS,
+        GROQ_API_KEYS,
+        GROQ_MODEL,
+        GROQ_BASE_URL,
+        rpm=GROQ_RPM,
+        tpm=GROQ_TPM,
+        requests_window_s=GROQ_REQUESTS_WINDOW_S,
+    ),
+    alpha=REGISTRY_EWMA_ALPHA,
+    eject_after_failures=REGISTRY_EJECT_AFTER_FAILURES,
+    eject_s=REGISTRY_EJECT_S,
+)
 
-async def groq_infer(prompt: str = None, messages: list = None, temperature: float = 0.7, max_tokens: int = 1024):
+_groq = None  # the SDK module, once load_sdk() has imported it
+
+
+def _load_sdk():
+    global _groq
+    import groq
+
+    _groq = groq
+    for endpoint in registry.endpoints:
+        try:
+            endpoint.client
+        except Exception as e:
+            # e.g. no API key: the request that needs this endpoint reports it
+            logger.warning(f"Groq client for {endpoint.name} not created: {e}")
+
+
+async def load_sdk():
+    """
+    Import the groq SDK (~0.3s) and create the endpoint clients in a
+    worker thread, so the event loop never stalls on them. The app
+    lifespan starts this after startup; a request that arrives first
+    awaits the same import.
+    """
+    if _groq is None:
+        await asyncio.to_thread(_load_sdk)
+    return _groq
+
+
+def _build_messages(prompt: str = None, messages: list = None) -> list:
+    if messages:
+        # Use provided messages array
+        return messages
+    if prompt:
+        # Legacy mode: convert prompt string to user message
+        return [{"role": "user", "content": prompt}]
+    raise ValueError("Either 'prompt' or 'messages' must be provided")
+
+
+def _confidence_from_finish(finish_reason: str) -> float:
+    return 0.85 if finish_reason == "stop" else 0.65
+
+
+def _logprob_sum(logprobs) -> tuple:
+    """(sum, count) of token logprobs in a choice's logprobs block"""
+    content = getattr(logprobs, "content", None) if logprobs is not None else None
+    if not content:
+        return 0.0, 0
+    total = 0.0
+    for token in content:
+        total += token.logprob
+    return total, len(content)
+
+
+async def _create(
+    groq_messages: list,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    endpoint: Endpoint,
+    priority: str,
+    meta: dict,
+    stream: bool = False,
+    logprobs: bool = False,
+):
+    """
+    Schedule and send one chat completion, retrying 429 / 5xx /
+    connection errors through the rate limiter.
+    Returns (endpoint, completion_or_stream, estimated_tokens, start) with
+    the registry slot still held; the caller must release it.
+    """
+    groq = await load_sdk()
+
+    retryable = (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+    estimated = estimate_request_tokens(groq_messages, max_tokens)
+    meta.setdefault("queue_wait_ms", 0.0)
+    retries = 0
+    while True:
+        endpoint_model = model or endpoint.model
+        meta["endpoint"] = endpoint.name
+        meta["model"] = endpoint_model
+
+        waited = await endpoint.limiter.acquire(estimated, priority)
+        meta["queue_wait_ms"] += waited * 1000
+
+        registry.acquire(endpoint)
+        start = time.monotonic()
+        try:
+            raw = await endpoint.client.chat.completions.with_raw_response.create(
+                messages=groq_messages,
+                model=endpoint_model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=stream,
+                logprobs=True if logprobs else groq.NOT_GIVEN,
+            )
+            endpoint.limiter.update_from_headers(raw.headers)
+            return endpoint, await raw.parse(), estimated, start
+        except retryable as e:
+            meta.setdefault("failed_attempts", []).append((endpoint_model, endpoint.name))
+            # The request used no tokens: refund the estimate (before a 429's
+            # headers clamp the bucket to what the server reports)
+            endpoint.limiter.settle(estimated, 0)
+            if isinstance(e, groq.RateLimitError):
+                # Quota, not health: pause the key instead of penalising it
+                registry.cancel(endpoint)
+                endpoint.limiter.on_rate_limited(e.response.headers)
+            else:
+                registry.release(endpoint, (time.monotonic() - start) * 1000, ok=False)
+            if retries >= GROQ_MAX_RETRIES:
+                logger.error(f"Groq API error ({endpoint.name}), giving up: {e}")
+                raise Exception(f"Groq inference failed: {str(e)}")
+            retries += 1
+            meta["retries"] = retries
+            logger.warning(f"Groq API error ({endpoint.name}), retry {retries}: {e}")
+            if isinstance(e, groq.RateLimitError):
+                endpoint = registry.pick()
+            else:
+                failed = endpoint
+                endpoint = registry.pick(exclude=failed)
+                if endpoint is failed:
+                    await asyncio.sleep(min(0.5 * 2 ** (retries - 1), 8.0))
+        except Exception as e:
+            meta.setdefault("failed_attempts", []).append((endpoint_model, endpoint.name))
+            registry.release(endpoint, (time.monotonic() - start) * 1000, ok=False)
+            endpoint.limiter.settle(estimated, 0)
+            logger.error(f"Groq API error ({endpoint.name}): {e}")
+            raise Exception(f"Groq inference failed: {str(e)}")
+        except BaseException:
+            # Cancelled in flight (e.g. a hedge loser): the request may
+            # already be using quota upstream, so the estimate stays spent
+            registry.cancel(endpoint)
+            raise
+
+
+async def groq_infer(
+    prompt: str = None,
+    messages: list = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    model: str = None,
+    endpoint: Endpoint = None,
+    meta: dict = None,
+    priority: str = "interactive",
+    logprobs: bool = False,
+):
     """
     Real Groq API call using llama-3.3-70b-versatile
     Returns (answer, confidence_score)
-    
+
     Args:
         prompt: Simple string prompt (legacy - converted to user message)
         messages: Full message array [{"role": "...", "content": "..."}]
         temperature: Model temperature
         max_tokens: Maximum tokens in response
+        model: Override the endpoint's model for this call
+        endpoint: First upstream to try (default: picked by the registry)
+        meta: Optional dict filled with the endpoint name, model used,
+              rate-limit queue wait, retry count, finish_reason and
+              mean_logprob (when requested and returned); each failed
+              upstream attempt appends (model, endpoint) to
+              meta["failed_attempts"]
+        priority: Scheduling class (interactive / verify / batch)
+        logprobs: Ask for token logprobs (confidence signal)
     """
+    if meta is None:
+        meta = {}
+    groq_messages = _build_messages(prompt, messages)
+    endpoint, chat_completion, estimated, start = await _create(
+        groq_messages,
+        model,
+        temperature,
+        max_tokens,
+        endpoint or registry.pick(),
+        priority,
+        meta,
+        logprobs=logprobs,
+    )
+    registry.release(endpoint, (time.monotonic() - start) * 1000, ok=True)
+    usage = chat_completion.usage
+    endpoint.limiter.settle(estimated, usage.total_tokens if usage else None)
+
+    choice = chat_completion.choices[0]
+    output = choice.message.content
+
+    # Estimate confidence based on finish_reason and response quality
+    finish_reason = choice.finish_reason
+    confidence = _confidence_from_finish(finish_reason)
+    meta["finish_reason"] = finish_reason
+    if logprobs:
+        total, count = _logprob_sum(choice.logprobs)
+        meta["mean_logprob"] = total / count if count else None
+
+    return output, confidence
+
+
+async def groq_stream(
+    prompt: str = None,
+    messages: list = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    endpoint: Endpoint = None,
+    meta: dict = None,
+    priority: str = "interactive",
+    logprobs: bool = False,
+):
+    """
+    Streaming variant of groq_infer.
+    Yields content deltas as they arrive.
+
+    `meta` (if given) gets the endpoint, model and queue wait up front,
+    and finish_reason, confidence, usage and mean_logprob once the
+    stream ends. Retries only happen before the first delta.
+    """
+    if meta is None:
+        meta = {}
+
+    groq_messages = _build_messages(prompt, messages)
+    endpoint, stream, estimated, start = await _create(
+        groq_messages,
+        None,
+        temperature,
+        max_tokens,
+        endpoint or registry.pick(),
+        priority,
+        meta,
+        stream=True,
+        logprobs=logprobs,
+    )
     try:
-        # Build messages array
-        if messages:
-            # Use provided messages array
-            groq_messages = messages
-        elif prompt:
-            # Legacy mode: convert prompt string to user message
-            groq_messages = [{"role": "user", "content": prompt}]
-        else:
-            raise ValueError("Either 'prompt' or 'messages' must be provided")
-        
-        chat_completion = await client.chat.completions.create(
-            messages=groq_messages,
-            model=GROQ_MODEL,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-
-        output = chat_completion.choices[0].message.content
-        
-        # Estimate confidence based on finish_reason and response quality
-        finish_reason = chat_completion.choices[0].finish_reason
-        confidence = 0.85 if finish_reason == "stop" else 0.65
-
-        return output, confidence
-    
+        finish_reason = None
+        logprob_total, logprob_count = 0.0, 0
+        async for chunk in stream:
+            if chunk.x_groq and chunk.x_groq.usage:
+                meta["usage"] = chunk.x_groq.usage.model_dump()
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+            if logprobs:
+                total, count = _logprob_sum(choice.logprobs)
+                logprob_total += total
+                logprob_count += count
+            if choice.delta.content:
+                yield choice.delta.content
+
+        meta["finish_reason"] = finish_reason
+        meta["confidence"] = _confidence_from_finish(finish_reason)
+        if logprobs:
+            meta["mean_logprob"] = logprob_total / logprob_count if logprob_count else None
+
     except Exception as e:
-        logger.error(f"Groq API error: {e}")
+        meta.setdefault("failed_attempts", []).append((meta["model"], endpoint.name))
+        registry.release(endpoint, (time.monotonic() - start) * 1000, ok=False)
+        logger.error(f"Groq API error ({endpoint.name}): {e}")
         raise Exception(f"Groq inference failed: {str(e)}")
+    except BaseException:
+        # Client went away mid-stream
+        registry.cancel(endpoint)
+        raise
+    registry.release(endpoint, (time.monotonic() - start) * 1000, ok=True)
+    usage = meta.get("usage")
+    endpoint.limiter.settle(estimated, usage.get("total_tokens") if usage else None)
@@ -0,0 +1,209 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from typing import Optional
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "verify": 1, "batch": 2}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset headers ("7.66s", "2m59.56s", "500ms") or plain seconds"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def estimate_request_tokens(messages: list, max_tokens: int) -> int:
+    """Prompt estimate (~4 chars per token) plus the completion allowance"""
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + 4 * len(messages) + max_tokens
+
+
+class TokenBucket:
+    """
+    Continuous-refill bucket holding `capacity` per `period_s` seconds
+    (per minute by default); capacity <= 0 means unlimited.
+    """
+
+    def __init__(self, capacity: float, period_s: float = 60.0):
+        self.capacity = capacity
+        self.period_s = period_s
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def set_capacity(self, capacity: float, period_s: Optional[float] = None):
+        period_s = period_s or self.period_s
+        if capacity > 0 and (capacity, period_s) != (self.capacity, self.period_s):
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, capacity) if self.capacity > 0 else capacity
+            self.capacity = capacity
+            self.period_s = period_s
+
+    def _refill(self, now: float):
+        if self.unlimited:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period_s)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if now)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        # A request larger than the whole bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * self.period_s / self.capacity
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self.tokens -= amount
+
+    def clamp(self, remaining: float):
+        """Align with the server's view of what is left"""
+        if not self.unlimited:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+
+    def refund(self, amount: float):
+        if not self.unlimited:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    Client-side scheduler for one upstream key.
+    - request and token buckets; when not configured, their capacities
+      are learned from x-ratelimit-limit-requests (per
+      `requests_window_s`: Groq reports requests per day) and
+      x-ratelimit-limit-tokens (per minute)
+    - waiters are served strictly by priority class, FIFO within a class
+    - retry-after / exhausted-quota headers pause the whole limiter
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, requests_window_s: float = 86400.0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        # A configured RPM is kept; otherwise the server's request quota is learned
+        self.requests_window_s = requests_window_s if rpm <= 0 else None
+        self.paused_until = 0.0
+        self._waiters = []  # heap of (priority, seq, future, tokens)
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.rate_limited = 0
+
+    def _ready_in(self, tokens: int, now: float) -> float:
+        return max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+            0.0,
+        )
+
+    def _grant(self, tokens: int):
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.granted += 1
+
+    async def acquire(self, tokens: int, priority: str = "interactive") -> float:
+        """Wait for budget; returns the time spent queued, in seconds"""
+        now = time.monotonic()
+        if not self._waiters and self._ready_in(tokens, now) == 0:
+            self._grant(tokens)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (PRIORITIES.get(priority, PRIORITIES["interactive"]), next(self._seq), future, tokens),
+        )
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: the request never left
+                self.requests.refund(1)
+                self.tokens.refund(tokens)
+            raise
+        return time.monotonic() - now
+
+    async def _dispatch(self):
+        while self._waiters:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():  # waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._ready_in(tokens, time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self._waiters)
+            self._grant(tokens)
+            future.set_result(None)
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """Refund the difference once real usage is known"""
+        if actual is not None and actual < estimated:
+            self.tokens.refund(estimated - actual)
+
+    def update_from_headers(self, headers):
+        limit_requests = headers.get("x-ratelimit-limit-requests")
+        if limit_requests and self.requests_window_s:
+            self.requests.set_capacity(float(limit_requests), self.requests_window_s)
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if limit_tokens:
+            self.tokens.set_capacity(float(limit_tokens))
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_tokens:
+            self.tokens.clamp(float(remaining_tokens))
+            if float(remaining_tokens) <= 0:
+                self.pause(parse_duration(headers.get("x-ratelimit-reset-tokens")))
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        if remaining_requests:
+            self.requests.clamp(float(remaining_requests))
+            if float(remaining_requests) <= 0:
+                self.pause(parse_duration(headers.get("x-ratelimit-reset-requests")))
+
+    def on_rate_limited(self, headers, default_s: float = 1.0):
+        """429: honor retry-after (or the reset headers) before granting again"""
+        self.rate_limited += 1
+        retry_after = parse_duration(headers.get("retry-after"))
+        self.update_from_headers(headers)
+        self.pause(retry_after if retry_after is not None else default_s)
+
+    def pause(self, seconds: Optional[float]):
+        if seconds:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "queued": sum(1 for *_, future, _ in self._waiters if not future.done()),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "paused_for_s": round(max(self.paused_until - now, 0.0), 3),
+            "requests": self.requests.capacity or None,
+            "requests_window_s": self.requests.period_s,
+            "tpm": self.tokens.capacity or None,
+        }
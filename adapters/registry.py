@@ -0,0 +1,185 @@
+import json
+import random
+import time
+from typing import Optional
+
+from adapters.ratelimit import RateLimiter
+
+
+class Endpoint:
+    """
+    One upstream: an API key + model + base URL.
+    Health is tracked as EWMAs of latency and error rate; repeated
+    failures eject the endpoint for a cool-down period. Each key has
+    its own rate limiter since Groq quotas are per key.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        model: str,
+        base_url: Optional[str] = None,
+        rpm: float = 0,
+        tpm: float = 0,
+        requests_window_s: float = 86400.0,
+    ):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client = None
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm, requests_window_s=requests_window_s)
+        self.latency_ewma_ms: Optional[float] = None
+        self.error_ewma = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    @property
+    def client(self):
+        """AsyncGroq client, created (and the SDK imported) on first use"""
+        if self._client is None:
+            from groq import AsyncGroq
+
+            self._client = AsyncGroq(
+                api_key=self.api_key, base_url=self.base_url, max_retries=0  # retries go through the limiter
+            )
+        return self._client
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def score(self) -> float:
+        """Lower is better. Unmeasured endpoints score 0 so they get probed."""
+        latency = self.latency_ewma_ms or 0.0
+        return latency * (1 + self.in_flight) * (1 + 4 * self.error_ewma)
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "model": self.model,
+            "base_url": self.base_url,
+            "healthy": self.healthy(time.monotonic()),
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2) if self.latency_ewma_ms else None,
+            "error_ewma": round(self.error_ewma, 4),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejections": self.ejections,
+            "rate_limit": self.limiter.stats(),
+        }
+
+
+class ProviderRegistry:
+    """
+    Picks an upstream endpoint per request with power-of-two-choices on
+    the health score, skipping ejected endpoints.
+    """
+
+    def __init__(
+        self,
+        endpoints: list,
+        alpha: float = 0.2,
+        eject_after_failures: int = 3,
+        eject_s: float = 30.0,
+    ):
+        if not endpoints:
+            raise ValueError("ProviderRegistry needs at least one endpoint")
+        self.endpoints = endpoints
+        self.alpha = alpha
+        self.eject_after_failures = eject_after_failures
+        self.eject_s = eject_s
+
+    def pick(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if e.healthy(now)]
+        # Keys paused by a 429 / exhausted quota are a last resort
+        candidates = [e for e in healthy if e is not exclude and e.limiter.paused_until <= now]
+        if not candidates:
+            candidates = [e for e in healthy if e is not exclude] or healthy
+        if not candidates:
+            # Everything is ejected: use the one that comes back soonest
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        if len(candidates) == 1:
+            return candidates[0]
+        a, b = random.sample(candidates, 2)
+        return a if a.score() <= b.score() else b
+
+    def acquire(self, endpoint: Endpoint):
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+
+    def release(self, endpoint: Endpoint, latency_ms: float, ok: bool):
+        endpoint.in_flight -= 1
+        alpha = self.alpha
+        endpoint.error_ewma = (1 - alpha) * endpoint.error_ewma + alpha * (0.0 if ok else 1.0)
+        if ok:
+            endpoint.consecutive_failures = 0
+            if endpoint.latency_ewma_ms is None:
+                endpoint.latency_ewma_ms = latency_ms
+            else:
+                endpoint.latency_ewma_ms = (1 - alpha) * endpoint.latency_ewma_ms + alpha * latency_ms
+            return
+
+        endpoint.errors += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.eject_after_failures:
+            endpoint.ejected_until = time.monotonic() + self.eject_s
+            endpoint.ejections += 1
+            endpoint.consecutive_failures = 0
+
+    def cancel(self, endpoint: Endpoint):
+        """Attempt abandoned (e.g. hedge loser); no health signal"""
+        endpoint.in_flight -= 1
+
+    def stats(self) -> list:
+        return [e.snapshot() for e in self.endpoints]
+
+
+def build_endpoints(
+    endpoints_json: Optional[str],
+    api_keys: list,
+    model: str,
+    base_url: Optional[str] = None,
+    rpm: float = 0,
+    tpm: float = 0,
+    requests_window_s: float = 86400.0,
+) -> list:
+    """
+    Endpoints come from GROQ_ENDPOINTS (JSON list of
+    {"name", "api_key", "model", "base_url", "rpm", "tpm", "requests_window_s"})
+    when set, otherwise one endpoint per key in GROQ_API_KEYS using
+    GROQ_MODEL / GROQ_BASE_URL and the global GROQ_RPM / GROQ_TPM /
+    GROQ_REQUESTS_WINDOW_S.
+    """
+    if endpoints_json:
+        specs = json.loads(endpoints_json)
+        return [
+            Endpoint(
+                name=spec.get("name") or f"endpoint-{i}",
+                api_key=spec.get("api_key") or api_keys[0],
+                model=spec.get("model") or model,
+                base_url=spec.get("base_url") or base_url,
+                rpm=spec.get("rpm", rpm),
+                tpm=spec.get("tpm", tpm),
+                requests_window_s=spec.get("requests_window_s", requests_window_s),
+            )
+            for i, spec in enumerate(specs)
+        ]
+
+    return [
+        Endpoint(
+            name=f"groq-{i}",
+            api_key=key,
+            model=model,
+            base_url=base_url,
+            rpm=rpm,
+            tpm=tpm,
+            requests_window_s=requests_window_s,
+        )
+        for i, key in enumerate(api_keys)
+    ]
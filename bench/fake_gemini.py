@@ -0,0 +1,84 @@
+"""
+Local stand-in for the Gemini generateContent API used by the watchdog.
+
+Returns scripted audit verdicts (cycled in order) in the STATUS: format
+adapters/gemini.py parses, including batched "ITEM <n>" replies. Point
+the orchestrator at it with GEMINI_BASE_URL=http://127.0.0.1:9002.
+
+    python bench/fake_gemini.py --port 9002 --script ok,ok,ok,correct --latency fixed:800
+"""
+import argparse
+import asyncio
+import itertools
+import re
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from fake_groq import parse_latency
+
+_ITEM = re.compile(r"^=== ITEM (\d+) ===", re.MULTILINE)
+
+VERDICTS = {
+    "ok": "STATUS: OK",
+    "correct": "STATUS: CORRECT\nFIXED_ANSWER: (corrected by fake auditor)",
+    "garbage": "I am not sure what you mean.",
+}
+
+
+def create_app(script: str = "ok", latency: str = "fixed:800") -> FastAPI:
+    app = FastAPI()
+    sample_latency = parse_latency(latency)
+    verdicts = itertools.cycle([VERDICTS[v.strip()] for v in script.split(",") if v.strip()])
+    counters = {"calls": 0, "items": 0}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok", **counters}
+
+    @app.post("/{version}/models/{action:path}")
+    async def generate_content(version: str, action: str, request: Request):
+        body = await request.json()
+        text = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        counters["calls"] += 1
+        items = [int(n) for n in _ITEM.findall(text)]
+        await asyncio.sleep(sample_latency() / 1000)
+
+        if items:
+            counters["items"] += len(items)
+            reply = "\n\n".join(f"ITEM {n}\n{next(verdicts)}" for n in items)
+        else:
+            counters["items"] += 1
+            reply = next(verdicts)
+
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": reply}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {"promptTokenCount": len(text.split()), "candidatesTokenCount": len(reply.split())},
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini audit server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9002)
+    parser.add_argument("--script", default="ok", help="Comma-separated verdicts to cycle: ok, correct, garbage")
+    parser.add_argument("--latency", default="fixed:800", help="Audit latency distribution in ms")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.script, args.latency), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
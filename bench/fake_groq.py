@@ -0,0 +1,204 @@
+"""
+Local stand-in for the Groq API (OpenAI-compatible chat completions).
+
+Serves /openai/v1/chat/completions, streaming and non-streaming, with a
+configurable latency distribution and injected 429 / 5xx errors. Point
+the orchestrator at it with GROQ_BASE_URL=http://127.0.0.1:9001.
+
+    python bench/fake_groq.py --port 9001 --latency lognormal:250,0.4 --rate-429 0.02
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def parse_latency(spec: str):
+    """
+    Latency distribution in ms:
+        fixed:200
+        uniform:100,400
+        normal:250,50          (mean, stddev)
+        lognormal:250,0.4      (median, sigma)
+    Returns a zero-arg sampler.
+    """
+    kind, _, args = spec.partition(":")
+    params = [float(p) for p in args.split(",") if p]
+    if kind == "fixed":
+        return lambda: params[0]
+    if kind == "uniform":
+        return lambda: random.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda: max(random.gauss(params[0], params[1]), 0.0)
+    if kind == "lognormal":
+        mu = math.log(params[0])
+        return lambda: random.lognormvariate(mu, params[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def create_app(
+    latency: str = "lognormal:250,0.4",
+    chunk_ms: float = 5.0,
+    answer_words: int = 40,
+    rate_429: float = 0.0,
+    rate_5xx: float = 0.0,
+    retry_after_s: float = 1.0,
+    seed: int = None,
+) -> FastAPI:
+    app = FastAPI()
+    # Mutable so a benchmark can switch fault profiles via POST /control
+    config = {
+        "latency": latency,
+        "sample_latency": parse_latency(latency),
+        "rate_429": rate_429,
+        "rate_5xx": rate_5xx,
+    }
+    rng = random.Random(seed)
+    counters = {"requests": 0, "streams": 0, "429": 0, "5xx": 0}
+    rate_headers = {
+        "x-ratelimit-limit-requests": "100000",
+        "x-ratelimit-limit-tokens": "10000000",
+        "x-ratelimit-remaining-requests": "99999",
+        "x-ratelimit-remaining-tokens": "9999999",
+    }
+
+    def answer_for(messages: list) -> list:
+        last = (messages[-1].get("content") or "") if messages else ""
+        seed_words = last.split()[:8] or ["ok"]
+        return [seed_words[i % len(seed_words)] for i in range(answer_words)]
+
+    def usage(messages: list, words: list) -> dict:
+        prompt_tokens = sum(len((m.get("content") or "").split()) for m in messages)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok", **counters}
+
+    @app.post("/control")
+    async def control(request: Request):
+        """Update latency / rate_429 / rate_5xx on the fly"""
+        update = await request.json()
+        if "latency" in update:
+            config["sample_latency"] = parse_latency(update["latency"])
+            config["latency"] = update["latency"]
+        for key in ("rate_429", "rate_5xx"):
+            if key in update:
+                config[key] = float(update[key])
+        return {key: value for key, value in config.items() if key != "sample_latency"}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counters["requests"] += 1
+        messages = body.get("messages", [])
+        model = body.get("model", "fake")
+
+        sample_latency = config["sample_latency"]
+        roll = rng.random()
+        if roll < config["rate_429"]:
+            counters["429"] += 1
+            await asyncio.sleep(0.005)
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(retry_after_s), **rate_headers},
+            )
+        if roll < config["rate_429"] + config["rate_5xx"]:
+            counters["5xx"] += 1
+            await asyncio.sleep(sample_latency() / 1000 / 2)
+            return JSONResponse(
+                {"error": {"message": "Injected upstream failure", "type": "internal_server_error"}},
+                status_code=503,
+            )
+
+        words = answer_for(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        ttft_s = sample_latency() / 1000
+
+        if not body.get("stream"):
+            # Whole response after TTFT plus generation time
+            await asyncio.sleep(ttft_s + chunk_ms * len(words) / 1000)
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": " ".join(words)},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage(messages, words),
+                },
+                headers=rate_headers,
+            )
+
+        counters["streams"] += 1
+
+        async def events():
+            await asyncio.sleep(ttft_s)
+            base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+            for i, word in enumerate(words):
+                delta = {"content": word if i == 0 else " " + word}
+                if i == 0:
+                    delta["role"] = "assistant"
+                chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if chunk_ms:
+                    await asyncio.sleep(chunk_ms / 1000)
+            final = {
+                **base,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"id": completion_id, "usage": usage(messages, words)},
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=rate_headers)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq (OpenAI-compatible) server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency", default="lognormal:250,0.4", help="TTFT distribution in ms")
+    parser.add_argument("--chunk-ms", type=float, default=5.0, help="Delay between streamed words")
+    parser.add_argument("--answer-words", type=int, default=40)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of calls answered with 503")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(
+        latency=args.latency,
+        chunk_ms=args.chunk_ms,
+        answer_words=args.answer_words,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after_s=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Open-loop load generator for a running orchestrator.
+
+Fires requests at a fixed target QPS (independent of response times, so
+queueing shows up as latency) against /hybrid-chat or
+/v1/chat/completions and reports latency percentiles, throughput,
+orchestrator-only overhead and watchdog backlog as JSON.
+
+    python bench/loadgen.py --url http://127.0.0.1:9000 --endpoint hybrid --qps 20 --duration 30
+    python bench/loadgen.py ... --out bench/results/hybrid.json --compare bench/results/old.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import time
+
+import httpx
+
+PROMPTS = [
+    "What is the capital of Australia?",
+    "Explain the difference between a process and a thread.",
+    "Write a haiku about latency.",
+    "Summarize the causes of the French Revolution in three sentences. " * 3,
+    "List five prime numbers greater than 100.",
+]
+
+_METRIC_LINE = re.compile(r"^(hybrid_orchestrator_overhead_seconds_(?:sum|count)) (\S+)$", re.MULTILINE)
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)], 2)
+
+    return {
+        "n": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _payload(endpoint: str, prompt: str, verify: bool, stream: bool) -> tuple:
+    if endpoint == "hybrid":
+        return "/hybrid-chat", {"prompt": prompt, "verify": verify, "stream": stream, "cache": False}
+    return "/v1/chat/completions", {
+        "model": "hybrid",
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": stream,
+        "cache": False,
+    }
+
+
+def _has_content(endpoint: str, line: str) -> bool:
+    """True for an SSE line carrying answer text (not the role / metadata events)"""
+    if not line.startswith("data: ") or line == "data: [DONE]":
+        return False
+    try:
+        event = json.loads(line[len("data: "):])
+    except ValueError:
+        return False
+    if endpoint == "hybrid":
+        return bool(event.get("delta"))
+    choices = event.get("choices") or [{}]
+    return bool(choices[0].get("delta", {}).get("content"))
+
+
+async def _overhead_totals(client: httpx.AsyncClient) -> tuple:
+    text = (await client.get("/metrics")).text
+    values = dict(_METRIC_LINE.findall(text))
+    return (
+        float(values.get("hybrid_orchestrator_overhead_seconds_sum", 0)),
+        float(values.get("hybrid_orchestrator_overhead_seconds_count", 0)),
+    )
+
+
+async def _one(client, endpoint, prompt, verify, stream, record):
+    path, body = _payload(endpoint, prompt, verify, stream)
+    start = time.perf_counter()
+    ttft = None
+    try:
+        if stream:
+            async with client.stream("POST", path, json=body) as response:
+                async for line in response.aiter_lines():
+                    # TTFT = first answer token, not the opening role chunk
+                    if ttft is None and _has_content(endpoint, line):
+                        ttft = (time.perf_counter() - start) * 1000
+                status = response.status_code
+            data = None
+        else:
+            response = await client.post(path, json=body)
+            status = response.status_code
+            data = response.json() if status == 200 else None
+    except httpx.HTTPError as e:
+        record["errors"].append(type(e).__name__)
+        return
+    latency_ms = (time.perf_counter() - start) * 1000
+    record["status"][status] = record["status"].get(status, 0) + 1
+    if status != 200:
+        return
+    record["latency_ms"].append(latency_ms)
+    if ttft is not None:
+        record["ttft_ms"].append(ttft)
+    timing = (data or {}).get("timing")
+    if timing:
+        # Time the orchestrator spent outside the Groq call
+        record["overhead_ms"].append(max(timing["total_ms"] - timing["groq_ms"], 0.0))
+
+
+def _new_record() -> dict:
+    return {"latency_ms": [], "ttft_ms": [], "overhead_ms": [], "status": {}, "errors": []}
+
+
+async def _watch_backlog(client, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            pool = (await client.get("/stats")).json()["watchdog_pool"]
+            samples.append(pool["queue_depth"])
+        except (httpx.HTTPError, KeyError, ValueError):
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(
+    url: str,
+    endpoint: str = "hybrid",
+    qps: float = 10.0,
+    duration_s: float = 20.0,
+    verify_ratio: float = 0.1,
+    stream: bool = False,
+    timeout_s: float = 30.0,
+    seed: int = 0,
+    warmup: int = 0,
+) -> dict:
+    """
+    `warmup` requests are sent one at a time first and discarded, so
+    SDK imports, client setup and connection pools are not measured.
+    """
+    rng = random.Random(seed)
+    record = _new_record()
+    backlog = []
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout_s, limits=limits) as client:
+        discarded = _new_record()
+        for i in range(warmup):
+            # The first one also warms the audit path
+            verify = endpoint == "hybrid" and i == 0
+            await _one(client, endpoint, PROMPTS[i % len(PROMPTS)], verify, stream, discarded)
+
+        overhead_before = await _overhead_totals(client)
+        stats_before = (await client.get("/stats")).json()
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(_watch_backlog(client, backlog, stop))
+
+        tasks = []
+        interval = 1.0 / qps
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            due = start + sent * interval
+            if due - start >= duration_s:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            prompt = rng.choice(PROMPTS)
+            verify = endpoint == "hybrid" and rng.random() < verify_ratio
+            tasks.append(asyncio.create_task(_one(client, endpoint, prompt, verify, stream, record)))
+            sent += 1
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await watcher
+        overhead_after = await _overhead_totals(client)
+        stats_after = (await client.get("/stats")).json()
+
+    overhead_count = overhead_after[1] - overhead_before[1]
+    pool_before = stats_before.get("watchdog_pool", {})
+    pool_after = stats_after.get("watchdog_pool", {})
+    ok = len(record["latency_ms"])
+    return {
+        "endpoint": endpoint,
+        "stream": stream,
+        "target_qps": qps,
+        "duration_s": duration_s,
+        "warmup": warmup,
+        "sent": sent,
+        "ok": ok,
+        "status_codes": {str(k): v for k, v in sorted(record["status"].items())},
+        "client_errors": len(record["errors"]),
+        "throughput_rps": round(ok / elapsed, 2),
+        "latency_ms": percentiles(record["latency_ms"]),
+        "ttft_ms": percentiles(record["ttft_ms"]) if stream else None,
+        "overhead_ms": {
+            # Per-response (hybrid-chat non-streaming only) and server-side mean from /metrics
+            "per_response": percentiles(record["overhead_ms"]),
+            "server_mean": round((overhead_after[0] - overhead_before[0]) / overhead_count * 1000, 3)
+            if overhead_count
+            else None,
+        },
+        "watchdog_backlog": {
+            "max_queue_depth": max(backlog, default=0),
+            "final_queue_depth": pool_after.get("queue_depth"),
+            "submitted": pool_after.get("submitted", 0) - pool_before.get("submitted", 0),
+            "shed": pool_after.get("shed", 0) - pool_before.get("shed", 0),
+        },
+        "sub_second_p95": bool(ok) and percentiles(record["latency_ms"])["p95"] < 1000,
+    }
+
+
+def compare(current: dict, previous: dict) -> dict:
+    """Relative change of the headline numbers vs an earlier run"""
+
+    def delta(new, old):
+        if new is None or not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    return {
+        key: delta(current["latency_ms"].get(key), previous["latency_ms"].get(key))
+        for key in ("p50", "p95", "p99")
+    } | {"throughput_rps": delta(current["throughput_rps"], previous["throughput_rps"])}
+
+
+def save_result(result: dict, out: str, compare_path: str = None) -> dict:
+    result = {"commit": git_commit(), "timestamp": int(time.time()), **result}
+    if compare_path:
+        with open(compare_path) as f:
+            previous = json.load(f)
+        result["vs_previous_pct"] = compare(result, previous)
+    if out:
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the orchestrator")
+    parser.add_argument("--url", default="http://127.0.0.1:9000")
+    parser.add_argument("--endpoint", choices=("hybrid", "openai"), default="hybrid")
+    parser.add_argument("--qps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--verify-ratio", type=float, default=0.1, help="Share of hybrid requests with verify=true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=0, help="Discarded requests sent before measuring")
+    parser.add_argument("--out", help="Write the result JSON here")
+    parser.add_argument("--compare", help="Earlier result JSON to diff against")
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_load(
+            args.url,
+            endpoint=args.endpoint,
+            qps=args.qps,
+            duration_s=args.duration,
+            verify_ratio=args.verify_ratio,
+            stream=args.stream,
+            timeout_s=args.timeout,
+            seed=args.seed,
+            warmup=args.warmup,
+        )
+    )
+    print(json.dumps(save_result(result, args.out, args.compare), indent=2))
+
+
+if __name__ == "__main__":
+    main()
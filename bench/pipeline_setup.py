@@ -0,0 +1,94 @@
+"""
+Per-call setup cost of the Groq Open WebUI pipeline.
+
+Compares the old pattern (new AsyncGroq client + asyncio.run per message)
+with the long-lived client kept by pipelines/groq_pipeline.py.
+
+    python bench/pipeline_setup.py                   # setup cost only, offline
+    python bench/pipeline_setup.py --base-url http://127.0.0.1:9001
+                                                     # end-to-end against a fake server
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pipelines"))
+
+from groq import AsyncGroq  # noqa: E402
+from groq_pipeline import Pipeline  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+def _summary(samples_ms: list) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": round(ordered[len(ordered) // 2], 4),
+        "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 4),
+    }
+
+
+def bench_setup(iterations: int) -> dict:
+    old = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        AsyncGroq(api_key="bench")
+        asyncio.run(asyncio.sleep(0))
+        old.append((time.perf_counter() - start) * 1000)
+
+    pipeline = Pipeline()
+    pipeline.valves.GROQ_API_KEY = "bench"
+    new = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        pipeline.get_groq_client()
+        new.append((time.perf_counter() - start) * 1000)
+
+    return {"old_per_call_setup": _summary(old), "reused_client": _summary(new)}
+
+
+def bench_end_to_end(iterations: int, base_url: str, model: str) -> dict:
+    async def old_call():
+        client = AsyncGroq(api_key="bench", base_url=base_url)
+        completion = await client.chat.completions.create(messages=MESSAGES, model=model)
+        return completion.choices[0].message.content
+
+    old = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        asyncio.run(old_call())
+        old.append((time.perf_counter() - start) * 1000)
+
+    os.environ["GROQ_BASE_URL"] = base_url
+    pipeline = Pipeline()
+    pipeline.valves.GROQ_API_KEY = "bench"
+    new = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        "".join(pipeline.pipe("ping", model, MESSAGES, {"stream": True}))
+        new.append((time.perf_counter() - start) * 1000)
+
+    return {"old_per_call_client": _summary(old), "reused_client_stream": _summary(new)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--base-url", help="Groq-compatible server for an end-to-end comparison")
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    args = parser.parse_args()
+
+    report = {"setup": bench_setup(args.iterations)}
+    if args.base_url:
+        report["end_to_end"] = bench_end_to_end(args.iterations, args.base_url, args.model)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
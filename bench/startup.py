@@ -0,0 +1,207 @@
+"""
+Cold-start budget for the orchestrator.
+
+Measures, in fresh processes:
+- import time of orchestrator.main (and which heavy SDKs got imported)
+- time from process spawn to the first 200 from GET /health
+- latency of the first POST /hybrid-chat once healthy, against
+  bench/fake_groq.py and bench/fake_gemini.py answering instantly (the
+  SDK imports and client setup that startup defers land here)
+
+and exits non-zero when a median exceeds bench/startup_budget.json or
+when google.genai is imported with the watchdog disabled.
+
+    python bench/startup.py                  # check against the budget
+    python bench/startup.py --runs 7 --json  # machine-readable
+    python bench/startup.py --update-budget  # re-baseline (measured x 1.5)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BUDGET_PATH = os.path.join(BENCH_DIR, "startup_budget.json")
+HEADROOM = 1.5
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import orchestrator.main
+print(json.dumps({
+    "import_ms": (time.perf_counter() - start) * 1000,
+    "google.genai": "google.genai" in sys.modules,
+    "groq": "groq" in sys.modules,
+}))
+"""
+
+
+METRICS = ("import_ms", "healthy_ms", "first_chat_ms")
+
+
+def _env(watchdog: bool, fakes_port: int = None) -> dict:
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY") or "bench",
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY") or "bench",
+        "ENABLE_GEMINI_WATCHDOG": "true" if watchdog else "false",
+    }
+    if fakes_port is not None:
+        env.update({
+            "GROQ_API_KEY": "bench",
+            "GROQ_API_KEYS": "",
+            "GROQ_ENDPOINTS": "",
+            "GROQ_BASE_URL": f"http://127.0.0.1:{fakes_port}",
+            "GEMINI_API_KEY": "bench",
+            "GEMINI_BASE_URL": f"http://127.0.0.1:{fakes_port + 1}",
+            "ENABLE_VERDICT_CACHE": "false",
+            "CONFIDENCE_RECORD_PATH": "",
+        })
+    return env
+
+
+def measure_import(watchdog: bool) -> dict:
+    out = subprocess.check_output([sys.executable, "-c", _IMPORT_PROBE], cwd=ROOT, env=_env(watchdog), text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure_healthy(watchdog: bool, port: int, timeout_s: float = 30.0) -> tuple:
+    """(spawn to healthy, first /hybrid-chat) in ms, with the upstreams faked on port + 1 / + 2"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "orchestrator.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=_env(watchdog, fakes_port=port + 1),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=0.5) as client:
+            healthy_ms = None
+            while time.perf_counter() - start < timeout_s:
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        healthy_ms = (time.perf_counter() - start) * 1000
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+            if healthy_ms is None:
+                raise RuntimeError(f"/health not ready after {timeout_s}s")
+
+            # verify=true also queues the first audit when the watchdog is on
+            chat_start = time.perf_counter()
+            response = client.post(
+                f"http://127.0.0.1:{port}/hybrid-chat",
+                json={"prompt": "startup probe", "verify": watchdog, "cache": False},
+                timeout=timeout_s,
+            )
+            response.raise_for_status()
+            return healthy_ms, (time.perf_counter() - chat_start) * 1000
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _start_fakes(port: int) -> list:
+    fakes = [
+        subprocess.Popen(
+            [sys.executable, os.path.join(BENCH_DIR, script), "--port", str(port + offset), "--latency", "fixed:0"],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for offset, script in ((1, "fake_groq.py"), (2, "fake_gemini.py"))
+    ]
+    deadline = time.perf_counter() + 30
+    for offset in (1, 2):
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port + offset}/health", timeout=0.5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"fake upstream on port {port + offset} did not start")
+            time.sleep(0.05)
+    return fakes
+
+
+def run(runs: int, port: int) -> dict:
+    results = {}
+    fakes = _start_fakes(port)
+    try:
+        for watchdog in (False, True):
+            imports = [measure_import(watchdog) for _ in range(runs)]
+            served = [measure_healthy(watchdog, port) for _ in range(runs)]
+            results["watchdog_on" if watchdog else "watchdog_off"] = {
+                "import_ms": round(statistics.median(r["import_ms"] for r in imports), 1),
+                "healthy_ms": round(statistics.median(healthy for healthy, _ in served), 1),
+                "first_chat_ms": round(statistics.median(first for _, first in served), 1),
+                "imports_google_genai": any(r["google.genai"] for r in imports),
+                "imports_groq": any(r["groq"] for r in imports),
+            }
+    finally:
+        for fake in fakes:
+            fake.terminate()
+        for fake in fakes:
+            fake.wait(timeout=10)
+    return results
+
+
+def check(results: dict, budget: dict) -> list:
+    failures = []
+    for mode, measured in results.items():
+        for metric in METRICS:
+            limit = budget.get(mode, {}).get(metric)
+            if limit is not None and measured[metric] > limit:
+                failures.append(f"{mode}.{metric}: {measured[metric]}ms > budget {limit}ms")
+    if results["watchdog_off"]["imports_google_genai"]:
+        failures.append("google.genai imported with ENABLE_GEMINI_WATCHDOG=false")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orchestrator cold-start budget check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=9010, help="Orchestrator port (fakes use +1 / +2)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON only")
+    parser.add_argument("--update-budget", action="store_true", help=f"Write measured x {HEADROOM} as the new budget")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.port)
+
+    if args.update_budget:
+        budget = {
+            mode: {metric: round(measured[metric] * HEADROOM) for metric in METRICS}
+            for mode, measured in results.items()
+        }
+        with open(BUDGET_PATH, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+    else:
+        with open(BUDGET_PATH) as f:
+            budget = json.load(f)
+
+    failures = check(results, budget)
+    if args.json:
+        print(json.dumps({"results": results, "budget": budget, "failures": failures}, indent=2))
+    else:
+        for mode, measured in results.items():
+            limits = budget.get(mode, {})
+            print(f"{mode}: import {measured['import_ms']}ms, /health {measured['healthy_ms']}ms, "
+                  f"first /hybrid-chat {measured['first_chat_ms']}ms (budget "
+                  + " / ".join(f"{limits.get(metric, '-')}ms" for metric in METRICS) + ")")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
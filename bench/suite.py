@@ -0,0 +1,171 @@
+"""
+End-to-end latency suite that needs no API keys.
+
+Starts bench/fake_groq.py, bench/fake_gemini.py and the orchestrator
+(pointed at the fakes via GROQ_BASE_URL / GEMINI_BASE_URL), runs a set of
+load scenarios and writes one JSON file per run so commits can be
+compared. Each scenario gets a fresh orchestrator with its own temporary
+verdict cache, so scenarios neither read nor write ~/.cache or each other's
+verdicts. A few discarded warm-up requests precede each measurement, so
+the fresh process's first-request costs are not in the percentiles.
+
+    python bench/suite.py                               # default scenarios
+    python bench/suite.py --qps 50 --duration 30 --out bench/results/run.json
+    python bench/suite.py --compare bench/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from loadgen import compare, git_commit, run_load
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+# (name, loadgen kwargs, fake Groq fault profile)
+SCENARIOS = [
+    ("hybrid", {"endpoint": "hybrid"}, {}),
+    ("hybrid_stream", {"endpoint": "hybrid", "stream": True}, {}),
+    ("openai", {"endpoint": "openai"}, {}),
+    ("hybrid_faults", {"endpoint": "hybrid"}, {"rate_429": 0.03, "rate_5xx": 0.02}),
+]
+
+
+def _spawn(args: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable] + args,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _wait_healthy(url: str, timeout_s: float = 30.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url + "/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become healthy within {timeout_s}s")
+
+
+def _spawn_orchestrator(port: int, groq_url: str, gemini_url: str, state_dir: str) -> subprocess.Popen:
+    return _spawn(
+        ["-m", "uvicorn", "orchestrator.main:app", "--port", str(port), "--log-level", "warning"],
+        env={
+            "GROQ_API_KEY": "bench",
+            "GROQ_API_KEYS": "",
+            "GROQ_ENDPOINTS": "",
+            "GROQ_BASE_URL": groq_url,
+            "GEMINI_API_KEY": "bench",
+            "GEMINI_BASE_URL": gemini_url,
+            "ENABLE_GEMINI_WATCHDOG": "true",
+            "ENABLE_VERDICT_CACHE": "true",
+            "VERDICT_CACHE_PATH": os.path.join(state_dir, "verdicts.sqlite3"),
+            "CONFIDENCE_RECORD_PATH": "",
+        },
+    )
+
+
+def _stop(processes: list):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency suite against local fake upstreams")
+    parser.add_argument("--qps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--groq-latency", default="lognormal:250,0.4")
+    parser.add_argument("--gemini-latency", default="fixed:800")
+    parser.add_argument("--gemini-script", default="ok,ok,ok,correct")
+    parser.add_argument("--warmup", type=int, default=5, help="Discarded requests per scenario before measuring")
+    parser.add_argument("--port", type=int, default=9000, help="Orchestrator port (fakes use +1 / +2)")
+    parser.add_argument("--only", help="Comma-separated scenario names")
+    parser.add_argument("--out", help="Result file (default: bench/results/<commit>-<ts>.json)")
+    parser.add_argument("--compare", help="Earlier suite result to diff against")
+    args = parser.parse_args()
+
+    orchestrator_url = f"http://127.0.0.1:{args.port}"
+    groq_url = f"http://127.0.0.1:{args.port + 1}"
+    gemini_url = f"http://127.0.0.1:{args.port + 2}"
+    selected = set(args.only.split(",")) if args.only else None
+
+    fakes = [
+        _spawn(["bench/fake_groq.py", "--port", str(args.port + 1), "--latency", args.groq_latency, "--seed", "0"]),
+        _spawn([
+            "bench/fake_gemini.py",
+            "--port", str(args.port + 2),
+            "--latency", args.gemini_latency,
+            "--script", args.gemini_script,
+        ]),
+    ]
+    state_root = tempfile.mkdtemp(prefix="bench-suite-")
+    results = {}
+    try:
+        for url in (groq_url, gemini_url):
+            _wait_healthy(url)
+
+        for name, kwargs, faults in SCENARIOS:
+            if selected and name not in selected:
+                continue
+            state_dir = os.path.join(state_root, name)
+            os.makedirs(state_dir)
+            orchestrator = _spawn_orchestrator(args.port, groq_url, gemini_url, state_dir)
+            try:
+                _wait_healthy(orchestrator_url)
+                httpx.post(groq_url + "/control", json={"rate_429": 0.0, "rate_5xx": 0.0, **faults})
+                print(f"[suite] {name}: {args.qps} qps for {args.duration}s", file=sys.stderr)
+                results[name] = asyncio.run(
+                    run_load(orchestrator_url, qps=args.qps, duration_s=args.duration, warmup=args.warmup, **kwargs)
+                )
+            finally:
+                _stop([orchestrator])
+    finally:
+        _stop(fakes)
+        shutil.rmtree(state_root, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "config": {
+            "qps": args.qps,
+            "duration_s": args.duration,
+            "warmup": args.warmup,
+            "groq_latency": args.groq_latency,
+            "gemini_latency": args.gemini_latency,
+            "gemini_script": args.gemini_script,
+        },
+        "scenarios": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["scenarios"]
+        report["vs_previous_pct"] = {
+            name: compare(result, previous[name]) for name, result in results.items() if name in previous
+        }
+
+    out = args.out or os.path.join(BENCH_DIR, "results", f"{report['commit']}-{report['timestamp']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"[suite] saved {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
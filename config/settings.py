@@ -1,15 +1,53 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv(os.path.expanduser("~/.config/evo-secrets/.env"))
+# Settings are module constants, so the secrets file is read at import;
+# python-dotenv is only imported when there is a file to read
+_ENV_FILE = os.path.expanduser("~/.config/evo-secrets/.env")
+if os.path.exists(_ENV_FILE):
+    from dotenv import load_dotenv
+
+    load_dotenv(_ENV_FILE)
 
 # Groq
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # e.g. a local OpenAI-compatible fake
+
+# Upstream registry: several keys/models/base URLs, load-balanced by health
+GROQ_API_KEYS = [
+    key.strip() for key in os.getenv("GROQ_API_KEYS", "").split(",") if key.strip()
+] or [GROQ_API_KEY]
+GROQ_ENDPOINTS = os.getenv("GROQ_ENDPOINTS")  # JSON list, overrides GROQ_API_KEYS
+REGISTRY_EWMA_ALPHA = float(os.getenv("REGISTRY_EWMA_ALPHA", "0.2"))
+REGISTRY_EJECT_AFTER_FAILURES = int(os.getenv("REGISTRY_EJECT_AFTER_FAILURES", "3"))
+REGISTRY_EJECT_S = float(os.getenv("REGISTRY_EJECT_S", "30"))
+
+# Client-side rate limiting (per key). 0 = unlimited / learn from headers
+GROQ_RPM = float(os.getenv("GROQ_RPM", "0"))
+GROQ_TPM = float(os.getenv("GROQ_TPM", "0"))
+# Window of x-ratelimit-limit-requests: Groq reports requests per day;
+# use 60 for servers that report requests per minute
+GROQ_REQUESTS_WINDOW_S = float(os.getenv("GROQ_REQUESTS_WINDOW_S", "86400"))
+# Retries (429 / 5xx / connection errors) go back through the scheduler
+# instead of the SDK's built-in retry loop, so retry-after pauses the
+# whole key and a retried call queues behind higher-priority work
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+
+# Hedged requests (opt-in): backup attempt after the latency percentile
+ENABLE_HEDGING = os.getenv("ENABLE_HEDGING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "300"))
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.05"))
 
 # Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.0-flash-exp")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")  # e.g. a local fake audit server
 ENABLE_GEMINI_WATCHDOG = os.getenv("ENABLE_GEMINI_WATCHDOG", "true").lower() in (
     "1",
     "true",
@@ -17,5 +55,84 @@ ENABLE_GEMINI_WATCHDOG = os.getenv("ENABLE_GEMINI_WATCHDOG", "true").lower() in
     "on",
 )
 
+# Watchdog result store
+WATCHDOG_RESULTS_MAXSIZE = int(os.getenv("WATCHDOG_RESULTS_MAXSIZE", "10000"))
+WATCHDOG_RESULT_TTL_S = float(os.getenv("WATCHDOG_RESULT_TTL_S", "3600"))
+WATCHDOG_PENDING_TTL_S = float(os.getenv("WATCHDOG_PENDING_TTL_S", "600"))
+# Longest a long-poll / push subscription waits for a pending audit
+WATCHDOG_MAX_WAIT_S = float(os.getenv("WATCHDOG_MAX_WAIT_S", "120"))
+
+# Watchdog worker pool
+WATCHDOG_WORKERS = int(os.getenv("WATCHDOG_WORKERS", "4"))
+WATCHDOG_QUEUE_SIZE = int(os.getenv("WATCHDOG_QUEUE_SIZE", "256"))
+WATCHDOG_SHED_POLICY = os.getenv("WATCHDOG_SHED_POLICY", "drop_new")  # drop_new | drop_oldest
+WATCHDOG_DRAIN_TIMEOUT_S = float(os.getenv("WATCHDOG_DRAIN_TIMEOUT_S", "10"))
+# Batched audits: up to N items per Gemini call, waiting at most T ms (1 = off)
+WATCHDOG_BATCH_SIZE = int(os.getenv("WATCHDOG_BATCH_SIZE", "1"))
+WATCHDOG_BATCH_WAIT_MS = float(os.getenv("WATCHDOG_BATCH_WAIT_MS", "50"))
+
+# Response cache (exact match on normalized conversation)
+ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "1024"))
+RESPONSE_CACHE_TTL_S = float(os.getenv("RESPONSE_CACHE_TTL_S", "300"))
+
+# Coalesce identical concurrent Groq calls
+ENABLE_SINGLE_FLIGHT = os.getenv("ENABLE_SINGLE_FLIGHT", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# Context compaction for long chat histories
+ENABLE_CONTEXT_COMPACTION = os.getenv("ENABLE_CONTEXT_COMPACTION", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+CONTEXT_SUMMARY_MODEL = os.getenv("CONTEXT_SUMMARY_MODEL", "llama-3.1-8b-instant")
+CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "512"))
+
+# Confidence engine deciding watchdog audits: "signals" or "length" (v1)
+CONFIDENCE_ENGINE = os.getenv("CONFIDENCE_ENGINE", "signals")
+CONFIDENCE_WEIGHTS_PATH = os.getenv("CONFIDENCE_WEIGHTS_PATH")  # output of `confidence calibrate`
+CONFIDENCE_LOGPROBS = os.getenv("CONFIDENCE_LOGPROBS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+CONFIDENCE_RECORD_PATH = os.getenv("CONFIDENCE_RECORD_PATH")  # JSONL of features + verdicts
+CONFIDENCE_AUDIT_SAMPLE_RATE = float(os.getenv("CONFIDENCE_AUDIT_SAMPLE_RATE", "0"))
+
+# Persistent audit verdict cache (SQLite), keyed by normalized prompt + answer
+ENABLE_VERDICT_CACHE = os.getenv("ENABLE_VERDICT_CACHE", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+VERDICT_CACHE_PATH = os.getenv("VERDICT_CACHE_PATH", "~/.cache/hybrid-orchestrator/verdicts.sqlite3")
+VERDICT_CACHE_MAXSIZE = int(os.getenv("VERDICT_CACHE_MAXSIZE", "100000"))
+VERDICT_CACHE_TTL_S = float(os.getenv("VERDICT_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+# Server-side conversation sessions (opt-in per request via session_id)
+SESSION_MAXSIZE = int(os.getenv("SESSION_MAXSIZE", "10000"))
+SESSION_IDLE_TTL_S = float(os.getenv("SESSION_IDLE_TTL_S", "1800"))
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "200"))
+
+# Offline batch runner (CLI and POST /v1/batches)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_RPS = float(os.getenv("BATCH_RPS", "0"))  # 0 = no cap beyond the Groq limiter
+BATCH_WATCHDOG_WAIT_S = float(os.getenv("BATCH_WATCHDOG_WAIT_S", "60"))
+
 # General
 ENV = os.getenv("ENV", "dev")
@@ -0,0 +1,288 @@
+"""
+Offline batch runner: push a JSONL file of prompts through route_request.
+
+Input lines are JSON objects with an id and either `prompt` or
+`messages` (plus optional temperature / max_tokens / verify / cache).
+Results are written as JSONL in completion order, one line per item,
+flushed as they finish. Re-running with the same output file skips
+items that already have an "ok" result (resume after a crash).
+
+Usage:
+    python -m orchestrator.batch prompts.jsonl results.jsonl --concurrency 8
+    python -m orchestrator.batch requests.jsonl out.jsonl --id-field request_id --prompt-field body
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+from config import settings
+from orchestrator.router import WATCHDOG_POOL, route_request, wait_watchdog_result
+
+_PACKET_FIELDS = ("temperature", "max_tokens", "verify", "cache")
+
+
+def _packet(item: dict, prompt_field: str) -> dict:
+    packet = {field: item[field] for field in _PACKET_FIELDS if field in item}
+    if item.get("messages"):
+        packet["messages"] = item["messages"]
+    else:
+        packet["prompt"] = item.get(prompt_field)
+    if not packet.get("messages") and not packet.get("prompt"):
+        raise ValueError(f"item has neither 'messages' nor '{prompt_field}'")
+    packet["priority"] = "batch"
+    return packet
+
+
+def _item_id(value, index: int):
+    """
+    Result / checkpoint id: the item's own id, or "line:<n>" (n counts
+    non-empty lines) when it has none or the line is not valid JSON.
+    Lists and objects are turned into their JSON text so ids stay hashable.
+    """
+    if value is None:
+        return f"line:{index}"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+
+class _Pacer:
+    """Spaces request starts at least 1/rps apart"""
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps
+        self.next_slot = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        slot = max(self.next_slot, now)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def _aiter(lines: Iterable):
+    for line in lines:
+        yield line
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]):
+    """Split a byte stream (e.g. a request body) into lines without buffering it all"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def run_batch(
+    lines,
+    concurrency: int = 4,
+    rps: float = 0,
+    watchdog_wait_s: float = 60.0,
+    id_field: str = "id",
+    prompt_field: str = "prompt",
+    skip_ids: Optional[set] = None,
+):
+    """
+    Async generator over result dicts, in completion order.
+
+    `lines` is an (async) iterable of JSONL lines (str or bytes); it is
+    read only as fast as items can be scheduled. At most `concurrency`
+    requests hit the router at once; items waiting on a watchdog verdict
+    hold a separate, larger allowance so audits don't stall Groq calls.
+    `rps` > 0 caps the request start rate.
+    """
+    if not hasattr(lines, "__aiter__"):
+        lines = _aiter(lines)
+    skip_ids = skip_ids or set()
+    route_slots = asyncio.Semaphore(concurrency)
+    item_slots = asyncio.Semaphore(concurrency * 4)
+    pacer = _Pacer(rps) if rps > 0 else None
+    results = asyncio.Queue()
+    tasks = set()
+
+    async def process(index: int, item_id, item: Optional[dict], error: Optional[str]):
+        try:
+            result = {"id": item_id, "index": index}
+            if error is not None:
+                result.update(status="error", error=error)
+                return
+            start = time.monotonic()
+            try:
+                async with route_slots:
+                    if pacer:
+                        await pacer.wait()
+                    response = await route_request(_packet(item, prompt_field))
+            except Exception as e:
+                result.update(status="error", error=str(e))
+                return
+            result.update(
+                status="ok",
+                request_id=response["request_id"],
+                content=response["content"],
+                confidence=response["confidence"],
+                endpoint=response["endpoint"],
+                timing=response["timing"],
+                watchdog=response["watchdog"],
+            )
+            if response["watchdog"]["status"] == "pending" and watchdog_wait_s > 0:
+                verdict = await wait_watchdog_result(response["request_id"], watchdog_wait_s)
+                result["watchdog"] = {**response["watchdog"], **verdict}
+            result["item_ms"] = round((time.monotonic() - start) * 1000, 2)
+        finally:
+            item_slots.release()
+            results.put_nowait(result)
+
+    submitted = 0
+
+    async def feed():
+        nonlocal submitted
+        index = 0
+        async for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            line = line.strip()
+            if not line:
+                continue
+            item, error = None, None
+            try:
+                item = json.loads(line)
+                item_id = _item_id(item.get(id_field), index)
+            except (json.JSONDecodeError, AttributeError) as e:
+                item_id, error = _item_id(None, index), f"invalid JSON line: {e}"
+            index += 1
+            if item_id in skip_ids:
+                continue
+            await item_slots.acquire()
+            task = asyncio.create_task(process(index - 1, item_id, item, error))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            submitted += 1
+
+    feeder = asyncio.create_task(feed())
+    yielded = 0
+    try:
+        while True:
+            if feeder.done():
+                if feeder.exception():
+                    raise feeder.exception()
+                if yielded == submitted:
+                    return
+                yield await results.get()
+                yielded += 1
+                continue
+            getter = asyncio.ensure_future(results.get())
+            await asyncio.wait({getter, feeder}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+                yielded += 1
+            else:
+                getter.cancel()
+    finally:
+        feeder.cancel()
+        for task in list(tasks):
+            task.cancel()
+
+
+def load_checkpoint(output_path: str) -> set:
+    """
+    Ids with an "ok" result in `output_path` (failed items are retried).
+    A torn last line (crash mid-write) is truncated away so appending
+    resumes cleanly.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    good_offset = 0
+    with open(output_path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+                if record.get("status") == "ok":
+                    done.add(_item_id(record["id"], record.get("index")))
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                break
+            good_offset += len(line)
+        f.truncate(good_offset)
+    return done
+
+
+async def run_file(
+    input_path: str,
+    output_path: str,
+    concurrency: int,
+    rps: float,
+    watchdog_wait_s: float,
+    id_field: str,
+    prompt_field: str,
+    resume: bool = True,
+) -> dict:
+    skip_ids = load_checkpoint(output_path) if resume else set()
+    summary = {"skipped": len(skip_ids), "ok": 0, "error": 0}
+    start = time.monotonic()
+    with open(input_path, "r", encoding="utf-8") as src, open(
+        output_path, "a" if resume else "w", encoding="utf-8"
+    ) as out:
+        async for result in run_batch(
+            src,
+            concurrency=concurrency,
+            rps=rps,
+            watchdog_wait_s=watchdog_wait_s,
+            id_field=id_field,
+            prompt_field=prompt_field,
+            skip_ids=skip_ids,
+        ):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            summary[result["status"]] += 1
+    await WATCHDOG_POOL.stop(drain=True, timeout=settings.WATCHDOG_DRAIN_TIMEOUT_S)
+    summary["elapsed_s"] = round(time.monotonic() - start, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts through the router")
+    parser.add_argument("input", help="Input JSONL (one request per line)")
+    parser.add_argument("output", help="Output JSONL (appended to; used as the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=settings.BATCH_RPS, help="Max requests/s (0 = no cap)")
+    parser.add_argument(
+        "--watchdog-wait",
+        type=float,
+        default=settings.BATCH_WATCHDOG_WAIT_S,
+        help="Seconds to wait for a pending watchdog verdict per item (0 = don't wait)",
+    )
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--prompt-field", default="prompt")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(
+        run_file(
+            args.input,
+            args.output,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            watchdog_wait_s=args.watchdog_wait,
+            id_field=args.id_field,
+            prompt_field=args.prompt_field,
+            resume=not args.no_resume,
+        )
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
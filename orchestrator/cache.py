@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional
+
+from cachetools import TTLCache
+
+
+def conversation_key(messages: list, model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Stable hash of a normalized conversation plus sampling parameters.
+    Normalization only strips outer whitespace and unifies line endings,
+    so indentation inside code prompts still distinguishes entries.
+    """
+    normalized = [
+        (
+            (m.get("role") or "").strip().lower(),
+            (m.get("content") or "").replace("\r\n", "\n").strip(),
+        )
+        for m in messages
+    ]
+    raw = json.dumps(
+        [normalized, model, temperature, max_tokens],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match cache of Groq answers with TTL and size limits."""
+
+    def __init__(self, maxsize: int, ttl_s: float):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl_s)
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, content: str):
+        self._cache[key] = content
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    The first caller for a key starts the call as a task owned by the
+    group; concurrent callers with the same key await that task.
+    - A waiter being cancelled does not cancel the shared call unless it
+      was the last one waiting.
+    - An error is raised to every waiter and the key is released, so the
+      next caller starts a fresh attempt.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> [task, waiter_count]
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]) -> tuple:
+        """Returns (result, coalesced)"""
+        entry = self._calls.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(fn())
+            entry = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda done, k=key: self._release(k, done))
+            coalesced = False
+            self.leaders += 1
+        else:
+            task = entry[0]
+            coalesced = True
+            self.coalesced += 1
+
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task), coalesced
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # Every waiter went away; nobody needs the answer any more
+                self._calls.pop(key, None)
+                task.cancel()
+
+    def _release(self, key: str, task: asyncio.Future):
+        entry = self._calls.get(key)
+        if entry is not None and entry[0] is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved; waiters already re-raised it
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,296 @@
+"""
+Confidence engines deciding when an answer deserves a Gemini audit.
+
+Every engine scores the same small feature tuple (see FEATURES), built
+once per request by extract_features. Engines:
+- "length": the original prompt-length heuristic
+- "signals": logistic model over finish_reason, token logprobs, answer /
+  prompt length ratio, hedging phrases and prompt length; weights and the
+  audit threshold can be fitted offline from recorded verdicts:
+
+    python -m orchestrator.confidence calibrate verdicts.jsonl --out confidence.json
+"""
+import argparse
+import json
+import math
+import sys
+from typing import Optional
+
+FEATURES = (
+    "finish_stop",  # 1 if the model stopped on its own
+    "finish_length",  # 1 if cut off at max_tokens
+    "has_logprobs",
+    "mean_logprob",  # mean token logprob, clipped to [-5, 0]; 0 when absent
+    "length_ratio",  # log((answer chars + 1) / (prompt chars + 1)), clipped to [-4, 4]
+    "hedges",  # hedging phrases in the answer, capped at 3
+    "prompt_length",  # min(prompt chars / 4000, 1)
+)
+
+HEDGES = (
+    "i think",
+    "i believe",
+    "i'm not sure",
+    "i am not sure",
+    "not certain",
+    "probably",
+    "possibly",
+    "might be",
+    "may be",
+    "it seems",
+    "as far as i know",
+    "i don't know",
+    "i do not know",
+    "i cannot",
+    "i can't",
+    "unclear",
+    "i'm unable",
+    "approximately",
+)
+
+
+def count_hedges(answer: str, limit: int = 3) -> int:
+    """
+    Whole-word hedging phrases in `answer`, up to `limit`.
+    str.find per phrase on one lowered copy: ~3x faster than an
+    IGNORECASE alternation regex and allocates nothing per match.
+    """
+    text = answer.lower()
+    length = len(text)
+    count = 0
+    for phrase in HEDGES:
+        start = text.find(phrase)
+        while start != -1:
+            end = start + len(phrase)
+            if (start == 0 or not text[start - 1].isalnum()) and (end == length or not text[end].isalnum()):
+                count += 1
+                if count == limit:
+                    return count
+            start = text.find(phrase, end)
+    return count
+
+
+def extract_features(
+    prompt: str,
+    answer: str,
+    finish_reason: Optional[str] = None,
+    mean_logprob: Optional[float] = None,
+) -> tuple:
+    """One tuple of floats, ordered as FEATURES"""
+    prompt_len = len(prompt or "")
+    answer_len = len(answer or "")
+
+    hedges = count_hedges(answer) if answer else 0
+    ratio = math.log((answer_len + 1) / (prompt_len + 1))
+    return (
+        1.0 if finish_reason == "stop" else 0.0,
+        1.0 if finish_reason == "length" else 0.0,
+        0.0 if mean_logprob is None else 1.0,
+        0.0 if mean_logprob is None else max(min(mean_logprob, 0.0), -5.0),
+        max(min(ratio, 4.0), -4.0),
+        float(hedges),
+        min(prompt_len / 4000, 1.0),
+    )
+
+
+class LengthConfidence:
+    """The v1 heuristic: only prompt length counts."""
+
+    name = "length"
+    _PROMPT_LENGTH = FEATURES.index("prompt_length")
+
+    def __init__(self, threshold: float = 0.70):
+        self.threshold = threshold
+
+    def score(self, features: tuple) -> float:
+        return round(max(0.85 - 0.3 * features[self._PROMPT_LENGTH], 0.0), 2)
+
+
+# Hand-set until calibrated: ~0.85 for a short, cleanly finished answer,
+# ~0.77 with no finish signal (cache hits), ~0.75 with one hedging phrase,
+# below 0.70 for long prompts, truncation, two or more hedges or
+# low-probability tokens.
+DEFAULT_WEIGHTS = {
+    "bias": 1.2,
+    "finish_stop": 0.5,
+    "finish_length": -1.2,
+    "has_logprobs": 0.0,
+    "mean_logprob": 1.5,
+    "length_ratio": 0.05,
+    "hedges": -0.6,
+    "prompt_length": -1.5,
+}
+
+
+class SignalConfidence:
+    """Logistic model over FEATURES."""
+
+    name = "signals"
+
+    def __init__(self, weights: dict = None, threshold: float = 0.70):
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.bias = weights["bias"]
+        self.weights = tuple(weights[name] for name in FEATURES)
+        self.threshold = threshold
+
+    def score(self, features: tuple) -> float:
+        z = self.bias
+        for weight, value in zip(self.weights, features):
+            z += weight * value
+        return round(1.0 / (1.0 + math.exp(-z)), 2)
+
+
+ENGINES = {"length": LengthConfidence, "signals": SignalConfidence}
+
+
+def load_engine(name: str, weights_path: Optional[str] = None, threshold: float = 0.70):
+    """
+    Build the configured engine. A calibration file (see `calibrate`)
+    supplies weights and the audit threshold for the signals engine.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown confidence engine {name!r}; expected one of {sorted(ENGINES)}")
+    if name == "signals" and weights_path:
+        with open(weights_path) as f:
+            calibration = json.load(f)
+        return SignalConfidence(calibration["weights"], calibration.get("threshold", threshold))
+    return ENGINES[name](threshold=threshold)
+
+
+def verdict_record(features: tuple, verdict: Optional[str], reason: Optional[str]) -> str:
+    """One JSONL line for the calibration log"""
+    return json.dumps({"features": dict(zip(FEATURES, features)), "verdict": verdict, "reason": reason})
+
+
+# --- offline calibration -------------------------------------------------
+
+
+def _load_records(path: str) -> tuple:
+    """(feature rows, labels): ok -> 1 (answer was right), corrected -> 0"""
+    rows, labels = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("verdict") not in ("ok", "corrected"):
+                continue
+            features = record["features"]
+            rows.append([1.0] + [float(features.get(name, 0.0)) for name in FEATURES])
+            labels.append(1.0 if record["verdict"] == "ok" else 0.0)
+    return rows, labels
+
+
+def _solve(matrix: list, vector: list) -> list:
+    """Gaussian elimination with partial pivoting (tiny dense systems)"""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, n):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, n + 1):
+                a[r][c] -= factor * a[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (a[r][n] - sum(a[r][c] * x[c] for c in range(r + 1, n))) / a[r][r]
+    return x
+
+
+def fit_logistic(rows: list, labels: list, l2: float = 1.0, iterations: int = 25) -> list:
+    """L2-regularized logistic regression by Newton's method (IRLS)"""
+    dim = len(rows[0])
+    w = [DEFAULT_WEIGHTS["bias"]] + [DEFAULT_WEIGHTS[name] for name in FEATURES]
+    for _ in range(iterations):
+        grad = [l2 * w_i for w_i in w]
+        hess = [[l2 if i == j else 0.0 for j in range(dim)] for i in range(dim)]
+        grad[0] -= l2 * w[0]  # don't shrink the bias
+        hess[0][0] -= l2
+        for x, y in zip(rows, labels):
+            z = sum(w_i * x_i for w_i, x_i in zip(w, x))
+            p = 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+            g = p - y
+            h = max(p * (1 - p), 1e-6)
+            for i in range(dim):
+                grad[i] += g * x[i]
+                hx = h * x[i]
+                row = hess[i]
+                for j in range(i, dim):
+                    row[j] += hx * x[j]
+        for i in range(dim):
+            for j in range(i):
+                hess[i][j] = hess[j][i]
+        step = _solve(hess, grad)
+        w = [w_i - s for w_i, s in zip(w, step)]
+        if max(abs(s) for s in step) < 1e-6:
+            break
+    return w
+
+
+def audit_tradeoff(scores: list, labels: list, threshold: float) -> dict:
+    """Audit rate and catch rate (share of wrong answers audited) at a threshold"""
+    wrong = sum(1 for y in labels if y == 0.0)
+    audited = [s < threshold for s in scores]
+    caught = sum(1 for a, y in zip(audited, labels) if a and y == 0.0)
+    return {
+        "threshold": threshold,
+        "audit_rate": round(sum(audited) / len(scores), 4),
+        "catch_rate": round(caught / wrong, 4) if wrong else None,
+    }
+
+
+def pick_threshold(scores: list, labels: list, target_catch_rate: float) -> float:
+    """Lowest threshold (fewest audits) that still catches target_catch_rate of wrong answers"""
+    wrong_scores = sorted(s for s, y in zip(scores, labels) if y == 0.0)
+    if not wrong_scores:
+        return 0.0
+    needed = math.ceil(target_catch_rate * len(wrong_scores))
+    if needed == 0:
+        return 0.0
+    # Audit when score < threshold, so sit just above the needed-th lowest wrong score
+    return round(wrong_scores[needed - 1] + 0.005, 4)
+
+
+def calibrate(path: str, target_catch_rate: float = 0.9, l2: float = 1.0) -> dict:
+    rows, labels = _load_records(path)
+    if not rows or len(set(labels)) < 2:
+        raise ValueError("Need recorded verdicts with both 'ok' and 'corrected' outcomes")
+
+    w = fit_logistic(rows, labels, l2=l2)
+    engine = SignalConfidence(dict(zip(("bias",) + FEATURES, w)))
+    features = [tuple(row[1:]) for row in rows]
+    scores = [engine.score(f) for f in features]
+    threshold = pick_threshold(scores, labels, target_catch_rate)
+
+    legacy = LengthConfidence()
+    legacy_scores = [legacy.score(f) for f in features]
+    return {
+        "weights": dict(zip(("bias",) + FEATURES, (round(x, 4) for x in w))),
+        "threshold": threshold,
+        "records": len(rows),
+        "wrong": int(len(labels) - sum(labels)),
+        "signals": audit_tradeoff(scores, labels, threshold),
+        "length_baseline": audit_tradeoff(legacy_scores, labels, legacy.threshold),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confidence engine tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate", help="Fit weights + threshold from CONFIDENCE_RECORD_PATH output")
+    cal.add_argument("records", help="JSONL written with CONFIDENCE_RECORD_PATH")
+    cal.add_argument("--out", help="Write the calibration JSON here (use as CONFIDENCE_WEIGHTS_PATH)")
+    cal.add_argument("--target-catch-rate", type=float, default=0.9)
+    cal.add_argument("--l2", type=float, default=1.0)
+    args = parser.parse_args()
+
+    result = calibrate(args.records, args.target_catch_rate, args.l2)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
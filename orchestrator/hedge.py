@@ -0,0 +1,145 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+
+class LatencyWindow:
+    """
+    Sliding window of recent upstream latencies.
+    The percentile is recomputed every `refresh_every` samples rather than
+    per request, so reading it on the hot path is O(1).
+    """
+
+    def __init__(self, size: int = 256, refresh_every: int = 16):
+        self._samples = deque(maxlen=size)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._cached = {}
+
+    def add(self, latency_ms: float):
+        self._samples.append(latency_ms)
+        self._since_refresh += 1
+        if self._since_refresh >= self._refresh_every:
+            self._since_refresh = 0
+            self._cached.clear()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        value = self._cached.get(p)
+        if value is None:
+            ordered = sorted(self._samples)
+            index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+            value = self._cached[p] = ordered[index]
+        return value
+
+
+class HedgeBudget:
+    """Caps hedges to `max_ratio` of requests, with a small burst allowance."""
+
+    def __init__(self, max_ratio: float, burst: float = 5.0):
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self._tokens = burst
+
+    def on_request(self):
+        self._tokens = min(self._tokens + self.max_ratio, self.burst)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+class Hedger:
+    """
+    Hedged requests: if the primary attempt has not finished by the
+    percentile-based deadline, start a backup attempt and take whichever
+    succeeds first. The loser is cancelled.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        min_delay_ms: float,
+        max_ratio: float,
+        min_samples: int = 20,
+        window: int = 256,
+    ):
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.min_samples = min_samples
+        self.latencies = LatencyWindow(window)
+        self.budget = HedgeBudget(max_ratio)
+        self.requests = 0
+        self.fired = 0
+        self.backup_wins = 0
+        self.budget_denied = 0
+
+    def deadline_ms(self) -> Optional[float]:
+        """None until enough samples have been seen to trust the percentile"""
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.latencies.percentile(self.percentile), self.min_delay_ms)
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable],
+        backup: Callable[[], Awaitable],
+    ) -> tuple:
+        """Returns (result, hedge info)"""
+        self.requests += 1
+        self.budget.on_request()
+        deadline_ms = self.deadline_ms()
+        info = {"fired": False, "winner": "primary", "deadline_ms": deadline_ms}
+
+        start = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        tasks = {primary_task: ("primary", start)}
+        try:
+            if deadline_ms is not None:
+                await asyncio.wait({primary_task}, timeout=deadline_ms / 1000)
+
+            if not primary_task.done():
+                if deadline_ms is not None and self.budget.try_spend():
+                    self.fired += 1
+                    info["fired"] = True
+                    tasks[asyncio.ensure_future(backup())] = ("backup", time.monotonic())
+                elif deadline_ms is not None:
+                    self.budget_denied += 1
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    name, started = tasks[task]
+                    self.latencies.add((time.monotonic() - started) * 1000)
+                    info["winner"] = name
+                    if name == "backup":
+                        self.backup_wins += 1
+                    return task.result(), info
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "percentile": self.percentile,
+            "deadline_ms": self.deadline_ms(),
+            "requests": self.requests,
+            "fired": self.fired,
+            "backup_wins": self.backup_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": round(self.fired / self.requests, 4) if self.requests else 0.0,
+        }
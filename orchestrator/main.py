@@ -1,5 +1,27 @@
-from fastapi import FastAPI
-from orchestrator.router import route_request, get_watchdog_result
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+from orchestrator import metrics
+from orchestrator.batch import aiter_lines, run_batch
+from orchestrator.router import (
+    route_request,
+    route_request_stream,
+    get_watchdog_result,
+    wait_watchdog_result,
+    WATCHDOG_RESULTS,
+    RESPONSE_CACHE,
+    GROQ_FLIGHTS,
+    WATCHDOG_POOL,
+    CONTEXT_COMPACTOR,
+    GROQ_HEDGER,
+    SESSIONS,
+    VERDICT_CACHE,
+)
+from adapters.gemini import load_client
+from adapters.groq import load_sdk, registry
+from config import settings
 from orchestrator.schemas import (
     HybridChatRequest, 
     HybridResponse, 
@@ -10,10 +32,60 @@ from orchestrator.schemas import (
     ChatMessage,
     ChatCompletionUsage
 )
+import asyncio
+import json
+import logging
 import time
 import uuid
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up():
+    """Import the SDKs and create their clients off the event loop, after startup"""
+    try:
+        await load_sdk()
+        if settings.ENABLE_GEMINI_WATCHDOG:
+            await load_client()
+    except Exception as e:
+        logger.warning(f"SDK warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    WATCHDOG_POOL.start()
+    warm_up = asyncio.create_task(_warm_up())
+    yield
+    warm_up.cancel()
+    # Let queued audits finish before the process exits
+    await WATCHDOG_POOL.stop(drain=True, timeout=settings.WATCHDOG_DRAIN_TIMEOUT_S)
+    VERDICT_CACHE.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_KEEPALIVE_S = 15.0
+
+
+def _sse(data) -> str:
+    """Encode one server-sent event"""
+    if not isinstance(data, str):
+        data = json.dumps(data)
+    return f"data: {data}\n\n"
+
+
+def _stream_metadata(result: dict) -> dict:
+    return {
+        "request_id": result["request_id"],
+        "primary_model": result["primary_model"],
+        "endpoint": result["endpoint"],
+        "confidence": result["confidence"],
+        "watchdog": result["watchdog"],
+        "timing": result["timing"],
+        "context": result.get("context"),
+        "session": result.get("session"),
+    }
 
 
 @app.get("/")
@@ -25,7 +97,13 @@ def root():
             "/health", 
             "/hybrid-chat", 
             "/watchdog/{request_id}", 
+            "/watchdog/{request_id}/events (SSE)",
+            "/watchdog/ws (WebSocket)",
+            "/sessions/{session_id} (DELETE)",
+            "/stats",
+            "/metrics",
             "/v1/chat/completions (OpenAI-compatible)",
+            "/v1/batches (JSONL in, JSONL out)",
             "/docs"
         ],
     }
@@ -36,20 +114,141 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/stats")
+def stats():
+    """In-process counters for monitoring"""
+    return {
+        "watchdog_results": WATCHDOG_RESULTS.stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "single_flight": GROQ_FLIGHTS.stats(),
+        "watchdog_pool": WATCHDOG_POOL.stats(),
+        "context_compactor": CONTEXT_COMPACTOR.stats(),
+        "hedging": GROQ_HEDGER.stats(),
+        "sessions": SESSIONS.stats(),
+        "verdict_cache": VERDICT_CACHE.stats(),
+        "endpoints": registry.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+async def _hybrid_event_stream(packet: dict):
+    """
+    /hybrid-chat stream format:
+    - {"request_id": ..., "delta": "..."} per Groq delta
+    - one final event with the HybridResponse metadata and "done": true
+    - data: [DONE]
+    """
+    request_id = packet["request_id"]
+    try:
+        async for item in route_request_stream(packet):
+            if isinstance(item, str):
+                yield _sse({"request_id": request_id, "delta": item})
+            else:
+                yield _sse({**_stream_metadata(item), "done": True})
+    except Exception as e:
+        logger.error(f"Streaming error for {request_id}: {e}")
+        yield _sse({"request_id": request_id, "error": str(e)})
+    yield _sse("[DONE]")
+
+
 @app.post("/hybrid-chat", response_model=HybridResponse)
 async def hybrid_chat(payload: HybridChatRequest):
-    result = await route_request(payload.dict())
-    result.pop("gemini_task", None)
-    result.pop("merge_result_holder", None)
-    return result
+    if payload.stream:
+        packet = payload.dict()
+        packet["request_id"] = str(uuid.uuid4())
+        return StreamingResponse(
+            _hybrid_event_stream(packet),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    return await route_request(payload.dict())
+
+
+@app.delete("/sessions/{session_id}")
+def end_session(session_id: str):
+    """Forget a session's history (it would otherwise expire when idle)"""
+    return {"session_id": session_id, "deleted": SESSIONS.delete(session_id)}
+
+
+@app.websocket("/watchdog/ws")
+async def watchdog_ws(websocket: WebSocket):
+    """
+    Push channel for watchdog results.
+    Send {"request_id": ...} for each audit to follow; each result is pushed
+    as soon as the audit completes (or the current state after
+    WATCHDOG_MAX_WAIT_S).
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    deliveries = set()
+
+    async def deliver(request_id: str):
+        result = await wait_watchdog_result(request_id, settings.WATCHDOG_MAX_WAIT_S)
+        async with send_lock:
+            await websocket.send_json(result)
+
+    try:
+        while True:
+            message = await websocket.receive_json()
+            request_id = message.get("request_id") if isinstance(message, dict) else None
+            if not request_id:
+                async with send_lock:
+                    await websocket.send_json({"error": "expected {\"request_id\": ...}"})
+                continue
+            task = asyncio.create_task(deliver(request_id))
+            deliveries.add(task)
+            task.add_done_callback(deliveries.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in deliveries:
+            task.cancel()
 
 
 @app.get("/watchdog/{request_id}", response_model=WatchdogResult)
-def get_watchdog(request_id: str):
-    """Get the completed Gemini watchdog result for a request"""
+async def get_watchdog(
+    request_id: str,
+    wait: float = Query(0, ge=0, description="Long-poll: seconds to wait for a pending audit"),
+):
+    """Get the Gemini watchdog result for a request, optionally waiting for it"""
+    if wait:
+        return await wait_watchdog_result(request_id, min(wait, settings.WATCHDOG_MAX_WAIT_S))
     return get_watchdog_result(request_id)
 
 
+async def _watchdog_event_stream(request_id: str):
+    """Current state first, then the final result once the audit completes"""
+    deadline = time.monotonic() + settings.WATCHDOG_MAX_WAIT_S
+    result = get_watchdog_result(request_id)
+    yield _sse(result)
+    while result["status"] == "pending":
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        result = await wait_watchdog_result(request_id, min(SSE_KEEPALIVE_S, remaining))
+        if result["status"] == "pending":
+            yield ": keepalive\n\n"
+        else:
+            yield _sse(result)
+    yield _sse("[DONE]")
+
+
+@app.get("/watchdog/{request_id}/events")
+async def watchdog_events(request_id: str):
+    """SSE channel: pushes the watchdog result the moment the audit completes"""
+    return StreamingResponse(
+        _watchdog_event_stream(request_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @app.post("/v1/chat/completions", response_model=OpenAIChatResponse)
 async def openai_chat_completions(payload: OpenAIChatRequest):
     """OpenAI-compatible endpoint for VS Code and other tools"""
@@ -60,11 +259,24 @@ async def openai_chat_completions(payload: OpenAIChatRequest):
     else:
         prompt = user_messages[-1].content
     
-    # Route through hybrid system
-    result = await route_request({
+    packet = {
         "prompt": prompt,
-        "verify": False  # Default to fast mode for coding
-    })
+        "verify": False,  # Default to fast mode for coding
+        "temperature": payload.temperature,
+        "max_tokens": payload.max_tokens,
+        "cache": payload.cache,
+    }
+
+    if payload.stream:
+        packet["request_id"] = str(uuid.uuid4())
+        return StreamingResponse(
+            _openai_event_stream(packet),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
+    # Route through hybrid system
+    result = await route_request(packet)
     
     # Convert to OpenAI format
     response = OpenAIChatResponse(
@@ -89,3 +301,101 @@ async def openai_chat_completions(payload: OpenAIChatRequest):
     )
     
     return response
+
+
+async def _openai_event_stream(packet: dict):
+    """
+    OpenAI-style chat.completion.chunk stream.
+    The last chunk carries finish_reason, usage and a "hybrid" metadata block.
+    """
+    prompt = packet["prompt"]
+    chunk_base = {
+        "id": f"chatcmpl-{packet['request_id']}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "hybrid-groq-gemini",
+    }
+
+    yield _sse({
+        **chunk_base,
+        "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}],
+    })
+
+    try:
+        async for item in route_request_stream(packet):
+            if isinstance(item, str):
+                yield _sse({
+                    **chunk_base,
+                    "choices": [{"index": 0, "delta": {"content": item}, "finish_reason": None}],
+                })
+                continue
+
+            usage = item.get("usage")
+            if usage:
+                usage = ChatCompletionUsage(
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    total_tokens=usage.get("total_tokens", 0),
+                )
+            else:
+                usage = ChatCompletionUsage(
+                    prompt_tokens=len(prompt.split()),
+                    completion_tokens=len(item["content"].split()),
+                    total_tokens=len(prompt.split()) + len(item["content"].split())
+                )
+            yield _sse({
+                **chunk_base,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": item.get("finish_reason") or "stop"}],
+                "usage": usage.model_dump(),
+                "hybrid": _stream_metadata(item),
+            })
+    except Exception as e:
+        logger.error(f"Streaming error for {packet['request_id']}: {e}")
+        yield _sse({"error": {"message": str(e), "type": "upstream_error"}})
+
+    yield _sse("[DONE]")
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves `receive` alone while streaming, so the
+    endpoint can keep reading the request body. (Starlette's disconnect
+    listener would swallow body chunks on ASGI spec < 2.4 servers.)
+    A client going away surfaces as a failed send instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+async def _batch_lines(results):
+    async for result in results:
+        yield json.dumps(result) + "\n"
+
+
+@app.post("/v1/batches")
+async def batches(
+    request: Request,
+    concurrency: int = Query(settings.BATCH_CONCURRENCY, ge=1, le=64),
+    rps: float = Query(settings.BATCH_RPS, ge=0),
+    watchdog_wait: float = Query(settings.BATCH_WATCHDOG_WAIT_S, ge=0, le=600),
+    id_field: str = "id",
+    prompt_field: str = "prompt",
+):
+    """
+    Batch mode: the body is JSONL (one request per line), read as it
+    arrives. Results stream back as JSONL in completion order; the client
+    keeps them as its checkpoint and can resend only the missing ids.
+    """
+    results = run_batch(
+        aiter_lines(request.stream()),
+        concurrency=concurrency,
+        rps=rps,
+        watchdog_wait_s=watchdog_wait,
+        id_field=id_field,
+        prompt_field=prompt_field,
+    )
+    return _DuplexStreamingResponse(_batch_lines(results), media_type="application/x-ndjson")
@@ -0,0 +1,177 @@
+"""
+Minimal Prometheus text-format metrics.
+
+Recording is a dict lookup plus (for histograms) a bisect, so it is cheap
+enough for the request hot path. Everything runs on the event loop
+thread, so no locking is needed.
+"""
+from bisect import bisect_left
+from typing import Callable
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _label_values(labelnames: tuple, labels: tuple) -> tuple:
+    """Missing or None label values become "unknown" (not a literal "None")"""
+    if len(labels) == len(labelnames) and None not in labels:
+        return labels
+    padded = labels + (None,) * (len(labelnames) - len(labels))
+    return tuple("unknown" if value is None else value for value in padded)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        labels = _label_values(self.labelnames, labels)
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+
+    def observe(self, value: float, *labels):
+        labels = _label_values(self.labelnames, labels)
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                label_str = _format_labels(self.labelnames, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {total}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class GaugeFunc:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+
+    def render(self) -> list:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self.fn()}",
+        ]
+
+
+_METRICS = []
+
+
+def _register(metric):
+    _METRICS.append(metric)
+    return metric
+
+
+def register_gauge(name: str, help_text: str, fn: Callable[[], float]):
+    return _register(GaugeFunc(name, help_text, fn))
+
+
+def render() -> str:
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+GROQ_LATENCY = _register(Histogram(
+    "hybrid_groq_latency_seconds",
+    "Groq upstream call latency",
+    ("model", "endpoint"),
+))
+GROQ_QUEUE_WAIT = _register(Histogram(
+    "hybrid_groq_queue_wait_seconds",
+    "Time Groq calls wait in the rate-limit scheduler, by priority class",
+    ("priority",),
+))
+ORCHESTRATOR_OVERHEAD = _register(Histogram(
+    "hybrid_orchestrator_overhead_seconds",
+    "Request time spent outside the Groq call",
+))
+GEMINI_LATENCY = _register(Histogram(
+    "hybrid_gemini_audit_latency_seconds",
+    "Gemini audit call latency",
+))
+WATCHDOG_QUEUE_WAIT = _register(Histogram(
+    "hybrid_watchdog_queue_wait_seconds",
+    "Time audits spend queued before a worker picks them up",
+))
+WATCHDOG_TRIGGERS = _register(Counter(
+    "hybrid_watchdog_triggers_total",
+    "Watchdog audits requested, by reason",
+    ("reason", "model", "endpoint"),
+))
+WATCHDOG_VERDICTS = _register(Counter(
+    "hybrid_watchdog_verdicts_total",
+    "Gemini audit verdicts (ok/corrected/unknown/error)",
+    ("verdict", "model", "endpoint"),
+))
+WATCHDOG_SHED = _register(Counter(
+    "hybrid_watchdog_shed_total",
+    "Audits dropped because the watchdog queue was full",
+))
+CACHE_REQUESTS = _register(Counter(
+    "hybrid_response_cache_requests_total",
+    "Response cache lookups (hit/miss/bypass)",
+    ("result", "model", "endpoint"),
+))
+VERDICT_CACHE_REQUESTS = _register(Counter(
+    "hybrid_verdict_cache_requests_total",
+    "Audit verdict cache lookups (hit/miss)",
+    ("result", "model", "endpoint"),
+))
+UPSTREAM_ERRORS = _register(Counter(
+    "hybrid_upstream_errors_total",
+    "Failed Groq upstream calls, retried attempts included",
+    ("model", "endpoint"),
+))
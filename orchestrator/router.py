@@ -1,61 +1,314 @@
 import asyncio
+import random
 import time
 import uuid
 from typing import Optional
 
-from adapters.groq import groq_infer
-from adapters.gemini import gemini_audit
+from adapters.groq import groq_infer, groq_stream, registry
+from adapters.ratelimit import PRIORITIES
+from adapters.gemini import gemini_audit, gemini_audit_batch
 from config import settings
+from orchestrator import metrics
+from orchestrator.cache import ResponseCache, SingleFlight, conversation_key
+from orchestrator.confidence import extract_features, load_engine, verdict_record
+from orchestrator.hedge import Hedger
+from orchestrator.sessions import SessionStore, session_delta
+from orchestrator.verdicts import CACHEABLE_VERDICTS, VerdictCache, verdict_key
 from orchestrator.merge import merge_answers
+from orchestrator.watchdog import AuditJob, WatchdogPool, WatchdogResultStore
+from services.summarizer import ContextCompactor, groq_summarize
 
 
 CONFIDENCE_THRESHOLD = 0.70
 
-# In-memory storage for watchdog results
-WATCHDOG_RESULTS = {}
+CONFIDENCE = load_engine(
+    settings.CONFIDENCE_ENGINE,
+    settings.CONFIDENCE_WEIGHTS_PATH,
+    threshold=CONFIDENCE_THRESHOLD,
+)
 
+# Bounded in-memory storage for watchdog results
+WATCHDOG_RESULTS = WatchdogResultStore(
+    maxsize=settings.WATCHDOG_RESULTS_MAXSIZE,
+    ttl_s=settings.WATCHDOG_RESULT_TTL_S,
+    pending_ttl_s=settings.WATCHDOG_PENDING_TTL_S,
+)
 
-def estimate_confidence(prompt: str, groq_output: str) -> float:
+RESPONSE_CACHE = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+    ttl_s=settings.RESPONSE_CACHE_TTL_S,
+)
+
+# Gemini verdicts on disk, reused across restarts for repeated Q/A pairs
+VERDICT_CACHE = VerdictCache(
+    settings.VERDICT_CACHE_PATH,
+    maxsize=settings.VERDICT_CACHE_MAXSIZE,
+    ttl_s=settings.VERDICT_CACHE_TTL_S,
+)
+
+GROQ_FLIGHTS = SingleFlight()
+
+GROQ_HEDGER = Hedger(
+    percentile=settings.HEDGE_PERCENTILE,
+    min_delay_ms=settings.HEDGE_MIN_DELAY_MS,
+    max_ratio=settings.HEDGE_MAX_RATIO,
+)
+
+SESSIONS = SessionStore(
+    maxsize=settings.SESSION_MAXSIZE,
+    idle_ttl_s=settings.SESSION_IDLE_TTL_S,
+    max_messages=settings.SESSION_MAX_MESSAGES,
+)
+
+CONTEXT_COMPACTOR = ContextCompactor(
+    groq_summarize,
+    budget_tokens=settings.CONTEXT_TOKEN_BUDGET,
+    keep_last_turns=settings.CONTEXT_KEEP_TURNS,
+)
+
+
+def _prompt_for_confidence(messages: Optional[list], prompt: Optional[str]) -> str:
+    if messages:
+        # Extract last user message for confidence estimation
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        return user_messages[-1].get("content", "") if user_messages else ""
+    return prompt
+
+
+def _conversation(packet: dict) -> list:
+    return packet.get("messages") or [{"role": "user", "content": packet.get("prompt") or ""}]
+
+
+def _conversation_key(packet: dict, model: str) -> str:
+    """`model` is the one the picked endpoint will answer with"""
+    return conversation_key(
+        _conversation(packet),
+        model,
+        packet.get("temperature", 0.7),
+        packet.get("max_tokens", 1024),
+    )
+
+
+def _open_session(packet: dict) -> tuple:
     """
-    Very lightweight confidence estimator (v1).
-    No external calls. No dependencies.
+    Expand a session request (carrying only the new turn) to the full
+    history. Returns (packet with full messages, new turns, is_new).
     """
+    delta = session_delta(packet) or []
+    history, new = SESSIONS.history(packet["session_id"])
+    return {**packet, "messages": history + delta, "prompt": None}, delta, new
 
-    length_penalty = min(len(prompt) / 4000, 1.0)
-    base_confidence = 0.85
 
-    confidence = base_confidence - (0.3 * length_penalty)
+def _close_session(session_id: str, delta: list, answer: str, new: bool) -> dict:
+    SESSIONS.append(session_id, delta + [{"role": "assistant", "content": answer}])
+    return {"id": session_id, "messages": SESSIONS.length(session_id), "new": new}
 
-    return round(max(confidence, 0.0), 2)
 
+async def _compact_messages(messages: Optional[list]) -> tuple:
+    """Returns (messages to send to Groq, context info or None)"""
+    if not messages or not settings.ENABLE_CONTEXT_COMPACTION:
+        return messages, None
+    return await CONTEXT_COMPACTOR.compact(messages)
 
-async def route_request(packet: dict) -> dict:
+
+def _priority(packet: dict) -> str:
+    """Rate-limit scheduling class; verify requests yield to plain chat"""
+    priority = packet.get("priority")
+    if priority in PRIORITIES:
+        return priority
+    return "verify" if packet.get("verify") else "interactive"
+
+
+def _use_response_cache(packet: dict) -> bool:
+    """False when the cache is disabled globally or "cache": false on the request"""
+    if not settings.ENABLE_RESPONSE_CACHE or packet.get("cache") is False:
+        RESPONSE_CACHE.bypasses += 1
+        return False
+    return True
+
+
+def _audit_prompt(job: AuditJob) -> str:
+    return f"""
+USER PROMPT:
+{job.prompt}
+
+GROQ ANSWER:
+{job.answer}
+"""
+
+
+def _count_upstream_errors(meta: dict):
+    """One UPSTREAM_ERRORS increment per failed Groq attempt, retries included"""
+    for model, endpoint in meta.get("failed_attempts", ()):
+        metrics.UPSTREAM_ERRORS.inc(model, endpoint)
+
+
+def _append_line(path: str, line: str):
+    with open(path, "a") as f:
+        f.write(line + "\n")
+
+
+async def _store_merge(job: AuditJob, gemini_result: dict, gemini_time_ms: float):
+    merge_result = merge_answers(job.answer, gemini_result)
+    metrics.WATCHDOG_VERDICTS.inc(gemini_result.get("status") or "unknown", job.model, job.endpoint)
+
+    # Store result for later retrieval
+    if settings.CONFIDENCE_RECORD_PATH and job.features is not None:
+        # Calibration data for `python -m orchestrator.confidence calibrate`
+        await asyncio.to_thread(
+            _append_line,
+            settings.CONFIDENCE_RECORD_PATH,
+            verdict_record(job.features, gemini_result.get("status"), job.reason),
+        )
+
+    verdict = {
+        "gemini_status": gemini_result.get("status"),
+        "final_answer": merge_result.get("final_answer"),
+        "merge_explanation": merge_result.get("explanation"),
+    }
+    if settings.ENABLE_VERDICT_CACHE and job.verdict_key and verdict["gemini_status"] in CACHEABLE_VERDICTS:
+        await asyncio.to_thread(VERDICT_CACHE.put, job.verdict_key, verdict)
+
+    WATCHDOG_RESULTS.complete(job.request_id, {
+        "status": "completed",
+        "reason": job.reason,
+        **verdict,
+        "gemini_ms": gemini_time_ms,
+    })
+
+
+async def _replay_verdict(
+    request_id: str, reason: str, key: str, model: Optional[str], endpoint: Optional[str]
+) -> bool:
+    """Complete the watchdog result from the verdict cache; False on a miss"""
+    if not settings.ENABLE_VERDICT_CACHE:
+        return False
+    verdict = await asyncio.to_thread(VERDICT_CACHE.get, key)
+    metrics.VERDICT_CACHE_REQUESTS.inc("miss" if verdict is None else "hit", model, endpoint)
+    if verdict is None:
+        return False
+    WATCHDOG_RESULTS.complete(request_id, {
+        "status": "completed",
+        "reason": reason,
+        **verdict,
+        "gemini_ms": None,
+        "cached": True,
+    })
+    return True
+
+
+async def run_gemini_merge(job: AuditJob):
+    gemini_start = time.time()
+    gemini_result = await gemini_audit(_audit_prompt(job))
+    gemini_time_ms = (time.time() - gemini_start) * 1000
+    metrics.GEMINI_LATENCY.observe(gemini_time_ms / 1000)
+    await _store_merge(job, gemini_result, gemini_time_ms)
+
+
+async def run_gemini_merge_batch(jobs: list):
     """
-    Hybrid routing logic:
-    - Groq fast path by default
-    - Optional Gemini watchdog (async)
+    Pool handler: one Gemini call for the whole batch.
+    Items the batch response did not cover are re-audited one by one.
     """
-    start_time = time.time()
-    
-    request_id = packet.get("request_id", str(uuid.uuid4()))
-    
-    # Support both prompt (legacy) and messages (proper chat)
-    messages = packet.get("messages")
-    prompt = packet.get("prompt")
-    
-    # Groq fast path
-    groq_start = time.time()
-    if messages:
-        groq_out, _ = await groq_infer(messages=messages)
-        # Extract last user message for confidence estimation
-        user_messages = [m for m in messages if m.get("role") == "user"]
-        prompt_for_confidence = user_messages[-1].get("content", "") if user_messages else ""
-    else:
-        groq_out, _ = await groq_infer(prompt=prompt)
-        prompt_for_confidence = prompt
-    groq_time_ms = (time.time() - groq_start) * 1000
+    if len(jobs) == 1:
+        await run_gemini_merge(jobs[0])
+        return
+
+    gemini_start = time.time()
+    verdicts = await gemini_audit_batch([_audit_prompt(job) for job in jobs])
+    gemini_time_ms = (time.time() - gemini_start) * 1000
+    # One observation per Gemini call, not per item it covered
+    metrics.GEMINI_LATENCY.observe(gemini_time_ms / 1000)
+
+    fallbacks = []
+    for job, verdict in zip(jobs, verdicts):
+        if verdict is None:
+            fallbacks.append(run_gemini_merge(job))
+        else:
+            await _store_merge(job, verdict, gemini_time_ms)
+
+    if fallbacks:
+        WATCHDOG_POOL.fallbacks += len(fallbacks)
+        await asyncio.gather(*fallbacks)
+
+
+def _mark_shed(job: AuditJob):
+    metrics.WATCHDOG_SHED.inc()
+    WATCHDOG_RESULTS.complete(job.request_id, {
+        "status": "shed",
+        "reason": job.reason,
+        "gemini_status": None,
+        "final_answer": None,
+        "merge_explanation": None,
+        "gemini_ms": None,
+    })
+
+
+def _mark_failed(job: AuditJob, error: Exception):
+    # Items a failed batch already finished keep their verdict
+    result = WATCHDOG_RESULTS.get(job.request_id)
+    if result is not None and result["status"] != "pending":
+        return
+    WATCHDOG_RESULTS.complete(job.request_id, {
+        "status": "error",
+        "reason": job.reason,
+        "gemini_status": None,
+        "final_answer": None,
+        "merge_explanation": None,
+        "gemini_ms": None,
+        "error": str(error),
+    })
+
 
-    confidence = estimate_confidence(prompt_for_confidence, groq_out)
+metrics.register_gauge(
+    "hybrid_watchdog_queue_depth",
+    "Audits waiting in the watchdog queue",
+    lambda: WATCHDOG_POOL.stats()["queue_depth"],
+)
+metrics.register_gauge(
+    "hybrid_watchdog_results_size",
+    "Entries held in the watchdog result store",
+    lambda: len(WATCHDOG_RESULTS),
+)
+
+WATCHDOG_POOL = WatchdogPool(
+    run_gemini_merge_batch,
+    workers=settings.WATCHDOG_WORKERS,
+    queue_size=settings.WATCHDOG_QUEUE_SIZE,
+    shed_policy=settings.WATCHDOG_SHED_POLICY,
+    on_shed=_mark_shed,
+    on_error=_mark_failed,
+    batch_size=settings.WATCHDOG_BATCH_SIZE,
+    batch_wait_ms=settings.WATCHDOG_BATCH_WAIT_MS,
+)
+
+
+async def _finish_request(
+    packet: dict,
+    request_id: str,
+    prompt_for_confidence: str,
+    groq_out: str,
+    start_time: float,
+    timing: dict,
+    context: Optional[dict] = None,
+    endpoint: Optional[str] = None,
+    model: Optional[str] = None,
+    signals: Optional[dict] = None,
+) -> dict:
+    """
+    Shared tail of the buffered and streaming paths:
+    confidence, watchdog scheduling and the response envelope.
+    `signals` carries finish_reason / mean_logprob from the Groq call
+    (absent for cache hits).
+    """
+    signals = signals or {}
+    features = extract_features(
+        prompt_for_confidence,
+        groq_out,
+        signals.get("finish_reason"),
+        signals.get("mean_logprob"),
+    )
+    confidence = CONFIDENCE.score(features)
 
     need_watchdog = False
     watchdog_reason = None
@@ -64,71 +317,47 @@ async def route_request(packet: dict) -> dict:
     if packet.get("verify"):
         need_watchdog = True
         watchdog_reason = "forced_by_user"
-    elif confidence < CONFIDENCE_THRESHOLD:
+    elif confidence < CONFIDENCE.threshold:
         need_watchdog = True
         watchdog_reason = "low_confidence"
+    elif settings.CONFIDENCE_AUDIT_SAMPLE_RATE and random.random() < settings.CONFIDENCE_AUDIT_SAMPLE_RATE:
+        # Unbiased sample of confident answers, for calibration
+        need_watchdog = True
+        watchdog_reason = "calibration_sample"
 
     if need_watchdog:
-        watchdog_status = "pending"
-
-    gemini_task: Optional[asyncio.Task] = None
-    result_holder = {}
+        metrics.WATCHDOG_TRIGGERS.inc(watchdog_reason, model, endpoint)
 
-    async def run_gemini_merge(
-        prompt_text,
-        groq_answer,
-        request_id_value,
-        reason,
-        holder,
+    # Queue Gemini audit if required (never blocks the fast path),
+    # unless this exact conversation + answer was already audited
+    key = verdict_key(_conversation(packet), groq_out) if need_watchdog else None
+    if need_watchdog and settings.ENABLE_GEMINI_WATCHDOG and await _replay_verdict(
+        request_id, watchdog_reason, key, model, endpoint
     ):
-        gemini_start = time.time()
-        audit_prompt = f"""
-USER PROMPT:
-{prompt_text}
-
-GROQ ANSWER:
-{groq_answer}
-"""
-        gemini_result = await gemini_audit(audit_prompt)
-        gemini_time_ms = (time.time() - gemini_start) * 1000
-        
-        merge_result = merge_answers(groq_answer, gemini_result)
-        holder["merge"] = merge_result
-        holder["request_id"] = request_id_value
-        holder["reason"] = reason
-        holder["gemini_ms"] = gemini_time_ms
-        
-        # Store result for later retrieval
-        WATCHDOG_RESULTS[request_id_value] = {
-            "request_id": request_id_value,
-            "status": "completed",
-            "gemini_status": gemini_result.get("status"),
-            "final_answer": merge_result.get("final_answer"),
-            "merge_explanation": merge_result.get("explanation"),
-            "gemini_ms": gemini_time_ms,
-        }
-
-    # Fire Gemini asynchronously if required
-    if need_watchdog and settings.ENABLE_GEMINI_WATCHDOG:
-        gemini_task = asyncio.create_task(
-            run_gemini_merge(
-                prompt_for_confidence,  # Use the extracted prompt
-                groq_out,
-                request_id,
-                watchdog_reason,
-                result_holder,
+        watchdog_status = "completed"
+    elif need_watchdog and settings.ENABLE_GEMINI_WATCHDOG:
+        WATCHDOG_RESULTS.mark_pending(request_id, watchdog_reason)
+        queued = WATCHDOG_POOL.submit(
+            AuditJob(
+                request_id=request_id,
+                prompt=prompt_for_confidence,  # Use the extracted prompt
+                answer=groq_out,
+                reason=watchdog_reason,
+                features=features,
+                verdict_key=key,
+                model=model,
+                endpoint=endpoint,
             )
         )
-        watchdog_status = "pending"
-    elif need_watchdog:
-        watchdog_status = "skipped"
+        watchdog_status = "pending" if queued else "shed"
 
     total_time_ms = (time.time() - start_time) * 1000
-    
-    # Return immediately (Gemini may still be running)
+    metrics.ORCHESTRATOR_OVERHEAD.observe(max(total_time_ms - timing["groq_ms"], 0.0) / 1000)
+
     return {
         "request_id": request_id,
-        "primary_model": settings.GROQ_MODEL,
+        "primary_model": model or settings.GROQ_MODEL,
+        "endpoint": endpoint,  # None when served from the response cache
         "confidence": confidence,
         "watchdog": {
             "enabled": need_watchdog,
@@ -137,18 +366,239 @@ GROQ ANSWER:
         },
         "content": groq_out,
         "timing": {
-            "groq_ms": round(groq_time_ms, 2),
+            **timing,
             "total_ms": round(total_time_ms, 2),
         },
-        "gemini_task": gemini_task,
-        "merge_result_holder": result_holder,
+        "context": context,
     }
 
 
-def get_watchdog_result(request_id: str) -> dict:
-    """Retrieve completed watchdog result by request_id"""
-    if request_id in WATCHDOG_RESULTS:
-        return WATCHDOG_RESULTS[request_id]
+async def route_request(packet: dict) -> dict:
+    """
+    Hybrid routing logic:
+    - Response cache in front of Groq
+    - Groq fast path by default
+    - Optional Gemini watchdog (async)
+    Turns of one session run one at a time (see SessionStore.lock).
+    """
+    start_time = time.time()
+    session_id = packet.get("session_id")
+    if not session_id:
+        return await _route_request(packet, start_time)
+    async with SESSIONS.lock(session_id):
+        return await _route_request(packet, start_time)
+
+
+async def _route_request(packet: dict, start_time: float) -> dict:
+    request_id = packet.get("request_id") or str(uuid.uuid4())
+
+    session_id = packet.get("session_id")
+    if session_id:
+        packet, session_turns, session_new = _open_session(packet)
+
+    # Support both prompt (legacy) and messages (proper chat)
+    messages = packet.get("messages")
+    prompt = packet.get("prompt")
+    temperature = packet.get("temperature", 0.7)
+    max_tokens = packet.get("max_tokens", 1024)
+    priority = _priority(packet)
+
+    primary = registry.pick()
+    key = _conversation_key(packet, primary.model)
+    use_cache = _use_response_cache(packet)
+    groq_out = RESPONSE_CACHE.get(key) if use_cache else None
+    cache_status = "hit" if groq_out is not None else ("miss" if use_cache else "bypass")
+    metrics.CACHE_REQUESTS.inc(cache_status, primary.model, primary.name)
+    coalesced = False
+    served = {}
+
+    async def call_groq():
+        """Returns {"content", "context", "hedge", "endpoint", "model"}"""
+        compacted, context_info = await _compact_messages(messages)
+
+        async def attempt(endpoint):
+            meta = {}
+            attempt_start = time.monotonic()
+            try:
+                answer, _ = await groq_infer(
+                    prompt=None if compacted else prompt,
+                    messages=compacted,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    endpoint=endpoint,
+                    meta=meta,
+                    priority=priority,
+                    logprobs=settings.CONFIDENCE_LOGPROBS,
+                )
+            finally:
+                _count_upstream_errors(meta)
+            queue_wait_s = meta["queue_wait_ms"] / 1000
+            metrics.GROQ_QUEUE_WAIT.observe(queue_wait_s, priority)
+            metrics.GROQ_LATENCY.observe(
+                time.monotonic() - attempt_start - queue_wait_s, meta["model"], meta["endpoint"]
+            )
+            return answer, meta
+
+        if settings.ENABLE_HEDGING:
+            (answer, meta), hedge_info = await GROQ_HEDGER.run(
+                lambda: attempt(primary),
+                lambda: attempt(registry.pick(exclude=primary)),
+            )
+        else:
+            (answer, meta), hedge_info = await attempt(primary), None
+        return {"content": answer, "context": context_info, "hedge": hedge_info, **meta}
+
+    # Groq fast path
+    groq_start = time.time()
+    if groq_out is None:
+        if settings.ENABLE_SINGLE_FLIGHT and use_cache:
+            # A cache bypass asks for a fresh answer, not someone else's in-flight one
+            served, coalesced = await GROQ_FLIGHTS.do(key, call_groq)
+        else:
+            served = await call_groq()
+        groq_out = served["content"]
+        if use_cache:
+            # A retry or hedge may have been answered by another endpoint's model
+            if served["model"] != primary.model:
+                key = _conversation_key(packet, served["model"])
+            RESPONSE_CACHE.put(key, groq_out)
+    groq_time_ms = (time.time() - groq_start) * 1000
+
+    # Return immediately (Gemini may still be running)
+    result = await _finish_request(
+        packet,
+        request_id,
+        _prompt_for_confidence(messages, prompt),
+        groq_out,
+        start_time,
+        {
+            "groq_ms": round(groq_time_ms, 2),
+            "cache": cache_status,
+            "coalesced": coalesced,
+            "hedge": served.get("hedge"),
+            "queue_wait_ms": _round_ms(served.get("queue_wait_ms")),
+        },
+        served.get("context"),
+        served.get("endpoint"),
+        served.get("model"),
+        served,
+    )
+    if session_id:
+        result["session"] = _close_session(session_id, session_turns, groq_out, session_new)
+    return result
+
+
+async def route_request_stream(packet: dict):
+    """
+    Streaming variant of route_request.
+    Yields content deltas (str) as Groq produces them, then a single
+    final dict shaped like route_request's result.
+
+    A cache hit is yielded as one delta. The watchdog is only scheduled
+    once the stream has completed, since it needs the full answer.
+    """
+    start_time = time.time()
+    session_id = packet.get("session_id")
+    if not session_id:
+        async for item in _route_request_stream(packet, start_time):
+            yield item
+        return
+    async with SESSIONS.lock(session_id):
+        async for item in _route_request_stream(packet, start_time):
+            yield item
+
+
+async def _route_request_stream(packet: dict, start_time: float):
+    request_id = packet.get("request_id") or str(uuid.uuid4())
+
+    session_id = packet.get("session_id")
+    if session_id:
+        packet, session_turns, session_new = _open_session(packet)
+
+    messages = packet.get("messages")
+    prompt = packet.get("prompt")
+
+    primary = registry.pick()
+    use_cache = _use_response_cache(packet)
+    key = _conversation_key(packet, primary.model) if use_cache else None
+    cached = RESPONSE_CACHE.get(key) if use_cache else None
+    cache_status = "hit" if cached is not None else ("miss" if use_cache else "bypass")
+    metrics.CACHE_REQUESTS.inc(cache_status, primary.model, primary.name)
+
+    groq_start = time.time()
+    ttft_ms = None
+    parts = []
+    meta = {}
+    context = None
+    if cached is not None:
+        ttft_ms = (time.time() - groq_start) * 1000
+        parts.append(cached)
+        yield cached
+    else:
+        send_messages, context = await _compact_messages(messages)
+        priority = _priority(packet)
+        try:
+            async for delta in groq_stream(
+                prompt=prompt,
+                messages=send_messages,
+                temperature=packet.get("temperature", 0.7),
+                max_tokens=packet.get("max_tokens", 1024),
+                endpoint=primary,
+                meta=meta,
+                priority=priority,
+                logprobs=settings.CONFIDENCE_LOGPROBS,
+            ):
+                if ttft_ms is None:
+                    metrics.GROQ_QUEUE_WAIT.observe(meta["queue_wait_ms"] / 1000, priority)
+                    # Upstream time only, as GROQ_LATENCY; the wait is in queue_wait_ms
+                    ttft_ms = (time.time() - groq_start) * 1000 - meta["queue_wait_ms"]
+                parts.append(delta)
+                yield delta
+        finally:
+            _count_upstream_errors(meta)
+    groq_time_ms = (time.time() - groq_start) * 1000
+    if cached is None:
+        # Same meaning as on the buffered path: rate-limiter wait excluded
+        metrics.GROQ_LATENCY.observe(
+            (groq_time_ms - meta.get("queue_wait_ms", 0.0)) / 1000, meta.get("model"), meta.get("endpoint")
+        )
+
+    groq_out = "".join(parts)
+    if use_cache and cached is None:
+        # A retry may have been answered by another endpoint's model
+        if meta["model"] != primary.model:
+            key = _conversation_key(packet, meta["model"])
+        RESPONSE_CACHE.put(key, groq_out)
+
+    result = await _finish_request(
+        packet,
+        request_id,
+        _prompt_for_confidence(messages, prompt),
+        groq_out,
+        start_time,
+        {
+            "groq_ms": round(groq_time_ms, 2),
+            "ttft_ms": round(ttft_ms, 2) if ttft_ms is not None else None,
+            "cache": cache_status,
+            "queue_wait_ms": _round_ms(meta.get("queue_wait_ms")),
+        },
+        context,
+        meta.get("endpoint"),
+        meta.get("model"),
+        meta,
+    )
+    result["finish_reason"] = meta.get("finish_reason")
+    result["usage"] = meta.get("usage")
+    if session_id:
+        result["session"] = _close_session(session_id, session_turns, groq_out, session_new)
+    yield result
+
+
+def _round_ms(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def _not_found(request_id: str) -> dict:
     return {
         "request_id": request_id,
         "status": "not_found",
@@ -157,3 +607,19 @@ def get_watchdog_result(request_id: str) -> dict:
         "merge_explanation": None,
         "gemini_ms": None,
     }
+
+
+def get_watchdog_result(request_id: str) -> dict:
+    """Retrieve pending or completed watchdog result by request_id"""
+    result = WATCHDOG_RESULTS.get(request_id)
+    if result is not None:
+        return result
+    return _not_found(request_id)
+
+
+async def wait_watchdog_result(request_id: str, timeout: float) -> dict:
+    """Like get_watchdog_result, but waits up to `timeout` seconds for a pending audit"""
+    result = await WATCHDOG_RESULTS.wait(request_id, timeout)
+    if result is not None:
+        return result
+    return _not_found(request_id)
@@ -4,24 +4,31 @@ import time
 import uuid
 
 
-class HybridChatRequest(BaseModel):
-    prompt: Optional[str] = None
-    messages: Optional[List[ChatMessage]] = None
-    verify: Optional[bool] = False
-
-
 # OpenAI-compatible schemas
 class ChatMessage(BaseModel):
     role: str
     content: str
 
 
+class HybridChatRequest(BaseModel):
+    prompt: Optional[str] = None
+    messages: Optional[List[ChatMessage]] = None
+    verify: Optional[bool] = False
+    stream: Optional[bool] = False
+    temperature: Optional[float] = 0.7
+    max_tokens: Optional[int] = 1024
+    cache: Optional[bool] = True  # false bypasses the response cache
+    priority: Optional[str] = None  # interactive | verify | batch (rate-limit scheduling)
+    session_id: Optional[str] = None  # server keeps the history; send only the new turn
+
+
 class OpenAIChatRequest(BaseModel):
     model: str
     messages: List[ChatMessage]
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1024
     stream: Optional[bool] = False
+    cache: Optional[bool] = True
 
 
 class ChatCompletionChoice(BaseModel):
@@ -45,30 +52,61 @@ class OpenAIChatResponse(BaseModel):
     usage: ChatCompletionUsage
 
 
+class HedgeInfo(BaseModel):
+    fired: bool
+    winner: str  # primary | backup
+    deadline_ms: Optional[float] = None
+
+
 class TimingInfo(BaseModel):
     groq_ms: float
     total_ms: float
+    ttft_ms: Optional[float] = None  # streaming only, excludes queue_wait_ms
+    cache: Optional[str] = None  # hit | miss | bypass
+    coalesced: Optional[bool] = None  # answer shared with an identical in-flight request
+    hedge: Optional[HedgeInfo] = None  # set when ENABLE_HEDGING is on
+    queue_wait_ms: Optional[float] = None  # time held back by the Groq rate limiter
 
 
 class WatchdogInfo(BaseModel):
     enabled: bool
     reason: Optional[str] = None
-    status: Optional[str] = None  # pending | completed | skipped
+    status: Optional[str] = None  # pending | completed | skipped | shed
+
+
+class ContextInfo(BaseModel):
+    tokens_before: int
+    tokens_after: int
+    tokens_saved: int
+    summarized_messages: int
+    summary_ms: float
+
+
+class SessionInfo(BaseModel):
+    id: str
+    messages: int  # history length after this turn
+    new: bool  # unknown or expired id: history started fresh
 
 
 class HybridResponse(BaseModel):
     request_id: str
     primary_model: str
+    endpoint: Optional[str] = None  # upstream that served the answer
     confidence: float
     watchdog: WatchdogInfo
     content: str
     timing: TimingInfo
+    context: Optional[ContextInfo] = None  # set when history was compacted
+    session: Optional[SessionInfo] = None  # set for session requests
 
 
 class WatchdogResult(BaseModel):
     request_id: str
-    status: str
+    status: str  # pending | completed | shed | error | not_found
+    reason: Optional[str] = None
     gemini_status: Optional[str] = None
     final_answer: Optional[str] = None
     merge_explanation: Optional[str] = None
     gemini_ms: Optional[float] = None
+    cached: bool = False  # verdict replayed from the verdict cache, no Gemini call
+    error: Optional[str] = None  # the audit failed (status "error")
@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+from array import array
+from typing import Optional
+
+from cachetools import TTLCache
+
+# Interned roles: one byte per message instead of a str per message
+ROLES = ("system", "user", "assistant", "tool")
+_ROLE_IDS = {role: i for i, role in enumerate(ROLES)}
+
+
+class Session:
+    """
+    One conversation history, stored compactly:
+    - roles: one byte per message (index into ROLES)
+    - text: every message's UTF-8 content in one contiguous buffer
+    - ends: end offset of each message in `text`
+    """
+
+    __slots__ = ("roles", "ends", "text")
+
+    def __init__(self):
+        self.roles = array("B")
+        self.ends = array("L")
+        self.text = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.roles)
+
+    def append(self, role: str, content: str):
+        self.roles.append(_ROLE_IDS.get(role, _ROLE_IDS["user"]))
+        self.text += (content or "").encode("utf-8")
+        self.ends.append(len(self.text))
+
+    def messages(self) -> list:
+        out = []
+        start = 0
+        text = self.text
+        for role, end in zip(self.roles, self.ends):
+            out.append({"role": ROLES[role], "content": text[start:end].decode("utf-8")})
+            start = end
+        return out
+
+    def trim(self, max_messages: int):
+        """
+        Drop the oldest turns beyond `max_messages`, keeping a leading
+        system prompt. Trims to 3/4 of the limit so the buffer rebuild
+        is amortized over many appends.
+        """
+        if len(self) <= max_messages:
+            return
+        keep_system = 1 if self.roles and self.roles[0] == _ROLE_IDS["system"] else 0
+        drop_to = len(self) - max(max_messages * 3 // 4, 1) + keep_system
+        # Start the kept window on a user turn so it isn't answer-first
+        while drop_to < len(self) - 1 and self.roles[drop_to] != _ROLE_IDS["user"]:
+            drop_to += 1
+
+        cut = self.ends[drop_to - 1]
+        head = self.ends[0] if keep_system else 0
+        self.text = self.text[:head] + self.text[cut:]
+        shift = cut - head
+        self.roles = self.roles[:keep_system] + self.roles[drop_to:]
+        self.ends = self.ends[:keep_system] + array("L", (end - shift for end in self.ends[drop_to:]))
+
+    def nbytes(self) -> int:
+        return len(self.text) + len(self.roles) * self.roles.itemsize + len(self.ends) * self.ends.itemsize
+
+
+class SessionStore:
+    """
+    Server-side conversation histories keyed by client-chosen session_id.
+    Bounded by count (LRU) and idle time: every read or write resets the
+    session's TTL.
+    """
+
+    def __init__(self, maxsize: int = 10000, idle_ttl_s: float = 1800, max_messages: int = 200):
+        self._sessions = TTLCache(maxsize=maxsize, ttl=idle_ttl_s)
+        self._locks = {}  # session_id -> [asyncio.Lock, holders + waiters]
+        self.max_messages = max_messages
+        self.hits = 0
+        self.misses = 0
+
+    @contextlib.asynccontextmanager
+    async def lock(self, session_id: str):
+        """
+        Serialize turns of one session from history read to write-back, so
+        concurrent turns neither read the same history nor interleave.
+        Locks exist only while someone holds or waits for them.
+        """
+        entry = self._locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[session_id]
+
+    def history(self, session_id: str) -> tuple:
+        """Returns (messages so far, whether the session is new)"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            self.misses += 1
+            return [], True
+        self.hits += 1
+        self._sessions[session_id] = session  # refresh the idle TTL
+        return session.messages(), False
+
+    def append(self, session_id: str, messages: list):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session()
+        for message in messages:
+            session.append(message.get("role", "user"), message.get("content"))
+        session.trim(self.max_messages)
+        self._sessions[session_id] = session
+
+    def length(self, session_id: str) -> int:
+        session = self._sessions.get(session_id)
+        return len(session) if session is not None else 0
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        self._sessions.expire()
+        return {
+            "size": len(self._sessions),
+            "maxsize": self._sessions.maxsize,
+            "idle_ttl_s": self._sessions.ttl,
+            "bytes": sum(session.nbytes() for session in self._sessions.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def session_delta(packet: dict) -> Optional[list]:
+    """The new turn(s) a session request carries"""
+    if packet.get("messages"):
+        return list(packet["messages"])
+    if packet.get("prompt"):
+        return [{"role": "user", "content": packet["prompt"]}]
+    return None
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Only definitive verdicts are worth replaying; "unknown" / "error" are retried
+CACHEABLE_VERDICTS = ("ok", "corrected")
+
+# A hit only rewrites its LRU timestamp when older than this, so hot keys
+# don't turn every lookup into a write
+_TOUCH_INTERVAL_S = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+
+def _normalize(text: str) -> str:
+    # Same rule as the response cache: indentation in code still matters
+    return (text or "").replace("\r\n", "\n").strip()
+
+
+def verdict_key(messages: list, answer: str) -> str:
+    """
+    Stable hash of the normalized conversation and answer. The whole
+    conversation counts: the same last question means something else
+    after a different history.
+    """
+    normalized = [
+        ((m.get("role") or "").strip().lower(), _normalize(m.get("content")))
+        for m in messages
+    ]
+    raw = json.dumps([normalized, _normalize(answer)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class VerdictCache:
+    """
+    Persistent audit verdicts keyed by verdict_key, in a local SQLite file
+    so they survive restarts.
+    - entries expire `ttl_s` after they were stored
+    - beyond `maxsize` entries, the least recently used are deleted
+      (in one sweep down to 90% so pruning is amortized)
+    The database is opened on first use, so importing costs nothing.
+    Calls block on disk: from the event loop, run them via asyncio.to_thread
+    (a lock serializes the worker threads on the one connection).
+    """
+
+    def __init__(self, path: str, maxsize: int, ttl_s: float):
+        self.path = os.path.expanduser(path)
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._db = None
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(_SCHEMA)
+            db.execute("CREATE INDEX IF NOT EXISTS verdicts_used ON verdicts (used)")
+            db.execute("DELETE FROM verdicts WHERE created < ?", (time.time() - self.ttl_s,))
+            self._size = db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+            self._db = db
+        return self._db
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            try:
+                db = self._connect()
+                now = time.time()
+                row = db.execute(
+                    "SELECT result, used FROM verdicts WHERE key = ? AND created >= ?",
+                    (key, now - self.ttl_s),
+                ).fetchone()
+                if row is not None and now - row[1] > _TOUCH_INTERVAL_S:
+                    db.execute("UPDATE verdicts SET used = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                # A broken cache must never fail the request; fall back to auditing
+                logger.exception("Verdict cache read failed")
+                self.errors += 1
+                return None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            try:
+                db = self._connect()
+                now = time.time()
+                db.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, result, created, used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(result, ensure_ascii=False), now, now),
+                )
+                self._size += 1  # over-counts replacements; _prune recounts
+                self.writes += 1
+                if self._size > self.maxsize:
+                    self._prune(db, now)
+            except sqlite3.Error:
+                logger.exception("Verdict cache write failed")
+                self.errors += 1
+
+    def _prune(self, db: sqlite3.Connection, now: float):
+        db.execute("DELETE FROM verdicts WHERE created < ?", (now - self.ttl_s,))
+        keep = max(self.maxsize * 9 // 10, 1)
+        db.execute(
+            "DELETE FROM verdicts WHERE key IN "
+            "(SELECT key FROM verdicts ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (keep,),
+        )
+        self._size = db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "size": self._size if self._db is not None else None,  # None until first use
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,336 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from cachetools import TLRUCache
+
+from orchestrator import metrics
+
+logger = logging.getLogger(__name__)
+
+SHED_POLICIES = ("drop_new", "drop_oldest")
+
+
+class _CountingTLRUCache(TLRUCache):
+    """TLRUCache that counts LRU evictions and TTL expiries."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+        self.expirations = 0
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class WatchdogResultStore:
+    """
+    Bounded store for watchdog results.
+    - LRU eviction once maxsize entries are held
+    - per-entry TTL (pending entries use their own, shorter TTL)
+    - pending entries are created as soon as an audit is scheduled
+    - wait() lets any number of subscribers block until an entry leaves
+      "pending"; complete() wakes them all at once
+    """
+
+    def __init__(self, maxsize: int, ttl_s: float, pending_ttl_s: float):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.pending_ttl_s = pending_ttl_s
+        self._cache = _CountingTLRUCache(
+            maxsize=maxsize,
+            ttu=self._time_to_use,
+            timer=time.monotonic,
+        )
+        # request_id -> [asyncio.Event, subscriber count]
+        self._waiters = {}
+
+    def _time_to_use(self, _key, value, now):
+        if value["status"] == "pending":
+            return now + self.pending_ttl_s
+        return now + self.ttl_s
+
+    def mark_pending(self, request_id: str, reason: Optional[str] = None):
+        self._cache[request_id] = {
+            "request_id": request_id,
+            "status": "pending",
+            "reason": reason,
+            "gemini_status": None,
+            "final_answer": None,
+            "merge_explanation": None,
+            "gemini_ms": None,
+        }
+
+    def complete(self, request_id: str, result: dict):
+        self._cache[request_id] = {"request_id": request_id, **result}
+        waiter = self._waiters.pop(request_id, None)
+        if waiter is not None:
+            waiter[0].set()
+
+    def get(self, request_id: str) -> Optional[dict]:
+        return self._cache.get(request_id)
+
+    async def wait(self, request_id: str, timeout: float) -> Optional[dict]:
+        """
+        Return the entry once it is no longer pending, or the current
+        (possibly still pending) entry after `timeout` seconds.
+        """
+        result = self.get(request_id)
+        if result is None or result["status"] != "pending" or timeout <= 0:
+            return result
+
+        waiter = self._waiters.get(request_id)
+        if waiter is None:
+            waiter = self._waiters[request_id] = [asyncio.Event(), 0]
+        waiter[1] += 1
+        try:
+            await asyncio.wait_for(waiter[0].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiter[1] -= 1
+            if waiter[1] == 0 and self._waiters.get(request_id) is waiter:
+                del self._waiters[request_id]
+        return self.get(request_id)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "pending_ttl_s": self.pending_ttl_s,
+            "evictions": self._cache.evictions,
+            "expirations": self._cache.expirations,
+            "subscribed": len(self._waiters),
+        }
+
+
+@dataclass
+class AuditJob:
+    request_id: str
+    prompt: str
+    answer: str
+    reason: Optional[str] = None
+    features: Optional[tuple] = None  # confidence features, for calibration records
+    verdict_key: Optional[str] = None  # conversation + answer, for the verdict cache
+    model: Optional[str] = None  # upstream that answered, for metric labels
+    endpoint: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RunningStat:
+    """Count / mean / max of a latency series, in milliseconds."""
+
+    __slots__ = ("count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, value_ms: float):
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class WatchdogPool:
+    """
+    Supervised worker pool for Gemini audits.
+    - bounded queue; when full, the shed policy decides which job is dropped
+      ("drop_new" rejects the incoming job, "drop_oldest" evicts the head)
+    - fixed number of workers caps concurrent Gemini calls
+    - workers hold strong references, so audits cannot be garbage-collected
+    - each worker hands the handler up to batch_size jobs, waiting at most
+      batch_wait_ms for the batch to fill
+    - stop(drain=True) lets queued audits finish on shutdown
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[AuditJob]], Awaitable[None]],
+        workers: int,
+        queue_size: int,
+        shed_policy: str = "drop_new",
+        on_shed: Optional[Callable[[AuditJob], None]] = None,
+        on_error: Optional[Callable[[AuditJob, Exception], None]] = None,
+        batch_size: int = 1,
+        batch_wait_ms: float = 0.0,
+    ):
+        if shed_policy not in SHED_POLICIES:
+            raise ValueError(f"Unknown shed policy {shed_policy!r}, expected one of {SHED_POLICIES}")
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.shed_policy = shed_policy
+        self.on_shed = on_shed
+        self.on_error = on_error
+        self.batch_size = max(1, batch_size)
+        self.batch_wait_ms = batch_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self.submitted = 0
+        self.shed = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.fallbacks = 0
+        self.queue_wait = RunningStat()
+        self.audit_latency = RunningStat()
+        self.item_latency = RunningStat()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"watchdog-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    def submit(self, job: AuditJob) -> bool:
+        """Queue a job without blocking. Returns False if the job was shed."""
+        if not self.running:
+            self.start()
+
+        self.submitted += 1
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.shed_policy == "drop_oldest":
+            dropped = self._queue.get_nowait()
+            self._queue.task_done()
+            self._queue.put_nowait(job)
+            self._shed(dropped)
+            return True
+
+        self._shed(job)
+        return False
+
+    def _shed(self, job: AuditJob):
+        self.shed += 1
+        logger.warning(f"Watchdog queue full, shedding audit for {job.request_id}")
+        if self.on_shed:
+            self.on_shed(job)
+
+    async def _next_batch(self) -> List[AuditJob]:
+        jobs = [await self._queue.get()]
+        if self.batch_size == 1:
+            return jobs
+
+        deadline = time.monotonic() + self.batch_wait_ms / 1000
+        while len(jobs) < self.batch_size:
+            try:
+                jobs.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return jobs
+
+    async def _worker(self, index: int):
+        while True:
+            jobs = await self._next_batch()
+            try:
+                dispatched = time.monotonic()
+                for job in jobs:
+                    wait_s = dispatched - job.enqueued_at
+                    self.queue_wait.add(wait_s * 1000)
+                    metrics.WATCHDOG_QUEUE_WAIT.observe(wait_s)
+                await self.handler(jobs)
+                elapsed_ms = (time.monotonic() - dispatched) * 1000
+                self.audit_latency.add(elapsed_ms)
+                self.item_latency.add(elapsed_ms / len(jobs))
+                self.batches += 1
+                self.completed += len(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += len(jobs)
+                request_ids = ", ".join(job.request_id for job in jobs)
+                logger.error(f"Watchdog worker {index} failed on {request_ids}: {e}")
+                if self.on_error:
+                    # Subscribers would otherwise wait for a verdict that never comes
+                    for job in jobs:
+                        self.on_error(job, e)
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    async def stop(self, drain: bool = True, timeout: float = 10.0):
+        if not self.running:
+            return
+        if drain:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Watchdog drain timed out with {self._queue.qsize()} audits queued"
+                )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "shed_policy": self.shed_policy,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "shed": self.shed,
+            "queue_wait": self.queue_wait.snapshot(),
+            "gemini_latency": self.audit_latency.snapshot(),
+            "batch": {
+                "max_size": self.batch_size,
+                "wait_ms": self.batch_wait_ms,
+                "batches": self.batches,
+                "avg_size": round(self.completed / self.batches, 2) if self.batches else 0.0,
+                "fill_ratio": (
+                    round(self.completed / (self.batches * self.batch_size), 4)
+                    if self.batches else 0.0
+                ),
+                "fallbacks": self.fallbacks,
+                "item_latency": self.item_latency.snapshot(),
+            },
+        }
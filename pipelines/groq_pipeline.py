@@ -2,7 +2,7 @@
 title: Groq LLM Pipeline
 author: open-webui
 date: 2025-12-23
-version: 1.0
+version: 1.1
 license: MIT
 description: Direct Groq API pipeline using llama-3.3-70b-versatile
 requirements: groq, python-dotenv
@@ -11,8 +11,8 @@ requirements: groq, python-dotenv
 from typing import List, Union, Generator, Iterator
 from pydantic import BaseModel, Field
 import os
-import asyncio
-from groq import AsyncGroq
+import threading
+from groq import Groq
 
 
 class Pipeline:
@@ -40,13 +40,40 @@ class Pipeline:
         self.name = "Groq"
         self.valves = self.Valves()
         self.client = None
+        self._client_key = None
+        # pipe() runs on several threads at once; guards client / _client_key
+        self._client_lock = threading.Lock()
 
-    def get_groq_client(self):
-        """Initialize Groq client with API key from valves or environment"""
+    async def on_valves_updated(self):
+        # Rebuild the cached client only if the API key changed
+        api_key = self.valves.GROQ_API_KEY or os.getenv("GROQ_API_KEY")
+        with self._client_lock:
+            if self.client is not None and self._client_key != api_key:
+                self.client.close()
+                self.client = None
+
+    async def on_shutdown(self):
+        with self._client_lock:
+            if self.client is not None:
+                self.client.close()
+                self.client = None
+
+    def get_groq_client(self) -> Groq:
+        """
+        Long-lived Groq client with API key from valves or environment.
+        The sync client keeps its own connection pool, so no event loop is
+        built per message; it is only rebuilt when the API key changes.
+        """
         api_key = self.valves.GROQ_API_KEY or os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY not set in valves or environment")
-        return AsyncGroq(api_key=api_key)
+        with self._client_lock:
+            if self.client is None or self._client_key != api_key:
+                if self.client is not None:
+                    self.client.close()
+                self.client = Groq(api_key=api_key)
+                self._client_key = api_key
+            return self.client
 
     def pipelines(self) -> List[dict]:
         """Return available pipelines"""
@@ -69,37 +96,50 @@ class Pipeline:
         self, user_message: str, model_id: str, messages: List[dict], body: dict
     ) -> Union[str, Generator, Iterator]:
         """Process chat request through Groq"""
-        
+
         try:
-            # Initialize client
-            self.client = self.get_groq_client()
-            
+            client = self.get_groq_client()
+
             # Use the model_id if it's from our pipelines, otherwise use valve setting
             model = model_id if "groq" in model_id.lower() or "llama" in model_id.lower() or "mixtral" in model_id.lower() else self.valves.GROQ_MODEL
-            
-            # Run async call
-            result = asyncio.run(self._groq_call(messages, model))
-            return result
-            
+
+            if body.get("stream", True):
+                return self._groq_stream(client, messages, model)
+            return self._groq_call(client, messages, model)
+
         except Exception as e:
             return f"Error: {str(e)}"
 
-    async def _groq_call(self, messages: List[dict], model: str) -> str:
-        """Make async call to Groq API"""
-        
+    def _groq_messages(self, messages: List[dict]) -> List[dict]:
         # Convert OpenWebUI message format to Groq format
-        groq_messages = []
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            groq_messages.append({"role": role, "content": content})
-        
-        # Call Groq
-        chat_completion = await self.client.chat.completions.create(
-            messages=groq_messages,
+        return [
+            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+            for msg in messages
+        ]
+
+    def _groq_call(self, client: Groq, messages: List[dict], model: str) -> str:
+        """Make a buffered call to Groq API"""
+        chat_completion = client.chat.completions.create(
+            messages=self._groq_messages(messages),
             model=model,
             temperature=self.valves.TEMPERATURE,
             max_tokens=self.valves.MAX_TOKENS,
         )
-        
+
         return chat_completion.choices[0].message.content
+
+    def _groq_stream(self, client: Groq, messages: List[dict], model: str) -> Generator:
+        """Yield Groq deltas as they arrive"""
+        try:
+            stream = client.chat.completions.create(
+                messages=self._groq_messages(messages),
+                model=model,
+                temperature=self.valves.TEMPERATURE,
+                max_tokens=self.valves.MAX_TOKENS,
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            yield f"Error: {str(e)}"
@@ -2,7 +2,7 @@
 title: Hybrid LLM Pipeline (Groq + Gemini Watchdog)
 author: open-webui
 date: 2025-12-23
-version: 1.0
+version: 1.1
 license: MIT
 description: A hybrid LLM pipeline that uses Groq for fast responses with optional Gemini verification
 requirements: requests
@@ -10,6 +10,8 @@ requirements: requests
 
 from typing import List, Union, Generator, Iterator
 from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+import json
 import requests
 import os
 
@@ -28,12 +30,55 @@ class Pipeline:
             default=True,
             description="Display confidence scores in responses"
         )
+        STREAM: bool = Field(
+            default=True,
+            description="Stream tokens from the orchestrator as they are generated"
+        )
+        CONNECT_TIMEOUT: float = Field(
+            default=5.0,
+            description="Seconds to wait for a connection to the orchestrator"
+        )
+        READ_TIMEOUT: float = Field(
+            default=60.0,
+            description="Seconds to wait between bytes from the orchestrator"
+        )
+        POOL_SIZE: int = Field(
+            default=16,
+            description="Keep-alive connections held open to the orchestrator"
+        )
+        VERIFICATION_WAIT_S: float = Field(
+            default=0.0,
+            description="When streaming, wait up to this many seconds for the Gemini verdict and append it (0 = don't wait)"
+        )
 
     def __init__(self):
         self.type = "manifold"
         self.id = "hybrid_llm"
         self.name = "Hybrid LLM (Groq+Gemini)"
         self.valves = self.Valves()
+        self.session = None
+        self._session_pool_size = None
+
+    async def on_shutdown(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def get_session(self) -> requests.Session:
+        """Persistent keep-alive session, rebuilt only if the pool size valve changes"""
+        if self.session is None or self._session_pool_size != self.valves.POOL_SIZE:
+            if self.session is not None:
+                self.session.close()
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self.valves.POOL_SIZE,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.session = session
+            self._session_pool_size = self.valves.POOL_SIZE
+        return self.session
 
     def pipelines(self) -> List[dict]:
         """Return available pipelines - same as get_models for compatibility"""
@@ -48,48 +93,112 @@ class Pipeline:
             }
         ]
 
+    def _footer(self, result: dict) -> str:
+        """Confidence / timing / verification footer"""
+        confidence = result["confidence"]
+        timing = result["timing"]
+        watchdog = result["watchdog"]
+
+        metadata = f"\n\n---\n"
+        metadata += f"**Confidence:** {confidence} | "
+        metadata += f"**Response time:** {timing['groq_ms']:.0f}ms"
+
+        if watchdog["enabled"]:
+            metadata += f" | **Verification:** {watchdog['status']}"
+            if watchdog['status'] == 'pending':
+                request_id = result['request_id']
+                metadata += f" (follow `/watchdog/{request_id}/events`)"
+
+        return metadata
+
+    def _verification_note(self, request_id: str) -> str:
+        """Long-poll the watchdog and describe its verdict"""
+        try:
+            response = self.get_session().get(
+                f"{self.valves.HYBRID_ORCHESTRATOR_URL}/watchdog/{request_id}",
+                params={"wait": self.valves.VERIFICATION_WAIT_S},
+                timeout=(self.valves.CONNECT_TIMEOUT, self.valves.VERIFICATION_WAIT_S + self.valves.CONNECT_TIMEOUT),
+            )
+            response.raise_for_status()
+            result = response.json()
+        except requests.exceptions.RequestException as e:
+            return f"\n\n**Verification:** unavailable ({str(e)})"
+
+        if result["status"] != "completed":
+            return f"\n\n**Verification:** {result['status']}"
+        if result["gemini_status"] == "ok":
+            return "\n\n**Verification:** verified by Gemini"
+        if result["gemini_status"] == "corrected":
+            return f"\n\n**Gemini correction:** {result['final_answer']}"
+        return f"\n\n**Verification:** {result['gemini_status']}"
+
     def pipe(
         self, user_message: str, model_id: str, messages: List[dict], body: dict
     ) -> Union[str, Generator, Iterator]:
         """Process the chat request through the hybrid orchestrator"""
-        
+
+        payload = {
+            "messages": messages,  # Pass full conversation context
+            "verify": self.valves.ENABLE_VERIFICATION,
+            "stream": self.valves.STREAM,
+        }
+
+        if self.valves.STREAM:
+            return self._stream(payload)
+
         # Call the hybrid orchestrator with full message context
         try:
-            response = requests.post(
+            response = self.get_session().post(
                 f"{self.valves.HYBRID_ORCHESTRATOR_URL}/hybrid-chat",
-                json={
-                    "messages": messages,  # Pass full conversation context
-                    "verify": self.valves.ENABLE_VERIFICATION
-                },
-                timeout=30
+                json=payload,
+                timeout=(self.valves.CONNECT_TIMEOUT, self.valves.READ_TIMEOUT),
             )
             response.raise_for_status()
             result = response.json()
-            
+
             # Build the response
             answer = result["content"]
-            
+
             # Add metadata if enabled
             if self.valves.SHOW_CONFIDENCE:
-                confidence = result["confidence"]
-                timing = result["timing"]
-                watchdog = result["watchdog"]
-                
-                metadata = f"\n\n---\n"
-                metadata += f"**Confidence:** {confidence} | "
-                metadata += f"**Response time:** {timing['groq_ms']:.0f}ms"
-                
-                if watchdog["enabled"]:
-                    metadata += f" | **Verification:** {watchdog['status']}"
-                    if watchdog['status'] == 'pending':
-                        request_id = result['request_id']
-                        metadata += f" (check `/watchdog/{request_id}` later)"
-                
-                answer = answer + metadata
-            
+                answer = answer + self._footer(result)
+
             return answer
-            
+
         except requests.exceptions.RequestException as e:
             return f"Error calling hybrid orchestrator: {str(e)}"
         except Exception as e:
             return f"Unexpected error: {str(e)}"
+
+    def _stream(self, payload: dict) -> Generator:
+        """Forward the orchestrator's SSE token stream as it arrives"""
+        try:
+            with self.get_session().post(
+                f"{self.valves.HYBRID_ORCHESTRATOR_URL}/hybrid-chat",
+                json=payload,
+                stream=True,
+                timeout=(self.valves.CONNECT_TIMEOUT, self.valves.READ_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+
+                    event = json.loads(data)
+                    if "delta" in event:
+                        yield event["delta"]
+                    elif "error" in event:
+                        yield f"\n\nError from hybrid orchestrator: {event['error']}"
+                    elif event.get("done"):
+                        if self.valves.SHOW_CONFIDENCE:
+                            yield self._footer(event)
+                        if self.valves.VERIFICATION_WAIT_S > 0 and event["watchdog"]["status"] == "pending":
+                            yield self._verification_note(event["request_id"])
+
+        except requests.exceptions.RequestException as e:
+            yield f"Error calling hybrid orchestrator: {str(e)}"
+        except Exception as e:
+            yield f"Unexpected error: {str(e)}"
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token). No tokenizer dependency."""
+    return len(text) // 4 + 1
+
+
+def messages_tokens(messages: list) -> int:
+    # ~4 tokens of per-message framing
+    return sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
+
+
+def _hash_messages(messages: list) -> str:
+    raw = json.dumps(
+        [(m.get("role"), m.get("content")) for m in messages],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ContextCompactor:
+    """
+    Keeps long chat histories inside a token budget.
+    - leading system messages and the last K user turns are kept verbatim
+    - older turns are replaced by one rolling summary message
+    - summaries are cached per conversation and extended incrementally,
+      so each turn only summarizes the messages that newly fell out of
+      the verbatim window
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str, list], Awaitable[str]],
+        budget_tokens: int,
+        keep_last_turns: int,
+        cache_size: int = 1024,
+        cache_ttl_s: float = 3600,
+    ):
+        self.summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.keep_last_turns = keep_last_turns
+        # conversation id -> (covered message count, covered prefix hash, summary)
+        self._summaries = TTLCache(maxsize=cache_size, ttl=cache_ttl_s)
+        self.compactions = 0
+        self.incremental = 0
+        self.failures = 0
+        self.tokens_saved = 0
+
+    def _split(self, messages: list) -> tuple:
+        """(leading system messages, older turns, verbatim tail)"""
+        head = 0
+        while head < len(messages) and messages[head].get("role") == "system":
+            head += 1
+        system, dialog = messages[:head], messages[head:]
+
+        cut = len(dialog)
+        turns = 0
+        for i in range(len(dialog) - 1, -1, -1):
+            if dialog[i].get("role") == "user":
+                turns += 1
+                cut = i
+                if turns == self.keep_last_turns:
+                    break
+        return system, dialog[:cut], dialog[cut:]
+
+    async def compact(self, messages: list) -> tuple:
+        """Returns (messages to send, context info dict or None)"""
+        tokens_before = messages_tokens(messages)
+        if tokens_before <= self.budget_tokens:
+            return messages, None
+
+        system, older, tail = self._split(messages)
+        if not older:
+            return messages, None
+
+        start = time.time()
+        conversation_id = _hash_messages(system + older[:1])
+        cached = self._summaries.get(conversation_id)
+
+        previous_summary, covered = "", 0
+        if cached is not None:
+            covered_count, covered_hash, summary = cached
+            if covered_count <= len(older) and _hash_messages(older[:covered_count]) == covered_hash:
+                previous_summary, covered = summary, covered_count
+
+        summary = previous_summary
+        if covered < len(older):
+            try:
+                summary = await self.summarize(previous_summary, older[covered:])
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Context summarization failed, sending full history: {e}")
+                return messages, None
+            self._summaries[conversation_id] = (len(older), _hash_messages(older), summary)
+            if covered:
+                self.incremental += 1
+
+        compacted = system + [{"role": "system", "content": SUMMARY_PREFIX + summary}] + tail
+        tokens_after = messages_tokens(compacted)
+        saved = max(tokens_before - tokens_after, 0)
+        self.compactions += 1
+        self.tokens_saved += saved
+
+        return compacted, {
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": saved,
+            "summarized_messages": len(older),
+            "summary_ms": round((time.time() - start) * 1000, 2),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "budget_tokens": self.budget_tokens,
+            "keep_last_turns": self.keep_last_turns,
+            "cached_summaries": len(self._summaries),
+            "compactions": self.compactions,
+            "incremental_updates": self.incremental,
+            "failures": self.failures,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+async def groq_summarize(previous_summary: str, messages: list, model: Optional[str] = None) -> str:
+    """Fold `messages` into `previous_summary` using a (small) Groq model."""
+    from adapters.groq import groq_infer
+    from config import settings
+
+    transcript = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in messages)
+    prompt = (
+        (f"EXISTING SUMMARY:\n{previous_summary}\n\n" if previous_summary else "")
+        + f"NEW MESSAGES:\n{transcript}"
+    )
+    summary, _ = await groq_infer(
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You maintain a running summary of a chat. Merge the new messages "
+                    "into the existing summary. Keep facts, decisions, names, numbers "
+                    "and code identifiers. Drop pleasantries. Be concise."
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.0,
+        max_tokens=settings.CONTEXT_SUMMARY_MAX_TOKENS,
+        model=model or settings.CONTEXT_SUMMARY_MODEL,
+    )
+    return summary.strip()
@@ -4,7 +4,7 @@ import signal
 import sys
 from typing import List
 from pydantic import BaseModel, Field
-from groq import Groq
+from groq import AsyncGroq, Groq
 from config import Config
 from colorama import Fore, init
 
@@ -37,59 +37,90 @@ class Architect:
         Config.validate()
         print(f"{Fore.CYAN}[System] Hardware verified. Root: {Config.PROJECT_ROOT}")
         self.client = Groq(api_key=Config.GROQ_API_KEY)
+        self.async_client = AsyncGroq(api_key=Config.GROQ_API_KEY)
         self.model = "llama-3.3-70b-versatile"
+        self.temperature = 0.2
+
+    def _messages(self, user_query: str) -> list:
+        # Added clearer schema instructions to the prompt.
+        schema_desc = (
+            "JSON Schema required:\n"
+            "{\n"
+            '  "analysis": "string",\n'
+            '  "steps": [{"id": int, "action": "string", "details": "string"}],\n'
+            '  "estimated_complexity": "string",\n'
+            '  "safety_flag": boolean\n'
+            "}"
+        )
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are The Architect. You plan software execution steps. "
+                    "Output a valid, flat JSON object matching the schema. "
+                    "Do NOT wrap the output in a key like 'execution_plan'.\n\n"
+                    f"{schema_desc}"
+                ),
+            },
+            {
+                "role": "user",
+                "content": user_query,
+            },
+        ]
+
+    def _parse_plan(self, raw_content: str) -> dict:
+        data = json.loads(raw_content)
+
+        # If the model wraps the output in a known key, unwrap it.
+        if "execution_plan" in data:
+            data = data["execution_plan"]
+        elif "plan" in data:
+            data = data["plan"]
+        elif "response" in data:
+            data = data["response"]
+
+        return ExecutionPlan(**data).model_dump(mode="json")
 
     def create_plan(self, user_query: str) -> dict:
         print(f"{Fore.CYAN}[Architect] Analyzing request via Groq Cloud...")
         start_time = time.time()
+        raw_content = None
 
         try:
-            # Added clearer schema instructions to the prompt.
-            schema_desc = (
-                "JSON Schema required:\n"
-                "{\n"
-                '  "analysis": "string",\n'
-                '  "steps": [{"id": int, "action": "string", "details": "string"}],\n'
-                '  "estimated_complexity": "string",\n'
-                '  "safety_flag": boolean\n'
-                "}"
-            )
-
             chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are The Architect. You plan software execution steps. "
-                            "Output a valid, flat JSON object matching the schema. "
-                            "Do NOT wrap the output in a key like 'execution_plan'.\n\n"
-                            f"{schema_desc}"
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": user_query,
-                    },
-                ],
+                messages=self._messages(user_query),
                 model=self.model,
-                temperature=0.2,
+                temperature=self.temperature,
                 response_format={"type": "json_object"},
             )
 
             raw_content = chat_completion.choices[0].message.content
-            data = json.loads(raw_content)
+            plan = self._parse_plan(raw_content)
+            print(f"{Fore.GREEN}[Architect] Plan created in {time.time() - start_time:.2f}s")
+            return plan
 
-            # If the model wraps the output in a known key, unwrap it.
-            if "execution_plan" in data:
-                data = data["execution_plan"]
-            elif "plan" in data:
-                data = data["plan"]
-            elif "response" in data:
-                data = data["response"]
+        except Exception as e:
+            print(f"{Fore.RED}[Architect] Planning Failed: {e}")
+            print(f"{Fore.RED}Raw Output was: {raw_content}")
+            raise e
 
-            plan = ExecutionPlan(**data)
+    async def acreate_plan(self, user_query: str) -> dict:
+        """Non-blocking create_plan, so many jobs can plan concurrently."""
+        start_time = time.time()
+        raw_content = None
+
+        try:
+            chat_completion = await self.async_client.chat.completions.create(
+                messages=self._messages(user_query),
+                model=self.model,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+            )
+
+            raw_content = chat_completion.choices[0].message.content
+            plan = self._parse_plan(raw_content)
             print(f"{Fore.GREEN}[Architect] Plan created in {time.time() - start_time:.2f}s")
-            return plan.model_dump(mode="json")
+            return plan
 
         except Exception as e:
             print(f"{Fore.RED}[Architect] Planning Failed: {e}")
@@ -4,6 +4,7 @@ import time
 from pathlib import Path
 from openai import OpenAI
 from config import Config
+from code_stream import CodeRejected, StreamChecker
 from colorama import Fore, init
 
 init(autoreset=True)
@@ -37,12 +38,22 @@ class Builder:
         self.model = "local-model"
 
     def load_latest_plan(self) -> tuple[dict, Path]:
-        """Finds the most recent plan in the artifacts folder."""
-        files = list(Config.ARTIFACTS_DIR.glob("plan_*.json"))
-        if not files:
-            raise FileNotFoundError("No Architect plans found in artifacts/")
+        """Finds the most recent plan via the artifact manifest."""
+        from manifest import open_manifest
 
-        latest_file = max(files, key=os.path.getctime)
+        manifest = open_manifest()
+        try:
+            record = manifest.latest("plan")
+        finally:
+            manifest.close()
+        if record:
+            latest_file = Config.ARTIFACTS_DIR / record["plan_path"]
+        else:
+            # Plans written before the manifest existed
+            files = list(Config.ARTIFACTS_DIR.glob("plan_*.json"))
+            if not files:
+                raise FileNotFoundError("No Architect plans found in artifacts/")
+            latest_file = max(files, key=os.path.getctime)
         print(f"{Fore.CYAN}[Builder] Loaded plan: {latest_file.name}")
 
         with open(latest_file, "r") as f:
@@ -51,6 +62,10 @@ class Builder:
     def execute_plan(
         self, plan_data: dict, plan_name: str | None = None, allow_network: bool = False
     ) -> Path:
+        code = self.generate_code(plan_data, allow_network)
+        return self.save_artifact(code, plan_name)
+
+    def generate_code(self, plan_data: dict, allow_network: bool = False) -> str:
         print(f"{Fore.CYAN}[Builder] Spooling up GPU...")
 
         messages = [
@@ -94,33 +109,42 @@ class Builder:
                 temperature=0.1,
                 stream=True,
             )
-
-            print(f"{Fore.GREEN}[Builder] Generating Code:\n")
-
-            full_code = ""
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    print(content, end="", flush=True)
-                    full_code += content
-            return self.save_artifact(full_code, plan_name)
-
         except Exception as e:
             print(f"\n{Fore.RED}[Builder] GPU Connection Failed: {e}")
             print(f"{Fore.YELLOW}Tip: Is LM Studio Server running on port 1234?")
             raise e
 
+        print(f"{Fore.GREEN}[Builder] Generating Code:\n")
+        checker = StreamChecker(allow_network)
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    print(content, end="", flush=True)
+                    checker.feed(content)
+                    if checker.done:
+                        break  # closing fence: the rest is commentary
+            return checker.finish()
+        except CodeRejected as e:
+            print(f"\n{Fore.RED}[Builder] Generation aborted: {e}")
+            raise
+        finally:
+            # Closing the connection stops the local model generating for nothing
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
     def save_artifact(self, code: str, original_plan_name: str | None) -> Path:
-        timestamp = None
+        # plan_<suffix>.json -> output_<suffix>.py (suffix is a timestamp or a job id)
+        suffix = None
         if original_plan_name and original_plan_name.startswith("plan_"):
-            try:
-                timestamp = int(original_plan_name.split("_")[1].split(".")[0])
-            except (IndexError, ValueError):
-                timestamp = None
+            suffix = Path(original_plan_name).stem[len("plan_"):] or None
 
-        if timestamp is None:
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"output_{timestamp}.py"
+        if suffix is None:
+            suffix = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"output_{suffix}.py"
         save_path = Config.ARTIFACTS_DIR / filename
 
         with open(save_path, "w") as f:
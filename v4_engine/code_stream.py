@@ -0,0 +1,158 @@
+"""
+Incremental checks on the Builder's streamed code.
+
+The stream is consumed line by line into a list buffer (no quadratic
+string concatenation). Markdown fences are stripped as they appear, and
+every few dozen lines the complete top-level blocks received so far are
+run through ast.parse and, without network access, scanned for network
+imports. A bad generation raises CodeRejected mid-stream, so the caller
+can drop it and retry right away instead of waiting for the whole output.
+"""
+
+import ast
+
+# Top-level modules (or module prefixes) that only exist to reach the network
+NETWORK_MODULES = (
+    "requests",
+    "httpx",
+    "aiohttp",
+    "urllib3",
+    "urllib.request",
+    "http.client",
+    "socket",
+    "websocket",
+    "websockets",
+    "ftplib",
+    "smtplib",
+    "telnetlib",
+    "paramiko",
+)
+
+# Column-0 lines that continue the previous statement instead of starting one
+_CONTINUATIONS = ("else", "elif", "except", "finally", ")", "]", "}")
+
+# SyntaxErrors that only mean "not finished yet" (e.g. a docstring spanning blocks)
+_INCOMPLETE = ("was never closed", "unterminated triple-quoted", "unexpected EOF")
+
+
+class CodeRejected(ValueError):
+    """The generated code failed a stream check (nothing transient: retry at once)."""
+
+
+def _is_fence(line: str) -> bool:
+    return line.lstrip().startswith("```")
+
+
+def _network_imports(tree: ast.AST) -> list:
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            if any(name == module or name.startswith(module + ".") for module in NETWORK_MODULES):
+                found.append(name)
+                break
+    return found
+
+
+class StreamChecker:
+    """
+    Feed streamed text with feed(); call finish() for the code.
+    `done` turns true once a closing fence ends the code block: whatever
+    the model says after it is not code, so the caller can stop reading.
+    """
+
+    def __init__(self, allow_network: bool = False, check_lines: int = 20):
+        self.allow_network = allow_network
+        self.check_lines = check_lines
+        self.done = False
+        self._partial = []  # chunks of the current, unterminated line
+        self._lines = []  # accepted code lines
+        self._checked = 0  # _lines[:_checked] already parsed
+        self._last_top = ""  # last non-indented code line
+        self._fenced = False
+
+    def feed(self, text: str):
+        if self.done:
+            return
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end < 0:
+                if start < len(text):
+                    self._partial.append(text[start:])
+                return
+            self._partial.append(text[start:end])
+            line = "".join(self._partial)
+            self._partial = []
+            self._line(line)
+            if self.done:
+                return
+            start = end + 1
+
+    def _line(self, line: str):
+        if _is_fence(line):
+            if self._fenced or self._is_code_so_far():
+                # Closing fence, or a stray one after unfenced code
+                self.done = True
+            else:
+                # Opening fence: anything before it was prose ("Here is the code:")
+                self._fenced = True
+                self._lines = []
+                self._checked = 0
+                self._last_top = ""
+            return
+        top_level = bool(line.strip()) and line[0] not in " \t#"
+        if top_level and len(self._lines) - self._checked >= self.check_lines and self._starts_block(line):
+            self._check(len(self._lines), final=False)
+        if top_level:
+            self._last_top = line
+        self._lines.append(line)
+
+    def _is_code_so_far(self) -> bool:
+        """True if the lines collected before a fence are Python, not prose"""
+        if not any(line.strip() for line in self._lines):
+            return False
+        try:
+            ast.parse("\n".join(self._lines[self._checked:]))
+        except SyntaxError:
+            return False
+        return True
+
+    def _starts_block(self, line: str) -> bool:
+        """True if the top-level `line` begins a new statement"""
+        if line.startswith(_CONTINUATIONS):
+            return False
+        # A decorator belongs to the def / class that follows it
+        return not self._last_top.startswith("@") and not self._last_top.rstrip().endswith("\\")
+
+    def _check(self, upto: int, final: bool):
+        source = "\n".join(self._lines[self._checked:upto])
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            if not final and any(reason in (e.msg or "") for reason in _INCOMPLETE):
+                return  # re-parsed together with the next block
+            lineno = self._checked + (e.lineno or 1)
+            raise CodeRejected(f"syntax error at line {lineno}: {e.msg}")
+        if not self.allow_network:
+            imports = _network_imports(tree)
+            if imports:
+                raise CodeRejected(f"network import without network access: {', '.join(imports)}")
+        self._checked = upto
+
+    def finish(self) -> str:
+        """Check the remainder and return the code without fences."""
+        if self._partial and not self.done:
+            line = "".join(self._partial)
+            self._partial = []
+            self._line(line)
+        self._check(len(self._lines), final=True)
+        code = "\n".join(self._lines).strip("\n")
+        if not code:
+            raise CodeRejected("no code in the response")
+        return code + "\n"
@@ -25,6 +25,20 @@ class Config:
     # For LM Studio, we just need a placeholder
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "lm-studio")
 
+    # Job pipeline (jobs.py): workers per stage
+    PLANNER_CONCURRENCY = int(os.getenv("V4_PLANNER_CONCURRENCY", "4"))  # concurrent Groq calls
+    BUILDER_CONCURRENCY = int(os.getenv("V4_BUILDER_CONCURRENCY", "1"))  # local GPU capacity
+    EXECUTOR_WORKERS = int(os.getenv("V4_EXECUTOR_WORKERS", "2"))
+
+    # Sandbox (sandbox.py): docker | local (warm pools) | cold (docker run --rm per script)
+    SANDBOX_BACKEND = os.getenv("V4_SANDBOX_BACKEND", "docker")
+    SANDBOX_MAX_RUNS = int(os.getenv("V4_SANDBOX_MAX_RUNS", "50"))  # recycle a warm worker after N runs
+    SANDBOX_CPU_S = int(os.getenv("V4_SANDBOX_CPU_S", "60"))
+    SANDBOX_MEMORY_MB = int(os.getenv("V4_SANDBOX_MEMORY_MB", "1024"))
+    SANDBOX_PRELOAD = os.getenv(
+        "V4_SANDBOX_PRELOAD", "numpy,pandas,matplotlib.pyplot,requests,bs4"
+    )
+
     @classmethod
     def validate(cls):
         required_dirs = [cls.MODELS_DIR, cls.ARTIFACTS_DIR]
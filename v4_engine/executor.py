@@ -2,26 +2,75 @@ import subprocess
 import os
 from pathlib import Path
 from config import Config
+from sandbox import SandboxLimits, SandboxPool, make_backend
 from colorama import Fore, init
 
 init(autoreset=True)
 
 
+def sandbox_failure(returncode) -> str:
+    """Error message for a run that did not exit 0"""
+    if returncode is None:
+        return "sandbox did not run or timed out"
+    return f"sandbox exit code {returncode}"
+
+
 class Executor:
-    def __init__(self):
+    def __init__(self, backend: str | None = None):
         Config.validate()
         self.image = "v4-sandbox"  # Prebuilt sandbox image with common libs
+        self.backend = backend or Config.SANDBOX_BACKEND
+        self.pool = None
+        if self.backend != "cold":
+            # Warm workers with the heavy libraries already imported
+            self.pool = SandboxPool(
+                make_backend(self.backend),
+                size=Config.EXECUTOR_WORKERS,
+                max_runs=Config.SANDBOX_MAX_RUNS,
+            )
 
     def run_artifact(
         self, script_filename: str, timeout: int = 30, allow_network: bool = False
-    ):
+    ) -> int | None:
+        """Returns the script's exit code, or None if it could not run or timed out."""
         # Full path to the generated script in your artifacts folder
         script_path = Config.ARTIFACTS_DIR / script_filename
 
         if not script_path.exists():
             print(f"{Fore.RED}[Executor] Script not found: {script_filename}")
-            return
+            return None
+
+        if self.pool is None:
+            return self._run_cold(script_filename, timeout, allow_network)
+
+        print(f"{Fore.YELLOW}[Executor] Running {script_filename} in warm {self.backend} sandbox...")
+        limits = SandboxLimits(
+            cpu_s=Config.SANDBOX_CPU_S, memory_mb=Config.SANDBOX_MEMORY_MB, wall_s=timeout
+        )
+        try:
+            result = self.pool.run(script_path, allow_network=allow_network, limits=limits)
+        except Exception as e:
+            print(f"{Fore.RED}[Executor] Sandbox Failed: {e}")
+            return None
 
+        print(f"{Fore.GREEN}--- SANDBOX OUTPUT ---")
+        print(result.stdout)
+
+        if result.stderr:
+            print(f"{Fore.RED}--- SANDBOX ERRORS ---")
+            print(result.stderr)
+
+        if result.timed_out:
+            print(
+                f"{Fore.RED}[Executor] CRITICAL: Script timed out (Infinite loop protection)."
+            )
+            return None
+        if result.signal == "SIGXCPU":
+            print(f"{Fore.RED}[Executor] CPU limit ({Config.SANDBOX_CPU_S}s) exceeded.")
+        print(f"{Fore.CYAN}[Executor] Files written to: {result.workdir}")
+        return result.returncode
+
+    def _run_cold(self, script_filename: str, timeout: int, allow_network: bool) -> int | None:
         print(f"{Fore.YELLOW}[Executor] Launching Sandbox for {script_filename}...")
 
         # Docker Command Construction
@@ -53,6 +102,7 @@ class Executor:
             if result.stderr:
                 print(f"{Fore.RED}--- SANDBOX ERRORS ---")
                 print(result.stderr)
+            return result.returncode
 
         except subprocess.TimeoutExpired:
             print(
@@ -60,17 +110,29 @@ class Executor:
             )
         except Exception as e:
             print(f"{Fore.RED}[Executor] Sandbox Failed: {e}")
+        return None
+
+    def warm(self, allow_network: bool = False):
+        """Start sandbox workers now so their warm-up overlaps planning / building."""
+        if self.pool is not None:
+            self.pool.warm(allow_network)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
 
 
 if __name__ == "__main__":
-    # Test with the last generated file (example: output_1766729250.py)
-    # You can find the filename in your artifacts folder
-    import glob
+    # Test with the last generated script recorded in the artifact manifest
+    from manifest import open_manifest
 
-    files = glob.glob(str(Config.ARTIFACTS_DIR / "output_*.py"))
-    if files:
-        latest_output = os.path.basename(max(files, key=os.path.getctime))
+    manifest = open_manifest()
+    record = manifest.latest("code")
+    manifest.close()
+    if record:
+        latest_output = record["code_path"]
         exec = Executor()
         exec.run_artifact(latest_output)
+        exec.close()
     else:
         print("No output scripts found to execute.")
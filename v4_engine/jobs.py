@@ -0,0 +1,390 @@
+"""
+V4 Engine job pipeline - many requests, overlapping stages.
+
+Each request becomes a Job that moves through three queues, each with its
+own worker pool:
+    1. planning  (async Groq, Config.PLANNER_CONCURRENCY at once)
+    2. building  (local GPU, Config.BUILDER_CONCURRENCY at once)
+    3. executing (sandbox, Config.EXECUTOR_WORKERS at once)
+
+While one job builds on the GPU, others plan against Groq or run in the
+sandbox. Every job records how long it waited in each stage's queue and
+how long the stage itself took.
+
+Plans and code come from the content-addressed StageCache when the same
+inputs were built before; a job whose code is cached skips the GPU queue.
+
+Usage:
+    python jobs.py "Create a weather app" "Build a todo list"
+    python jobs.py --file requests.txt --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from colorama import Fore, init
+
+from config import Config
+from executor import sandbox_failure
+from manifest import Manifest, new_job_id, open_manifest
+from retry import retry_wait
+from stage_cache import StageCache, code_key, plan_key
+
+init(autoreset=True)
+
+STAGES = ("planning", "building", "executing")
+
+
+@dataclass
+class Job:
+    request: str
+    dry_run: bool = False
+    timeout: int = 120
+    retries: int = 3
+    allow_network: bool = False
+    use_cache: bool = True
+    id: str = field(default_factory=new_job_id)
+    status: str = "queued"  # queued | planning | building | executing | done | failed
+    plan: Optional[dict] = None
+    plan_path: Optional[Path] = None
+    artifact_path: Optional[Path] = None
+    code_key: Optional[str] = None
+    returncode: Optional[int] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    # stage -> {"queued_at", "started_at", "finished_at"} (monotonic seconds)
+    stages: dict = field(default_factory=dict)
+    cache: dict = field(default_factory=dict)  # "plan" / "code" -> hit | miss | shared | bypass
+
+    def snapshot(self) -> dict:
+        stages = {}
+        for stage, marks in self.stages.items():
+            started = marks.get("started_at")
+            finished = marks.get("finished_at")
+            stages[stage] = {
+                "queue_ms": round((started - marks["queued_at"]) * 1000, 1) if started else None,
+                "run_ms": round((finished - started) * 1000, 1) if started and finished else None,
+            }
+        end = self.finished_at or time.monotonic()
+        return {
+            "id": self.id,
+            "request": self.request,
+            "status": self.status,
+            "plan": str(self.plan_path) if self.plan_path else None,
+            "artifact": str(self.artifact_path) if self.artifact_path else None,
+            "returncode": self.returncode,
+            "error": self.error,
+            "total_ms": round((end - self.submitted_at) * 1000, 1),
+            "stages": stages,
+            "cache": dict(self.cache),
+        }
+
+
+class JobEngine:
+    """
+    Staged pipeline over Architect / Builder / Executor.
+    Blocking stages (LM Studio streaming, docker run) run in threads so
+    they never stall the event loop the planners share.
+    """
+
+    def __init__(
+        self,
+        architect,
+        builder,
+        executor,
+        planners: int = Config.PLANNER_CONCURRENCY,
+        builders: int = Config.BUILDER_CONCURRENCY,
+        executors: int = Config.EXECUTOR_WORKERS,
+        cache: Optional[StageCache] = None,
+        manifest: Optional[Manifest] = None,
+    ):
+        self.architect = architect
+        self.builder = builder
+        self.executor = executor
+        self.cache = cache or StageCache(Config.ARTIFACTS_DIR)
+        self.manifest = manifest or open_manifest()
+        self.workers = {"planning": planners, "building": builders, "executing": executors}
+        self.handlers = {
+            "planning": self._plan,
+            "building": self._build,
+            "executing": self._execute,
+        }
+        self.jobs = {}
+        self._queues = {stage: asyncio.Queue() for stage in STAGES}
+        self._done = {}  # job id -> asyncio.Event
+        self._planning = {}  # plan key -> task, shared by identical concurrent jobs
+        self._tasks = []
+
+    def start(self):
+        for stage in STAGES:
+            for _ in range(max(self.workers[stage], 1)):
+                self._tasks.append(asyncio.create_task(self._worker(stage)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: str, **options) -> Job:
+        job = Job(request=request, **options)
+        self.jobs[job.id] = job
+        self._done[job.id] = asyncio.Event()
+        self.manifest.start_job(job.id, job.request)
+        self._enqueue(job, "planning")
+        return job
+
+    async def wait(self, job_id: str) -> Job:
+        await self._done[job_id].wait()
+        return self.jobs[job_id]
+
+    def status(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def stats(self) -> dict:
+        by_status = {}
+        for job in self.jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        stages = {}
+        for stage in STAGES:
+            waits = [
+                job.stages[stage]["started_at"] - job.stages[stage]["queued_at"]
+                for job in self.jobs.values()
+                if job.stages.get(stage, {}).get("started_at")
+            ]
+            stages[stage] = {
+                "workers": self.workers[stage],
+                "queued": self._queues[stage].qsize(),
+                "started": len(waits),
+                "mean_queue_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else None,
+                "max_queue_ms": round(max(waits) * 1000, 1) if waits else None,
+            }
+        return {"jobs": by_status, "stages": stages, "cache": self.cache.stats()}
+
+    def _enqueue(self, job: Job, stage: str):
+        job.stages[stage] = {"queued_at": time.monotonic()}
+        self._queues[stage].put_nowait(job)
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.monotonic()
+        snapshot = job.snapshot()
+        self.manifest.update_job(
+            job.id,
+            status=status,
+            error=error,
+            returncode=job.returncode,
+            timings={"total_ms": snapshot["total_ms"], **snapshot["stages"]},
+            cache=job.cache,
+        )
+        self._done[job.id].set()
+        color = Fore.GREEN if status == "done" else Fore.RED
+        print(f"{color}[Jobs] {job.id} {status}" + (f": {error}" if error else ""))
+
+    async def _worker(self, stage: str):
+        queue = self._queues[stage]
+        handler = self.handlers[stage]
+        while True:
+            job = await queue.get()
+            marks = job.stages[stage]
+            marks["started_at"] = time.monotonic()
+            job.status = stage
+            self.manifest.update_job(job.id, status=stage)
+            try:
+                next_stage = await handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                marks["finished_at"] = time.monotonic()
+                self._finish(job, "failed", f"{stage}: {e}")
+            else:
+                marks["finished_at"] = time.monotonic()
+                if next_stage:
+                    self._enqueue(job, next_stage)
+                else:
+                    self._finish(job, "done")
+            finally:
+                queue.task_done()
+
+    async def _retry(self, make_call, stage_name: str, max_attempts: int):
+        """Async twin of Orchestrator._retry: backoff without blocking other jobs."""
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return await make_call()
+            except Exception as e:
+                if attempt == max_attempts:
+                    raise RuntimeError(
+                        f"{stage_name} failed after {max_attempts} attempts: {e}"
+                    )
+                wait = retry_wait(e, attempt)
+                print(
+                    f"{Fore.YELLOW}WARN: {stage_name} attempt {attempt}/{max_attempts} "
+                    f"failed, retrying in {wait:.1f}s..."
+                )
+                await asyncio.sleep(wait)
+
+    def _cached(self, job: Job, kind: str, lookup, key: str):
+        if not job.use_cache:
+            job.cache[kind] = "bypass"
+            return None
+        found = lookup(key)
+        job.cache[kind] = "hit" if found else "miss"
+        return found
+
+    def _record_code(self, job: Job):
+        self.manifest.update_job(job.id, code_hash=job.artifact_path.stem, code_path=job.artifact_path)
+
+    async def _plan(self, job: Job) -> Optional[str]:
+        key = plan_key(job.request, self.architect.model, self.architect.temperature)
+        cached = self._cached(job, "plan", self.cache.get_plan, key)
+        if cached:
+            job.plan, job.plan_path = cached
+        else:
+            job.plan, job.plan_path = await self._shared_plan(job, key)
+        self.manifest.update_job(job.id, plan_hash=job.plan_path.stem, plan_path=job.plan_path)
+
+        # Cached code never needs the GPU: go straight past the build queue
+        job.code_key = key = code_key(job.plan, self.builder.model, job.allow_network)
+        job.artifact_path = self._cached(job, "code", self.cache.get_code, key)
+        if job.artifact_path is None:
+            return "building"
+        self._record_code(job)
+        return None if job.dry_run else "executing"
+
+    async def _shared_plan(self, job: Job, key: str) -> tuple:
+        task = self._planning.get(key) if job.use_cache else None
+        if task is not None:
+            job.cache["plan"] = "shared"
+        else:
+            async def plan():
+                try:
+                    plan = await self._retry(
+                        lambda: self.architect.acreate_plan(job.request),
+                        stage_name="Planning",
+                        max_attempts=job.retries,
+                    )
+                    return plan, self.cache.put_plan(key, plan)
+                finally:
+                    # Only drop our own entry: a --no-cache twin never registers one
+                    if self._planning.get(key) is task:
+                        del self._planning[key]
+
+            task = asyncio.ensure_future(plan())
+            if job.use_cache:
+                self._planning[key] = task
+        return await asyncio.shield(task)
+
+    async def _build(self, job: Job) -> Optional[str]:
+        job.code_key = key = code_key(job.plan, self.builder.model, job.allow_network)
+        if job.use_cache:
+            # An identical job may have finished building while this one queued
+            job.artifact_path = self.cache.get_code(key)
+            if job.artifact_path:
+                job.cache["code"] = "hit"
+                self._record_code(job)
+                return None if job.dry_run else "executing"
+        code = await self._retry(
+            lambda: asyncio.to_thread(self.builder.generate_code, job.plan, job.allow_network),
+            stage_name="Building",
+            max_attempts=job.retries,
+        )
+        job.artifact_path = self.cache.put_code(key, code)
+        self._record_code(job)
+        return None if job.dry_run else "executing"
+
+    async def _execute(self, job: Job) -> None:
+        job.returncode = await asyncio.to_thread(
+            self.executor.run_artifact,
+            str(job.artifact_path.relative_to(Config.ARTIFACTS_DIR)),
+            timeout=job.timeout,
+            allow_network=job.allow_network,
+        )
+        if job.returncode != 0:
+            # Never replay code that failed: the next identical job rebuilds it
+            self.cache.evict_code(job.code_key, job.artifact_path)
+            raise RuntimeError(sandbox_failure(job.returncode))
+        return None
+
+
+async def run_jobs(requests: list, engine: Optional[JobEngine] = None, **options) -> list:
+    """Run every request through the pipeline; returns job snapshots in input order."""
+    owned = engine is None
+    if owned:
+        from architect import Architect
+        from builder import Builder
+        from executor import Executor
+
+        engine = JobEngine(Architect(), Builder(), Executor())
+    if not options.get("dry_run"):
+        engine.executor.warm(options.get("allow_network", False))
+    engine.start()
+    try:
+        jobs = [engine.submit(request, **options) for request in requests]
+        await asyncio.gather(*(engine.wait(job.id) for job in jobs))
+    finally:
+        await engine.stop()
+        if owned:
+            engine.executor.close()
+            engine.manifest.close()
+    return [job.snapshot() for job in jobs]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="v4-jobs",
+        description="Run many V4 Engine requests through the staged job pipeline",
+    )
+    parser.add_argument("requests", nargs="*", help="One request per argument")
+    parser.add_argument("--file", help="Read requests from a file, one per line")
+    parser.add_argument("--dry-run", action="store_true", help="Plan and build only")
+    parser.add_argument("--timeout", type=int, default=120, help="Sandbox timeout per job")
+    parser.add_argument("--retries", type=int, default=3, help="Attempts per stage")
+    parser.add_argument("--allow-network", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached plans and code")
+    parser.add_argument("--json", action="store_true", help="Print job snapshots as JSON")
+    args = parser.parse_args()
+
+    requests = list(args.requests)
+    if args.file:
+        with open(args.file) as f:
+            requests += [line.strip() for line in f if line.strip()]
+    if not requests:
+        parser.error("no requests given")
+
+    snapshots = asyncio.run(
+        run_jobs(
+            requests,
+            dry_run=args.dry_run,
+            timeout=args.timeout,
+            retries=args.retries,
+            allow_network=args.allow_network,
+            use_cache=not args.no_cache,
+        )
+    )
+
+    if args.json:
+        print(json.dumps(snapshots, indent=2))
+        return
+    print(f"\n{Fore.MAGENTA}{'='*60}")
+    for snap in snapshots:
+        color = Fore.GREEN if snap["status"] == "done" else Fore.RED
+        waits = ", ".join(
+            f"{stage} wait {marks['queue_ms']}ms / run {marks['run_ms']}ms"
+            for stage, marks in snap["stages"].items()
+        )
+        print(f"{color}{snap['id']} {snap['status']} ({snap['total_ms']}ms): {waits}")
+        if snap["error"]:
+            print(f"{Fore.RED}    {snap['error']}")
+    print(f"{Fore.MAGENTA}{'='*60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,20 +10,35 @@ Usage:
     python main.py "Create a weather app"
     python main.py "Build a todo list" --dry-run
     python main.py "Make a game" --timeout 300
+    python main.py "Create a weather app" --no-cache
+
+For many requests at once, jobs.py runs them through a staged pipeline
+where planning, building and execution of different jobs overlap.
+Every run is recorded in artifacts/manifest.sqlite3 (see manifest.py).
 """
 
 import sys
 import time
-import json
 import argparse
 from architect import Architect
 from builder import Builder
-from executor import Executor
+from executor import Executor, sandbox_failure
 from config import Config
+from manifest import new_job_id, open_manifest
+from retry import retry_wait
+from stage_cache import StageCache, code_key, plan_key
 from colorama import Fore, init
 
 init(autoreset=True)
 
+def _elapsed_ms(start: float) -> float:
+    return round((time.monotonic() - start) * 1000, 1)
+
+
+def _with_total(start: float, timings: dict) -> dict:
+    # Same shape as the job pipeline's manifest timings
+    return {"total_ms": _elapsed_ms(start), **timings}
+
 
 class Orchestrator:
     """
@@ -36,6 +51,13 @@ class Orchestrator:
         self.architect = Architect()
         self.builder = Builder()
         self.executor = Executor()
+        self.cache = StageCache(Config.ARTIFACTS_DIR)
+        self.manifest = open_manifest()
+
+    def close(self):
+        """Stop the warm sandbox workers and close the manifest."""
+        self.executor.close()
+        self.manifest.close()
 
     def _retry(self, func, *args, stage_name: str, max_attempts: int = 3):
         """
@@ -49,7 +71,7 @@ class Orchestrator:
                     raise RuntimeError(
                         f"{stage_name} failed after {max_attempts} attempts: {e}"
                     )
-                wait = 0.5 * (2 ** (attempt - 1))
+                wait = retry_wait(e, attempt)
                 print(
                     f"{Fore.YELLOW}WARN: {stage_name} attempt {attempt}/{max_attempts} "
                     f"failed, retrying in {wait:.1f}s..."
@@ -64,48 +86,70 @@ class Orchestrator:
         retries: int = 3,
         allow_network: bool = False,
         exit_on_error: bool = True,
+        use_cache: bool = True,
     ):
         """
         Execute the full pipeline.
+        With use_cache, a plan / code already produced for the same inputs
+        is reused instead of calling the LLM; fresh results are always stored.
         """
         print(f"\n{Fore.MAGENTA}{'='*60}")
         print(f"{Fore.MAGENTA}V4 ENGINE: STARTING PRODUCTION PIPELINE")
         print(f"{Fore.MAGENTA}{'='*60}")
         print(f"\n{Fore.CYAN}REQUEST: {user_request}\n")
 
+        job_id = new_job_id()
+        self.manifest.start_job(job_id, user_request, status="planning")
+        timings = {}
+        cache = {}
+        job_start = stage_start = time.monotonic()
+
         try:
+            if not dry_run:
+                self.executor.warm(allow_network)
+
             print(f"{Fore.CYAN}Stage 1: Planning...")
-            plan = self._retry(
-                self.architect.create_plan, user_request, stage_name="Planning", max_attempts=retries
+            key = plan_key(user_request, self.architect.model, self.architect.temperature)
+            cached = self.cache.get_plan(key) if use_cache else None
+            cache["plan"] = "bypass" if not use_cache else ("hit" if cached else "miss")
+            if cached:
+                plan, plan_path = cached
+                print(f"{Fore.GREEN}OK: Plan cache hit: {plan_path.name}\n")
+            else:
+                plan = self._retry(
+                    self.architect.create_plan, user_request, stage_name="Planning", max_attempts=retries
+                )
+                plan_path = self.cache.put_plan(key, plan)
+                print(f"{Fore.GREEN}OK: Plan created: {plan_path.name}\n")
+            timings["planning"] = {"run_ms": _elapsed_ms(stage_start)}
+            self.manifest.update_job(
+                job_id, status="building", plan_hash=plan_path.stem, plan_path=plan_path
             )
-            print(f"{Fore.GREEN}OK: Plan created\n")
-
-            plan_path = Config.ARTIFACTS_DIR / f"plan_{int(time.time())}.json"
-            with open(plan_path, "w") as f:
-                f.write(json.dumps(plan, indent=2))
 
             print(f"{Fore.CYAN}Stage 2: Building code...")
-            artifact_path = self._retry(
-                self.builder.execute_plan,
-                plan,
-                plan_path.name,
-                allow_network,
-                stage_name="Building",
-                max_attempts=retries,
-            )
-
-            for _ in range(10):
-                if artifact_path.exists():
-                    break
-                time.sleep(0.1)
+            stage_start = time.monotonic()
+            key = code_key(plan, self.builder.model, allow_network)
+            artifact_path = self.cache.get_code(key) if use_cache else None
+            cache["code"] = "bypass" if not use_cache else ("hit" if artifact_path else "miss")
+            if artifact_path:
+                print(f"{Fore.GREEN}OK: Code cache hit: {artifact_path.name}\n")
             else:
-                raise FileNotFoundError(
-                    f"Builder reported {artifact_path} but file not found after verification"
+                code = self._retry(
+                    self.builder.generate_code,
+                    plan,
+                    allow_network,
+                    stage_name="Building",
+                    max_attempts=retries,
                 )
-
-            print(f"{Fore.GREEN}OK: Code built: {artifact_path.name}\n")
+                artifact_path = self.cache.put_code(key, code)
+                print(f"{Fore.GREEN}OK: Code built: {artifact_path.name}\n")
+            timings["building"] = {"run_ms": _elapsed_ms(stage_start)}
+            self.manifest.update_job(
+                job_id, code_hash=artifact_path.stem, code_path=artifact_path, cache=cache
+            )
 
             if dry_run:
+                self.manifest.update_job(job_id, status="done", timings=_with_total(job_start, timings))
                 print(f"{Fore.YELLOW}Dry-run mode: Skipping sandbox execution")
                 print(f"{Fore.YELLOW}Generated artifact: {artifact_path}")
                 print(f"\n{Fore.MAGENTA}{'='*60}")
@@ -114,9 +158,20 @@ class Orchestrator:
                 return artifact_path
 
             print(f"{Fore.CYAN}Stage 3: Entering sandbox...")
-            self.executor.run_artifact(
-                artifact_path.name, timeout=timeout, allow_network=allow_network
+            self.manifest.update_job(job_id, status="executing")
+            stage_start = time.monotonic()
+            returncode = self.executor.run_artifact(
+                str(artifact_path.relative_to(Config.ARTIFACTS_DIR)),
+                timeout=timeout,
+                allow_network=allow_network,
             )
+            timings["executing"] = {"run_ms": _elapsed_ms(stage_start)}
+            self.manifest.update_job(job_id, returncode=returncode)
+            if returncode != 0:
+                # Never replay code that failed: the next identical run rebuilds it
+                self.cache.evict_code(key, artifact_path)
+                raise RuntimeError(sandbox_failure(returncode))
+            self.manifest.update_job(job_id, status="done", timings=_with_total(job_start, timings))
             print(f"{Fore.GREEN}OK: Execution completed\n")
 
             print(f"{Fore.MAGENTA}{'='*60}")
@@ -125,11 +180,21 @@ class Orchestrator:
             return artifact_path
 
         except KeyboardInterrupt:
+            self.manifest.update_job(
+                job_id, status="failed", error="interrupted", timings=_with_total(job_start, timings), cache=cache
+            )
             print(f"\n{Fore.YELLOW}Pipeline interrupted by user (Ctrl+C)")
             if exit_on_error:
                 sys.exit(130)
             raise
         except Exception as e:
+            self.manifest.update_job(
+                job_id,
+                status="failed",
+                error=f"{type(e).__name__}: {e}",
+                timings=_with_total(job_start, timings),
+                cache=cache,
+            )
             print(f"\n{Fore.RED}{'='*60}")
             print(f"{Fore.RED}PIPELINE CRASHED")
             print(f"{Fore.RED}{'='*60}")
@@ -147,16 +212,21 @@ def run_pipeline_logic(
     timeout: int = 120,
     retries: int = 3,
     allow_network: bool = False,
+    use_cache: bool = True,
 ):
     engine = Orchestrator()
-    artifact_path = engine.run(
-        user_request=user_request,
-        dry_run=dry_run,
-        timeout=timeout,
-        retries=retries,
-        allow_network=allow_network,
-        exit_on_error=False,
-    )
+    try:
+        artifact_path = engine.run(
+            user_request=user_request,
+            dry_run=dry_run,
+            timeout=timeout,
+            retries=retries,
+            allow_network=allow_network,
+            exit_on_error=False,
+            use_cache=use_cache,
+        )
+    finally:
+        engine.close()
     if artifact_path is None:
         return "No artifact produced"
     return str(artifact_path)
@@ -203,6 +273,11 @@ Examples:
         action="store_true",
         help="Allow network access inside the sandbox (default: off)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the planner and builder, ignoring cached plans and code",
+    )
 
     args = parser.parse_args()
 
@@ -213,13 +288,17 @@ Examples:
         print(f"{Fore.YELLOW}WARN: No prompt provided, using default example\n")
 
     engine = Orchestrator()
-    engine.run(
-        user_request=prompt,
-        dry_run=args.dry_run,
-        timeout=args.timeout,
-        retries=args.retries,
-        allow_network=args.allow_network,
-    )
+    try:
+        engine.run(
+            user_request=prompt,
+            dry_run=args.dry_run,
+            timeout=args.timeout,
+            retries=args.retries,
+            allow_network=args.allow_network,
+            use_cache=not args.no_cache,
+        )
+    finally:
+        engine.close()
 
 
 if __name__ == "__main__":
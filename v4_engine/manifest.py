@@ -0,0 +1,269 @@
+"""
+Artifact manifest - one SQLite (WAL) row per job, replacing glob + ctime
+scans of artifacts/.
+
+Each job records its request, the hashes / paths of its plan and code,
+the sandbox result, per-stage timings and status. Indexed lookups:
+    latest plan / code / job, by job id, by request hash
+
+Usage:
+    python manifest.py latest [--kind plan|code|job]
+    python manifest.py job <job_id>
+    python manifest.py request "Create a weather app"
+    python manifest.py gc --older-than-days 30 --keep 100 [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from config import Config
+from stage_cache import CODE_DIRNAME, INDEX_DIRNAME, PLANS_DIRNAME, request_hash
+
+MANIFEST_NAME = "manifest.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    plan_hash TEXT,
+    plan_path TEXT,
+    code_hash TEXT,
+    code_path TEXT,
+    returncode INTEGER,
+    error TEXT,
+    timings TEXT,
+    cache TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash, created_at);
+CREATE INDEX IF NOT EXISTS jobs_plan_created ON jobs (created_at) WHERE plan_path IS NOT NULL;
+CREATE INDEX IF NOT EXISTS jobs_code_created ON jobs (created_at) WHERE code_path IS NOT NULL;
+"""
+
+_FIELDS = (
+    "status",
+    "plan_hash",
+    "plan_path",
+    "code_hash",
+    "code_path",
+    "returncode",
+    "error",
+    "timings",
+    "cache",
+)
+_JSON_FIELDS = ("timings", "cache")
+
+
+def new_job_id() -> str:
+    # Sortable by submit time and unique across concurrent submits
+    return f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _row(cursor: sqlite3.Cursor, row: tuple) -> dict:
+    record = {column[0]: value for column, value in zip(cursor.description, row)}
+    for name in _JSON_FIELDS:
+        if record.get(name):
+            record[name] = json.loads(record[name])
+    return record
+
+
+class Manifest:
+    """Thread-safe: the job pipeline records from its event loop and worker threads."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = _row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def start_job(self, job_id: str, request: str, status: str = "queued"):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, request, request_hash, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, request, request_hash(request), status, now, now),
+            )
+
+    def update_job(self, job_id: str, **fields):
+        """Set any of _FIELDS; paths are stored relative to artifacts/"""
+        unknown = set(fields) - set(_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown manifest fields: {sorted(unknown)}")
+        values = {}
+        for name, value in fields.items():
+            if name in _JSON_FIELDS and value is not None:
+                value = json.dumps(value)
+            elif name.endswith("_path") and value is not None:
+                value = _relative(value)
+            values[name] = value
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in values)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*values.values(), job_id)
+            )
+
+    def job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+    def latest(self, kind: str = "job") -> Optional[dict]:
+        """Most recent job overall, or with a plan / code artifact"""
+        where = {"job": "", "plan": "WHERE plan_path IS NOT NULL", "code": "WHERE code_path IS NOT NULL"}
+        if kind not in where:
+            raise ValueError(f"Unknown kind {kind!r}; expected job, plan or code")
+        with self._lock:
+            return self._db.execute(
+                f"SELECT * FROM jobs {where[kind]} ORDER BY created_at DESC LIMIT 1"
+            ).fetchone()
+
+    def by_request(self, request: str, limit: int = 20) -> list:
+        return self.by_request_hash(request_hash(request), limit)
+
+    def by_request_hash(self, digest: str, limit: int = 20) -> list:
+        with self._lock:
+            return self._db.execute(
+                "SELECT * FROM jobs WHERE request_hash = ? ORDER BY created_at DESC LIMIT ?",
+                (digest, limit),
+            ).fetchall()
+
+    def gc(self, older_than_days: float, keep: int = 100, dry_run: bool = False) -> dict:
+        """
+        Forget jobs older than the cutoff (always keeping the newest `keep`),
+        then delete plan / code blobs, cache index entries and sandbox run
+        directories that are older than the cutoff and no longer referenced.
+        """
+        cutoff = time.time() - older_than_days * 86400
+        root = Config.ARTIFACTS_DIR
+        with self._lock:
+            expired = [
+                row["job_id"]
+                for row in self._db.execute(
+                    "SELECT job_id FROM jobs WHERE created_at < ? AND job_id NOT IN "
+                    "(SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT ?)",
+                    (cutoff, keep),
+                )
+            ]
+            if not dry_run and expired:
+                self._db.executemany("DELETE FROM jobs WHERE job_id = ?", [(j,) for j in expired])
+            expired_ids = set(expired)
+            referenced = set()
+            for row in self._db.execute("SELECT job_id, plan_hash, code_hash FROM jobs"):
+                if row["job_id"] not in expired_ids:
+                    referenced.update(h for h in (row["plan_hash"], row["code_hash"]) if h)
+
+        deleted_hashes = set()
+        removed = {"jobs": len(expired), "plans": 0, "code": 0, "index": 0, "runs": 0}
+        for dirname, kind in ((PLANS_DIRNAME, "plans"), (CODE_DIRNAME, "code")):
+            directory = root / dirname
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory):
+                digest = entry.name.split(".")[0]
+                if digest in referenced or entry.stat().st_mtime >= cutoff:
+                    continue
+                deleted_hashes.add(digest)
+                removed[kind] += 1
+                if not dry_run:
+                    os.unlink(entry.path)
+
+        index_root = root / INDEX_DIRNAME
+        if deleted_hashes and index_root.is_dir():
+            for kind_dir in os.scandir(index_root):
+                for entry in os.scandir(kind_dir.path):
+                    try:
+                        with open(entry.path) as f:
+                            target = f.read().strip()
+                    except OSError:
+                        continue
+                    if target in deleted_hashes:
+                        removed["index"] += 1
+                        if not dry_run:
+                            os.unlink(entry.path)
+
+        runs = root / "runs"
+        if runs.is_dir():
+            for entry in os.scandir(runs):
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    removed["runs"] += 1
+                    if not dry_run:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+
+        if not dry_run:
+            with self._lock:
+                self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _relative(path) -> str:
+    path = Path(path)
+    try:
+        return path.relative_to(Config.ARTIFACTS_DIR).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def open_manifest() -> Manifest:
+    return Manifest(Config.ARTIFACTS_DIR / MANIFEST_NAME)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="v4-manifest", description="Query or clean the artifact manifest")
+    sub = parser.add_subparsers(dest="command", required=True)
+    latest = sub.add_parser("latest", help="Most recent job (or plan / code)")
+    latest.add_argument("--kind", choices=("job", "plan", "code"), default="job")
+    job = sub.add_parser("job", help="One job by id")
+    job.add_argument("job_id")
+    request = sub.add_parser("request", help="Jobs for a request (text or --hash)")
+    request.add_argument("text", nargs="?")
+    request.add_argument("--hash", help="Request hash instead of text")
+    request.add_argument("--limit", type=int, default=20)
+    gc = sub.add_parser("gc", help="Delete old jobs and unreferenced artifacts")
+    gc.add_argument("--older-than-days", type=float, default=30)
+    gc.add_argument("--keep", type=int, default=100, help="Always keep the newest N jobs")
+    gc.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    manifest = open_manifest()
+    try:
+        if args.command == "latest":
+            result = manifest.latest(args.kind)
+        elif args.command == "job":
+            result = manifest.job(args.job_id)
+        elif args.command == "request":
+            if args.hash:
+                result = manifest.by_request_hash(args.hash, args.limit)
+            elif args.text:
+                result = manifest.by_request(args.text, args.limit)
+            else:
+                parser.error("request needs text or --hash")
+        else:
+            result = manifest.gc(args.older_than_days, keep=args.keep, dry_run=args.dry_run)
+    finally:
+        manifest.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
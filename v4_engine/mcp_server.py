@@ -43,6 +43,7 @@ def forge_request(user_prompt: str) -> str:
     dry_run = _env_bool("V4_DRY_RUN", False)
     timeout = int(os.getenv("V4_TIMEOUT", "120"))
     retries = int(os.getenv("V4_RETRIES", "3"))
+    use_cache = not _env_bool("V4_NO_CACHE", False)
 
     logger.info("Processing MCP request. allow_network=%s dry_run=%s", allow_network, dry_run)
 
@@ -55,6 +56,7 @@ def forge_request(user_prompt: str) -> str:
                 timeout=timeout,
                 retries=retries,
                 allow_network=allow_network,
+                use_cache=use_cache,
             )
         return f"OK: {result}"
     except Exception as exc:
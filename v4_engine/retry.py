@@ -0,0 +1,26 @@
+"""
+Retry timing shared by the Orchestrator (main.py) and the job pipeline (jobs.py).
+"""
+
+from code_stream import CodeRejected
+
+MAX_RETRY_AFTER_S = 60
+
+
+def retry_after(error: Exception):
+    """Seconds the upstream asked us to wait (429 retry-after), if any"""
+    response = getattr(error, "response", None)
+    if response is None or getattr(response, "status_code", None) != 429:
+        return None
+    try:
+        return min(float(response.headers.get("retry-after")), MAX_RETRY_AFTER_S)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_wait(error: Exception, attempt: int) -> float:
+    """Backoff before retry `attempt + 1`"""
+    if isinstance(error, CodeRejected):
+        # Rejected output, not a transient failure: regenerate right away
+        return 0.0
+    return retry_after(error) or 0.5 * (2 ** (attempt - 1))
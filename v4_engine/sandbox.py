@@ -0,0 +1,307 @@
+"""
+Warm sandbox pool for the Executor.
+
+Instead of a cold `docker run --rm` per artifact (container start plus
+importing pandas / numpy / matplotlib every time), each pool worker is a
+long-lived sandbox_server.py fork-server with the heavy libraries already
+imported. A run is a fork of that warm process, with CPU, memory and
+wall-clock limits and its own working directory under artifacts/runs/.
+
+Backends (Config.SANDBOX_BACKEND):
+    docker: the fork-server runs inside one long-lived v4-sandbox
+            container per worker (--network none unless allowed)
+    local:  the fork-server is a local process; no Docker required,
+            process isolation only
+
+Workers are recycled after Config.SANDBOX_MAX_RUNS runs.
+"""
+
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from config import Config
+
+SERVER_SOURCE_PATH = Path(__file__).with_name("sandbox_server.py")
+RUNS_DIRNAME = "runs"
+
+
+class SandboxError(RuntimeError):
+    """The sandbox worker itself failed (not the script it ran)."""
+
+
+@dataclass
+class SandboxLimits:
+    cpu_s: int = 60
+    memory_mb: int = 1024  # on top of the preloaded interpreter
+    wall_s: float = 120
+
+
+@dataclass
+class SandboxResult:
+    returncode: Optional[int]  # None when the wall-clock limit killed the run
+    stdout: str
+    stderr: str
+    timed_out: bool
+    signal: Optional[str]
+    duration_ms: float
+    workdir: Path
+    worker_runs: int  # runs served by this warm worker, including this one
+
+
+class SandboxWorker:
+    """One warm fork-server process and its JSON-lines pipe."""
+
+    def __init__(self, command: list, env: Optional[dict] = None):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=env,
+        )
+        self.runs = 0
+        self.ready = None  # the server's ready line, once read
+
+    def _read_reply(self) -> dict:
+        line = self.process.stdout.readline()
+        if not line:
+            raise SandboxError(f"sandbox worker exited (code {self.process.poll()})")
+        return json.loads(line)
+
+    def wait_ready(self) -> dict:
+        if self.ready is None:
+            self.ready = self._read_reply()
+        return self.ready
+
+    def run(self, request: dict) -> dict:
+        self.wait_ready()
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise SandboxError(f"sandbox worker unreachable: {e}")
+        reply = self._read_reply()
+        self.runs += 1
+        if "error" in reply:
+            raise SandboxError(reply["error"])
+        return reply
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self):
+        if self.alive:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+
+def _server_command() -> list:
+    # The server is shipped as source so the sandbox image needs no copy of it
+    return ["python", "-u", "-c", SERVER_SOURCE_PATH.read_text()]
+
+
+class LocalBackend:
+    """Fork-server as a local child process: no Docker, process isolation only."""
+
+    name = "local"
+
+    def __init__(self, preload: str):
+        self.preload = preload
+
+    def spawn(self, allow_network: bool) -> SandboxWorker:
+        command = _server_command()
+        command[0] = sys.executable
+        return SandboxWorker(command, env={**os.environ, "SANDBOX_PRELOAD": self.preload})
+
+    def sandbox_path(self, host_path: Path) -> str:
+        return str(host_path)
+
+
+class DockerBackend:
+    """Fork-server inside a long-lived sandbox container (artifacts/ mounted at /app)."""
+
+    name = "docker"
+
+    def __init__(self, preload: str, image: str = "v4-sandbox", memory_mb: int = 0):
+        self.preload = preload
+        self.image = image
+        self.memory_mb = memory_mb
+
+    def spawn(self, allow_network: bool) -> SandboxWorker:
+        cmd = ["docker", "run", "-i", "--rm"]
+        cmd += ["--network", "host" if allow_network else "none"]
+        if self.memory_mb > 0:
+            # Whole-container ceiling: the warm server plus one run at a time
+            cmd += ["--memory", f"{self.memory_mb}m"]
+        cmd += [
+            "-e",
+            f"SANDBOX_PRELOAD={self.preload}",
+            "-v",
+            f"{Config.ARTIFACTS_DIR}:/app",
+            "-w",
+            "/app",
+            self.image,
+        ]
+        return SandboxWorker(cmd + _server_command())
+
+    def sandbox_path(self, host_path: Path) -> str:
+        return "/app/" + host_path.relative_to(Config.ARTIFACTS_DIR).as_posix()
+
+
+BACKENDS = {"local": LocalBackend, "docker": DockerBackend}
+
+
+def make_backend(name: str):
+    if name == "local":
+        return LocalBackend(Config.SANDBOX_PRELOAD)
+    if name == "docker":
+        # Room for the preloaded libraries on top of the per-run limit
+        return DockerBackend(Config.SANDBOX_PRELOAD, memory_mb=Config.SANDBOX_MEMORY_MB + 512)
+    raise ValueError(f"Unknown sandbox backend {name!r}; expected one of {sorted(BACKENDS)}")
+
+
+class SandboxPool:
+    """
+    Up to `size` warm workers per network mode (a container's network is
+    fixed at start). Thread-safe: Executor.run_artifact is called from the
+    job pipeline's worker threads.
+    """
+
+    def __init__(self, backend, size: int = 2, max_runs: int = 50, limits: Optional[SandboxLimits] = None):
+        self.backend = backend
+        self.size = max(size, 1)
+        self.max_runs = max_runs
+        self.limits = limits or SandboxLimits()
+        self._idle = {False: queue.LifoQueue(), True: queue.LifoQueue()}
+        self._slots = {False: threading.Semaphore(self.size), True: threading.Semaphore(self.size)}
+        self.spawned = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    def _spawn(self, allow_network: bool) -> SandboxWorker:
+        self.spawned += 1
+        return self.backend.spawn(allow_network)
+
+    def warm(self, allow_network: bool = False, count: Optional[int] = None):
+        """Start workers ahead of the first run (they warm up in parallel)."""
+        for _ in range(min(count or self.size, self.size) - self._idle[allow_network].qsize()):
+            self._idle[allow_network].put(self._spawn(allow_network))
+
+    def _acquire(self, allow_network: bool) -> SandboxWorker:
+        try:
+            return self._idle[allow_network].get_nowait()
+        except queue.Empty:
+            return self._spawn(allow_network)
+
+    def _release(self, worker: SandboxWorker, allow_network: bool):
+        if worker.alive and worker.runs < self.max_runs:
+            self._idle[allow_network].put(worker)
+            return
+        if worker.alive:
+            self.recycled += 1
+        worker.close()
+        # Replace right away so the successor warms up before it is needed
+        self._idle[allow_network].put(self._spawn(allow_network))
+
+    def run(
+        self, script_path: Path, allow_network: bool = False, limits: Optional[SandboxLimits] = None
+    ) -> SandboxResult:
+        limits = limits or self.limits
+        workdir = Config.ARTIFACTS_DIR / RUNS_DIRNAME / f"{script_path.stem}-{uuid.uuid4().hex[:8]}"
+        workdir.mkdir(parents=True)
+        shutil.copy2(script_path, workdir / script_path.name)
+        request = {
+            "script": self.backend.sandbox_path(workdir / script_path.name),
+            "workdir": self.backend.sandbox_path(workdir),
+            "cpu_s": limits.cpu_s,
+            "memory_mb": limits.memory_mb,
+            "wall_s": limits.wall_s,
+            "allow_network": allow_network,
+        }
+
+        with self._slots[allow_network]:
+            worker = self._acquire(allow_network)
+            try:
+                reply = worker.run(request)
+            except SandboxError:
+                # A dead worker is not the script's fault: one retry on a fresh one
+                self.crashed += 1
+                worker.close()
+                worker = self._spawn(allow_network)
+                reply = worker.run(request)
+            finally:
+                self._release(worker, allow_network)
+
+        return SandboxResult(
+            returncode=reply["returncode"],
+            stdout=reply["stdout"],
+            stderr=reply["stderr"],
+            timed_out=reply["timed_out"],
+            signal=reply["signal"],
+            duration_ms=reply["duration_ms"],
+            workdir=workdir,
+            worker_runs=worker.runs,
+        )
+
+    def close(self):
+        for idle in self._idle.values():
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "size": self.size,
+            "max_runs": self.max_runs,
+            "idle": {"isolated": self._idle[False].qsize(), "network": self._idle[True].qsize()},
+            "spawned": self.spawned,
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+        }
+
+
+if __name__ == "__main__":
+    # Cold vs warm timing of a trivial script on the configured backend
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sandbox pool smoke test")
+    parser.add_argument("--backend", default=Config.SANDBOX_BACKEND, choices=sorted(BACKENDS))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    Config.ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+    probe = Config.ARTIFACTS_DIR / "sandbox_probe.py"
+    probe.write_text("import sys\nprint('hello from', sys.version.split()[0])\n")
+    pool = SandboxPool(make_backend(args.backend), size=1)
+    try:
+        for i in range(args.runs):
+            start = time.monotonic()
+            result = pool.run(probe)
+            print(
+                f"run {i}: exit {result.returncode} in {(time.monotonic() - start) * 1000:.0f}ms "
+                f"(script {result.duration_ms}ms) {result.stdout.strip()}"
+            )
+        print(json.dumps(pool.stats(), indent=2))
+    finally:
+        pool.close()
+        probe.unlink()
@@ -0,0 +1,228 @@
+"""
+Warm sandbox fork-server (runs inside the sandbox, not imported by the engine).
+
+Started once per pool worker, it imports the heavy libraries, prints a
+ready line, then serves one JSON request per stdin line:
+
+    {"script": ..., "workdir": ..., "cpu_s": ..., "memory_mb": ...,
+     "wall_s": ..., "allow_network": ...}
+
+Each request runs in a freshly forked child with CPU / address-space
+rlimits, its own process group and working directory; the reply is one
+JSON line on stdout. Only the standard library is required, so the same
+file serves the local and docker backends.
+"""
+
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+
+# Single-threaded BLAS: forking a process with live BLAS threads is unsafe
+for _var in ("OPENBLAS_NUM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+OUTPUT_LIMIT = 1 << 20  # bytes of stdout / stderr returned per run
+STDOUT_NAME = ".sandbox_stdout"
+STDERR_NAME = ".sandbox_stderr"
+
+
+def _preload(modules: list) -> list:
+    loaded = []
+    for name in modules:
+        try:
+            __import__(name)
+            loaded.append(name)
+        except Exception:
+            pass  # missing optional library: scripts importing it fail on their own
+    return loaded
+
+
+def _address_space() -> int:
+    """Current virtual size in bytes (what RLIMIT_AS counts)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _block_network():
+    # Best effort for the local backend; docker runs with --network none
+    import socket
+
+    def refuse(*_args, **_kwargs):
+        raise PermissionError("network access is disabled in this sandbox")
+
+    socket.socket.connect = refuse
+    socket.socket.connect_ex = refuse
+    socket.create_connection = refuse
+    socket.getaddrinfo = refuse
+
+
+def _child(request: dict, baseline: int):
+    """Never returns: runs the script and exits with its status."""
+    try:
+        os.setsid()
+        workdir = request["workdir"]
+        os.chdir(workdir)
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        out = os.open(STDOUT_NAME, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        err = os.open(STDERR_NAME, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(out, 1)
+        os.dup2(err, 2)
+        # Drop the protocol pipe and anything else inherited from the server
+        os.closerange(3, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+
+        cpu_s = int(request["cpu_s"])
+        if cpu_s > 0:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_s, cpu_s + 1))
+        memory_mb = int(request["memory_mb"])
+        if memory_mb > 0:
+            # On top of what the preloaded interpreter already maps
+            limit = baseline + memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        if not request.get("allow_network"):
+            _block_network()
+
+        script = request["script"]
+        sys.argv = [script]
+        sys.path[0] = workdir
+        import runpy
+
+        code = 0
+        try:
+            runpy.run_path(script, run_name="__main__")
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def _wait(pid: int, wall_s: float) -> tuple:
+    """(wait status or None if the wall-clock limit hit, timed_out)"""
+    deadline = time.monotonic() + wall_s if wall_s > 0 else None
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pidfd = None
+    try:
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return status, False
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None, True
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(0.005 if remaining is None else min(0.005, remaining))
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+
+def _read_capped(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            data = f.read(OUTPUT_LIMIT + 1)
+        os.unlink(path)
+    except OSError:
+        return ""
+    text = data[:OUTPUT_LIMIT].decode("utf-8", "replace")
+    if len(data) > OUTPUT_LIMIT:
+        text += "\n[output truncated]"
+    return text
+
+
+def _run(request: dict, baseline: int) -> dict:
+    start = time.monotonic()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        _child(request, baseline)
+
+    status, timed_out = _wait(pid, float(request.get("wall_s") or 0))
+    try:
+        # The whole process group: scripts may have spawned helpers
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    if timed_out:
+        _, status = os.waitpid(pid, 0)
+
+    returncode = None
+    killed_by = None
+    if not timed_out:
+        if os.WIFSIGNALED(status):
+            killed_by = signal.Signals(os.WTERMSIG(status)).name
+            returncode = -os.WTERMSIG(status)
+        else:
+            returncode = os.WEXITSTATUS(status)
+
+    workdir = request["workdir"]
+    return {
+        "returncode": returncode,
+        "timed_out": timed_out,
+        "signal": killed_by,  # SIGXCPU: CPU limit; SIGKILL: wall-clock limit
+        "duration_ms": round((time.monotonic() - start) * 1000, 1),
+        "stdout": _read_capped(os.path.join(workdir, STDOUT_NAME)),
+        "stderr": _read_capped(os.path.join(workdir, STDERR_NAME)),
+    }
+
+
+def main():
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    # Anything the preloaded libraries print must not corrupt the protocol
+    os.dup2(2, 1)
+
+    start = time.monotonic()
+    preload = [name for name in os.environ.get("SANDBOX_PRELOAD", "").split(",") if name]
+    loaded = _preload(preload)
+    baseline = _address_space()
+    protocol.write(json.dumps({
+        "ready": True,
+        "pid": os.getpid(),
+        "preloaded": loaded,
+        "warmup_ms": round((time.monotonic() - start) * 1000, 1),
+    }) + "\n")
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            reply = _run(json.loads(line), baseline)
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        protocol.write(json.dumps(reply) + "\n")
+
+
+if __name__ == "__main__":
+    main()
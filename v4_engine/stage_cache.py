@@ -0,0 +1,147 @@
+"""
+Content-addressed cache for Architect plans and Builder code.
+
+Artifacts are stored once, named by the SHA-256 of their content:
+    artifacts/plans/<hash>.json
+    artifacts/code/<hash>.py
+
+and a small index maps each stage's input key to the content hash:
+    plan key: normalized request + planner model + temperature
+    code key: canonical plan JSON + builder model + allow_network
+
+A hit skips the LLM stage entirely. Writes go through a temp file and
+os.replace, so concurrent jobs never see a partial artifact. Code that
+fails in the sandbox is evicted from the index, so it is not replayed.
+"""
+
+import hashlib
+import json
+import os
+import unicodedata
+import uuid
+from pathlib import Path
+from typing import Optional
+
+PLANS_DIRNAME = "plans"
+CODE_DIRNAME = "code"
+INDEX_DIRNAME = "cache"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_request(request: str) -> str:
+    # Whitespace and Unicode form only: wording and case can change the plan
+    return " ".join(unicodedata.normalize("NFC", request).split())
+
+
+def request_hash(request: str) -> str:
+    """Model-independent identity of a request (manifest lookups)"""
+    return _sha256(normalize_request(request))
+
+
+def canonical_plan(plan: dict) -> str:
+    return json.dumps(plan, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def plan_key(request: str, model: str, temperature: float) -> str:
+    return _sha256(json.dumps([normalize_request(request), model, temperature]))
+
+
+def code_key(plan: dict, model: str, allow_network: bool) -> str:
+    return _sha256(json.dumps([canonical_plan(plan), model, bool(allow_network)]))
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class StageCache:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.hits = {"plan": 0, "code": 0}
+        self.misses = {"plan": 0, "code": 0}
+
+    def plan_path(self, content_hash: str) -> Path:
+        return self.root / PLANS_DIRNAME / f"{content_hash}.json"
+
+    def code_path(self, content_hash: str) -> Path:
+        return self.root / CODE_DIRNAME / f"{content_hash}.py"
+
+    def _index_path(self, kind: str, key: str) -> Path:
+        return self.root / INDEX_DIRNAME / kind / key
+
+    def _lookup(self, kind: str, key: str) -> Optional[str]:
+        try:
+            content_hash = self._index_path(kind, key).read_text().strip()
+        except OSError:
+            self.misses[kind] += 1
+            return None
+        self.hits[kind] += 1
+        return content_hash
+
+    def get_plan(self, key: str) -> Optional[tuple]:
+        """(plan, path) for a cached plan, or None"""
+        content_hash = self._lookup("plan", key)
+        if content_hash is None:
+            return None
+        path = self.plan_path(content_hash)
+        try:
+            with open(path) as f:
+                return json.load(f), path
+        except (OSError, ValueError):
+            # Index points at a deleted / damaged artifact: treat as a miss
+            self.hits["plan"] -= 1
+            self.misses["plan"] += 1
+            return None
+
+    def put_plan(self, key: Optional[str], plan: dict) -> Path:
+        """Store the plan under its content hash; index it under `key` if given"""
+        content_hash = _sha256(canonical_plan(plan))
+        path = self.plan_path(content_hash)
+        if not path.exists():
+            _write_atomic(path, json.dumps(plan, indent=2))
+        if key:
+            _write_atomic(self._index_path("plan", key), content_hash)
+        return path
+
+    def get_code(self, key: str) -> Optional[Path]:
+        content_hash = self._lookup("code", key)
+        if content_hash is None:
+            return None
+        path = self.code_path(content_hash)
+        if not path.exists():
+            self.hits["code"] -= 1
+            self.misses["code"] += 1
+            return None
+        return path
+
+    def put_code(self, key: Optional[str], code: str) -> Path:
+        content_hash = _sha256(code)
+        path = self.code_path(content_hash)
+        if not path.exists():
+            _write_atomic(path, code)
+        if key:
+            _write_atomic(self._index_path("code", key), content_hash)
+        return path
+
+    def evict_code(self, key: str, path: Optional[Path] = None):
+        """
+        Drop the index entry for `key` (the blob stays for the manifest / gc).
+        With `path`, only if the entry still points at that artifact.
+        """
+        index = self._index_path("code", key)
+        try:
+            if path is not None and index.read_text().strip() != Path(path).stem:
+                return
+            index.unlink()
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        return {"hits": dict(self.hits), "misses": dict(self.misses)}